@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение холодного и тёплого старта: компиляция против загрузки из кэша
+Запуск: python benchmarks/compile_cache.py [число_блоков]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.compiler import compile_program
+from core.cache import ProgramCache
+
+BLOCK = '''        // Блок {n}
+        local int value{n} = {n};
+        if value{n} {{
+            for i in Times.Range(3) {{
+                Console.Print($"{{i}}: {{value{n}}}");
+            }}
+        }}
+        else {{
+            Console.Print("ноль");
+        }}
+'''
+
+def make_program(blocks):
+    """Генерирует большую программу из повторяющихся блоков"""
+    body = "".join(BLOCK.format(n=n) for n in range(blocks))
+    return "@use Console;\n@use Times;\n\nprivate local class App {\n    global define OnRun() {\n" + body + "    }\n}\n"
+
+def measure(func, repeat=5):
+    """Лучшее время из нескольких запусков"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    code = make_program(blocks)
+    print("Строк в программе: {}".format(code.count('\n')))
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory)
+
+        cold = measure(lambda: compile_program(code))
+        print("Компиляция без кэша:      {:8.2f} мс".format(cold * 1000))
+
+        def miss():
+            cache.clear()
+            cache.compile(code)
+        first = measure(miss)
+        print("Первый запуск (запись):   {:8.2f} мс".format(first * 1000))
+
+        cache.compile(code)
+        warm = measure(lambda: cache.compile(code))
+        print("Повторный запуск (кэш):   {:8.2f} мс".format(warm * 1000))
+        print("Ускорение: {:.1f}x".format(cold / warm))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Память истории отмены за час редактирования: запись на каждое нажатие
+против UndoManager со склейкой, сжатием и бюджетом
+Запуск: python benchmarks/undo_memory.py [часов]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from editor.undo import UndoManager
+
+# Скорость набора: нажатий в секунду
+KEYS_PER_SECOND = 3
+
+LINE = '        local int value{n} = Console.Read("Введите число {n}");'
+
+class Session:
+    """Модель сеанса: текст списком строк, курсор и часы"""
+
+    def __init__(self, seed=1):
+        self.random = random.Random(seed)
+        self.lines = [LINE.format(n=n) for n in range(5000)]
+        self.line, self.column = 1, 0
+        self.time = 0.0
+
+    def tick(self):
+        """Следующее нажатие: паузы на раздумья между быстрыми сериями"""
+        if self.random.random() < 0.02:
+            self.time += self.random.uniform(2, 20)
+        else:
+            self.time += self.random.expovariate(KEYS_PER_SECOND)
+
+    def insert(self, text):
+        index = (self.line, self.column)
+        current = self.lines[self.line - 1]
+        new = (current[:self.column] + text + current[self.column:]).split('\n')
+        self.lines[self.line - 1:self.line] = new
+        self.line += len(new) - 1
+        self.column = len(new[-1]) - len(current) + self.column if len(new) > 1 else self.column + len(text)
+        return index, "", text
+
+    def delete_lines(self, first, count):
+        removed = '\n'.join(self.lines[first - 1:first - 1 + count]) + '\n'
+        del self.lines[first - 1:first - 1 + count]
+        self.line, self.column = first, 0
+        return (first, 0), removed, ""
+
+    def event(self):
+        """Одно действие пользователя: (позиция, удалено, вставлено) или None"""
+        roll = self.random.random()
+        if roll < 0.0003 and len(self.lines) > 4000:
+            # Выделить и удалить большой фрагмент (~200 КБ)
+            return self.delete_lines(self.random.randint(1, len(self.lines) - 3000), 3000)
+        if roll < 0.0006:
+            # Вставить обратно много строк
+            return self.insert('\n'.join(LINE.format(n=n) for n in range(3000)) + '\n')
+        if roll < 0.004:
+            return self.insert('\n'.join(LINE.format(n=n) for n in range(20)) + '\n')
+        if roll < 0.03:
+            # Переход в другое место без правки
+            self.line = self.random.randint(1, len(self.lines))
+            self.column = self.random.randint(0, len(self.lines[self.line - 1]))
+            return None
+        if roll < 0.08:
+            return self.insert('\n')
+        if roll < 0.18 and self.column > 0:
+            self.column -= 1
+            current = self.lines[self.line - 1]
+            self.lines[self.line - 1] = current[:self.column] + current[self.column + 1:]
+            return (self.line, self.column), current[self.column], ""
+        if roll < 0.32:
+            return self.insert(' ')
+        return self.insert(self.random.choice("abcdefghijklmnopqrstuvwxyzабвгдежзийклмнопрст()=;."))
+
+def measure(hours, make_history, record):
+    """Память после hours часов сеанса (tracemalloc), МБ"""
+    session = Session()
+    history = make_history(lambda: session.time)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    while session.time < hours * 3600:
+        session.tick()
+        edit = session.event()
+        if edit is not None:
+            record(history, *edit)
+    memory = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return history, memory / 1024 / 1024
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    # Сеанс одинаков при любой истории: его собственную память (изменения текста) вычитаем
+    _, document = measure(hours, lambda clock: None, lambda history, *edit: None)
+
+    plain, memory = measure(hours, lambda clock: [], lambda history, *edit: history.append(edit))
+    print("Запись на каждое нажатие:  {:7d} записей  {:7.2f} МБ".format(len(plain), memory - document))
+
+    def unbounded(clock):
+        return UndoManager(budget=float('inf'), clock=clock)
+
+    def record(history, *edit):
+        history.record(*edit)
+        history.end_batch()
+
+    for title, make_history in (("Склейка и сжатие:", unbounded),
+                                ("С бюджетом 4 МБ:", lambda clock: UndoManager(clock=clock))):
+        history, memory = measure(hours, make_history, record)
+        edits = sum(len(step) for step in history.undo_stack)
+        print("{:<26} {:7d} записей  {:7.2f} МБ  (оценка {:.2f} МБ)".format(
+            title, edits, memory - document, history.size / 1024 / 1024))
+
+if __name__ == "__main__":
+    main()
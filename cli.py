@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Запуск программ AMIGA из командной строки
+Запуск: python cli.py run program.amiga1 [--input data.txt]
+        python cli.py batch tests/ --report report.json
+        python cli.py build project/
+"""
+
+import argparse
+import os
+import sys
+
+# Добавляем пути для импортов
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.interpreter import AMIGAInterpreter
+from core.cache import ProgramCache
+from core.profiling import MemoryProfiler
+from core.tracing import SamplingTracer
+from core.coverage import CoverageCollector, CoverageData
+from core.inputs import ListInputProvider, FileInputProvider, StdinInputProvider
+from core.runner import run_directory, write_report
+from core.project import ProjectBuilder
+
+def run_command(args):
+    """Выполняет одну программу"""
+    interpreter = AMIGAInterpreter()
+    if not args.no_cache:
+        interpreter.program_cache = ProgramCache(args.cache_dir)
+    interpreter.time_limit = args.time_limit
+    interpreter.max_steps = args.max_steps
+
+    # Источник данных для Console.Input
+    if args.input:
+        interpreter.input_callback = FileInputProvider(args.input)
+    elif args.value:
+        interpreter.input_callback = ListInputProvider(args.value)
+    else:
+        interpreter.input_callback = StdinInputProvider()
+
+    with open(args.file, 'r', encoding='utf-8') as file:
+        code = file.read()
+
+    profiler = MemoryProfiler(interpreter) if args.memory else None
+    tracer = SamplingTracer(every=args.trace) if args.trace else None
+    if tracer:
+        tracer.attach(interpreter)
+    collector = CoverageCollector() if args.coverage else None
+    if collector:
+        collector.attach(interpreter)
+
+    try:
+        if profiler:
+            profiler.run(code, args.file)
+        else:
+            interpreter.run(code, args.file)
+    except Exception:
+        # Сообщение об ошибке уже выведено интерпретатором
+        return 1
+    finally:
+        if profiler:
+            print(profiler.format_report(), file=sys.stderr)
+        if tracer:
+            tracer.detach()
+            print(tracer.format_report(), file=sys.stderr)
+        if collector:
+            collector.detach()
+            save_coverage(collector.data, args.coverage)
+    return 0
+
+def save_coverage(data, path):
+    """Добавляет покрытие к накопленному в файле и выводит сводку"""
+    total = CoverageData.load(path)
+    total.update(data)
+    total.save(path)
+    print("Покрытие строк:", file=sys.stderr)
+    print(total.format_report(), file=sys.stderr)
+
+def batch_command(args):
+    """Параллельно выполняет все программы каталога"""
+    report = run_directory(args.directory, workers=args.jobs, time_limit=args.time_limit,
+                           memory_limit=args.memory_limit, max_steps=args.max_steps,
+                           coverage=bool(args.coverage))
+
+    for result in report["results"]:
+        print("{:<8} {:>9.3f} с  {}".format(result["status"], result["time"], result["file"]))
+    print("Всего: {}, успешно: {}, с ошибками: {}, время: {:.3f} с".format(
+        report["total"], report["passed"], report["failed"], report["time"]))
+
+    if args.coverage:
+        save_coverage(CoverageData.from_dict(report["coverage"]), args.coverage)
+
+    if args.report:
+        write_report(report, args.report)
+        print("Отчёт сохранён: {}".format(args.report))
+
+    return 0 if report["failed"] == 0 else 1
+
+def build_command(args):
+    """Инкрементально компилирует проект в кэш"""
+    builder = ProjectBuilder(args.directory, cache_dir=args.cache_dir, workers=args.jobs)
+    report = builder.build(force=args.force)
+
+    for item in report["files"]:
+        line = "{:<10} {:>9.3f} мс  {}".format(item["status"], item["time"] * 1000,
+                                               os.path.relpath(item["file"], report["root"]))
+        if item["error"]:
+            line += "  ({})".format(item["error"])
+        print(line)
+    print("Всего: {}, скомпилировано: {}, без изменений: {}, с ошибками: {}, время: {:.3f} с".format(
+        report["total"], report["compiled"], report["unchanged"], report["errors"], report["time"]))
+
+    if args.report:
+        write_report(report, args.report)
+        print("Отчёт сохранён: {}".format(args.report))
+
+    return 0 if report["errors"] == 0 else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Интерпретатор языка AMIGA")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Запустить программу")
+    run_parser.add_argument("file", help="Файл .amiga1")
+    run_parser.add_argument("--input", help="Файл с данными для Console.Input (одна строка на вызов)")
+    run_parser.add_argument("--value", action="append",
+                            help="Значение для Console.Input (можно указать несколько раз)")
+    run_parser.add_argument("--no-cache", action="store_true", help="Не использовать кэш скомпилированных программ")
+    run_parser.add_argument("--cache-dir", help="Каталог кэша (по умолчанию ~/.amiga_cache)")
+    run_parser.add_argument("--time-limit", type=float, default=None, help="Лимит времени выполнения, с")
+    run_parser.add_argument("--max-steps", type=int, default=None, help="Лимит числа выполненных шагов")
+    run_parser.add_argument("--memory", action="store_true",
+                            help="Профилировать память (tracemalloc) и вывести отчёт по строкам")
+    run_parser.add_argument("--trace", type=int, metavar="N",
+                            help="Записывать каждый N-й оператор и вывести самые частые строки")
+    run_parser.add_argument("--coverage", metavar="FILE",
+                            help="Собрать покрытие строк и добавить его к данным в FILE (JSON)")
+    run_parser.set_defaults(handler=run_command)
+
+    batch_parser = commands.add_parser("batch", help="Выполнить все программы каталога параллельно")
+    batch_parser.add_argument("directory", help="Каталог с файлами .amiga1")
+    batch_parser.add_argument("--report", help="Файл для отчёта в формате JSON")
+    batch_parser.add_argument("--jobs", type=int, default=None, help="Число процессов (по умолчанию все ядра)")
+    batch_parser.add_argument("--time-limit", type=float, default=10.0, help="Лимит времени на программу, с")
+    batch_parser.add_argument("--memory-limit", type=float, default=256, help="Лимит памяти на процесс, МБ")
+    batch_parser.add_argument("--max-steps", type=int, default=None, help="Лимит числа шагов на программу")
+    batch_parser.add_argument("--coverage", metavar="FILE",
+                              help="Собрать покрытие строк всех запусков и добавить его к данным в FILE")
+    batch_parser.set_defaults(handler=batch_command)
+
+    build_parser = commands.add_parser("build", help="Скомпилировать проект (только изменённые файлы)")
+    build_parser.add_argument("directory", help="Каталог проекта")
+    build_parser.add_argument("--force", action="store_true", help="Пересобрать все файлы")
+    build_parser.add_argument("--jobs", type=int, default=None, help="Число процессов (по умолчанию все ядра)")
+    build_parser.add_argument("--cache-dir", help="Каталог кэша (по умолчанию ~/.amiga_cache)")
+    build_parser.add_argument("--report", help="Файл для отчёта в формате JSON")
+    build_parser.set_defaults(handler=build_command)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 # Инициализация пакета core
 from .interpreter import AMIGAInterpreter
 from .modules import ConsoleModule, TimesModule
+from .registry import ModuleRegistry
+from .inputs import ListInputProvider, FileInputProvider, StdinInputProvider
 
-__all__ = ['AMIGAInterpreter', 'ConsoleModule', 'TimesModule']
\ No newline at end of file
+__all__ = ['AMIGAInterpreter', 'ConsoleModule', 'TimesModule', 'ModuleRegistry',
+           'ListInputProvider', 'FileInputProvider', 'StdinInputProvider']
\ No newline at end of file
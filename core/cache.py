@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import marshal
+import os
+import sys
+from array import array
+
+from .compiler import Program, COMPILER_VERSION, compile_program
+
+# Расширение файлов кэша (как .pyc в __pycache__)
+CACHE_SUFFIX = '.amigac'
+
+def default_cache_dir():
+    """Каталог кэша по умолчанию: ~/.amiga_cache"""
+    return os.path.join(os.path.expanduser("~"), ".amiga_cache")
+
+def source_hash(code):
+    """Ключ кэша: хэш исходника, версии компилятора и версии Python"""
+    digest = hashlib.sha256()
+    digest.update("{}:{}.{}\0".format(COMPILER_VERSION, *sys.version_info[:2]).encode())
+    digest.update(code.encode('utf-8'))
+    return digest.hexdigest()
+
+class ProgramCache:
+    """Кэш скомпилированных программ на диске.
+
+    Каждая программа хранится в отдельном файле <хэш>.amigac. Время
+    изменения файла обновляется при каждом попадании, и при превышении
+    max_size удаляются давно не использованные файлы (LRU).
+    """
+
+    def __init__(self, directory=None, max_size=64 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key):
+        """Путь к файлу кэша для ключа"""
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def compile(self, code, filename=None):
+        """Возвращает скомпилированную программу из кэша или компилирует её"""
+        key = source_hash(code)
+        program = self.load(key)
+        if program is not None:
+            self.hits += 1
+            program.filename = filename
+            return program
+
+        self.misses += 1
+        program = compile_program(code, filename)
+        self.store(key, program)
+        return program
+
+    def load(self, key):
+        """Загружает программу по ключу или возвращает None"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as file:
+                lines, kinds, columns, block_ends, else_lines = marshal.load(file)
+            os.utime(path)  # отметка для LRU
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        return Program(list(lines), kinds, array('i', columns),
+                       array('i', block_ends), array('i', else_lines))
+
+    def store(self, key, program):
+        """Сохраняет программу в кэш (ошибки записи не мешают запуску)"""
+        data = (tuple(program.lines), program.kinds, program.columns.tobytes(),
+                program.block_ends.tobytes(), program.else_lines.tobytes())
+        path = self.path_for(key)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                marshal.dump(data, file)
+            os.replace(temp_path, path)
+        except OSError:
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Удаляет самые старые файлы, пока кэш больше max_size"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith(CACHE_SUFFIX)]
+        except OSError:
+            return
+
+        stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+        total = sum(size for _, size, _ in stats)
+        if total <= self.max_size:
+            return
+
+        for _, size, path in sorted(stats):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        """Удаляет все файлы кэша"""
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.endswith(CACHE_SUFFIX):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+
+from .compiler import (compile_program, use_target, OP_USE, OP_IN, OP_CLASS, OP_METHOD,
+                       OP_TYPED_VAR, OP_DECLARE, OP_EACH, OP_FOR, OP_WHILE, OP_IF, OP_CALL, BLOCK_OPS)
+from .registry import default_registry
+
+# Важность сообщений проверки
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+# Строковый литерал в кавычках
+STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+# Имя, перед которым нет точки (после точки идут методы: numbers.length())
+NAME_RE = re.compile(r'(?<![\w.])[A-Za-z_]\w*')
+
+# Слова языка, которые не являются именами переменных
+KEYWORDS = frozenset([
+    'if', 'then', 'elsif', 'else', 'while', 'for', 'each', 'break', 'continue',
+    'return', 'global', 'local', 'private', 'public', 'class', 'define', 'true',
+    'false', 'in', 'int', 'float', 'string', 'array', '_all'
+])
+
+# Числовые типы переменных
+NUMERIC_TYPES = ('int', 'float')
+
+class Diagnostic:
+    """Сообщение статической проверки: строка и столбцы (с 1), текст и важность"""
+
+    def __init__(self, line, column, end_column, message, severity=SEVERITY_WARNING):
+        self.line = line
+        self.column = column
+        self.end_column = end_column
+        self.message = message
+        self.severity = severity
+
+    def __repr__(self):
+        return "Diagnostic({}:{}, {!r})".format(self.line, self.column, self.message)
+
+class UnitInfo:
+    """Результат проверки одного блока (метода или группы строк).
+
+    Номера строк хранятся относительно первой строки блока, поэтому
+    результат остаётся верным, когда блок сдвигается при правке выше.
+    """
+
+    def __init__(self):
+        self.diagnostics = []  # (строка, столбец, конец, текст, важность)
+        self.definitions = {}  # имя -> тип (None для >> и переменных цикла)
+        self.classes = set()   # имена классов и методов
+        self.names = []        # использования имён: (строка, столбец, конец, имя)
+        self.typed_refs = []   # объявления вида local int a = b: (строка, столбец, конец, тип, b)
+        self.modules = []      # @use и @in: (строка, столбец, конец, имя)
+        # Скобки без пары внутри блока: сначала идут все лишние }, потом {
+        self.close_braces = []
+        self.open_braces = []
+
+def blank_strings(text):
+    """Заменяет строки пробелами, оставляя выражения из {} в интерполяции.
+
+    Длина текста сохраняется, поэтому позиции имён не сдвигаются.
+    """
+    def replace(match):
+        literal = match.group(0)
+        if text[match.start() - 1:match.start()] != '$':
+            return ' ' * len(literal)
+        chars = []
+        depth = 0
+        for char in literal:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            chars.append(char if depth > 0 and char != '{' else ' ')
+        return ''.join(chars)
+    return STRING_RE.sub(replace, text)
+
+def literal_type(expr):
+    """Тип значения-литерала или None, если это не литерал"""
+    if expr.startswith('$"') or (expr.startswith('"') and expr.endswith('"')):
+        return 'string'
+    if expr.isdigit():
+        return 'int'
+    if expr.replace('.', '', 1).isdigit():
+        return 'float'
+    if expr.startswith('['):
+        return 'array'
+    return None
+
+def is_number(text):
+    """Приводится ли строка к числу так же, как в интерпретаторе"""
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+def split_units(program):
+    """Делит программу на блоки для инкрементальной проверки.
+
+    Каждый метод и каждый блок верхнего уровня - отдельный блок; строки
+    между ними (заголовки классов, объявления, закрывающие скобки)
+    собираются в группы.
+    """
+    units = []
+    count = len(program)
+    chunk_start = None
+    i = 0
+    while i < count:
+        kind = program.kinds[i]
+        end = program.block_ends[i]
+        if kind in BLOCK_OPS and kind != OP_CLASS and end >= 0:
+            if chunk_start is not None:
+                units.append((chunk_start, i))
+                chunk_start = None
+            stop = min(end + 1, count)
+            units.append((i, stop))
+            i = stop
+            continue
+        if chunk_start is None:
+            chunk_start = i
+        i += 1
+    if chunk_start is not None:
+        units.append((chunk_start, count))
+    return units
+
+def scan_braces(info, row, offset, line):
+    """Записывает в info скобки строки, не нашедшие пары внутри блока"""
+    line = blank_strings(line)
+    comment = line.find('//')
+    if comment >= 0:
+        line = line[:comment]
+    for position, char in enumerate(line):
+        if char == '{':
+            info.open_braces.append((row, offset + position))
+        elif char == '}':
+            if info.open_braces:
+                info.open_braces.pop()
+            else:
+                info.close_braces.append((row, offset + position))
+
+class StaticChecker:
+    """Статическая проверка программы AMIGA.
+
+    Проверяет неопределённые переменные, баланс фигурных скобок,
+    неизвестные модули в @use и несовпадение типов в объявлениях
+    local int/float/string. Результаты проверки блоков кэшируются по их
+    тексту, поэтому после правки заново проверяется только изменённый
+    метод, а остальные блоки берутся из кэша.
+    """
+
+    def __init__(self, registry=default_registry):
+        self.registry = registry
+        self.units = {}          # (текст блока, отступы) -> UnitInfo
+        self.includes = {}       # путь -> (mtime, имена, определённые в файле)
+        self.checked_units = 0   # сколько блоков проверено заново при последнем вызове
+
+    def check(self, code, filename=None):
+        """Возвращает список Diagnostic, отсортированный по позиции"""
+        program = compile_program(code, filename)
+        units = {}
+        infos = []
+        self.checked_units = 0
+        for start, stop in split_units(program):
+            key = ("\n".join(program.lines[start:stop]), program.columns[start:stop].tobytes())
+            info = units.get(key) or self.units.get(key)
+            if info is None:
+                info = self.check_unit(program, start, stop)
+                self.checked_units += 1
+            units[key] = info
+            infos.append((start, info))
+        # В кэше остаются только блоки текущей версии текста
+        self.units = units
+
+        diagnostics = []
+        types = {}
+        known = set()
+        open_braces = []
+        for start, info in infos:
+            # Скобки без пары в блоке сопоставляются с незакрытыми скобками предыдущих блоков
+            for line, column in info.close_braces:
+                if open_braces:
+                    open_braces.pop()
+                else:
+                    diagnostics.append(Diagnostic(start + line + 1, column, column + 1,
+                                                  "Лишняя закрывающая скобка }", SEVERITY_ERROR))
+            open_braces.extend((start + line, column) for line, column in info.open_braces)
+            for name, var_type in info.definitions.items():
+                if types.get(name) is None:
+                    types[name] = var_type
+            known.update(info.classes)
+            for line, column, end, message, severity in info.diagnostics:
+                diagnostics.append(Diagnostic(start + line + 1, column, end, message, severity))
+
+        for line, column in open_braces:
+            diagnostics.append(Diagnostic(line + 1, column, column + 1, "Скобка { не закрыта", SEVERITY_ERROR))
+
+        base = os.path.dirname(os.path.abspath(filename)) if filename else os.getcwd()
+        for start, info in infos:
+            for line, column, end, name in info.modules:
+                problem = self.resolve_module(name, base, known)
+                if problem:
+                    diagnostics.append(Diagnostic(start + line + 1, column, end, problem, SEVERITY_ERROR))
+
+        for start, info in infos:
+            for line, column, end, name in info.names:
+                if name not in types and name not in known and not self.is_module(name, known):
+                    diagnostics.append(Diagnostic(start + line + 1, column, end,
+                                                  "Переменная не определена: {}".format(name)))
+            for line, column, end, var_type, source in info.typed_refs:
+                source_type = types.get(source)
+                if source_type and self.mismatch(var_type, source_type):
+                    diagnostics.append(Diagnostic(
+                        start + line + 1, column, end,
+                        "Переменная {} имеет тип {}, а объявляется {}".format(source, source_type, var_type)))
+
+        diagnostics.sort(key=lambda item: (item.line, item.column))
+        return diagnostics
+
+    def is_module(self, name, known):
+        """Является ли имя модулем (найденные модули запоминаются в known)"""
+        if self.registry.factory(name) is not None:
+            known.add(name)
+            return True
+        return False
+
+    def resolve_module(self, name, base, known):
+        """Проверяет цель @use; имена подключённых файлов добавляются в known.
+
+        Возвращает текст ошибки или None.
+        """
+        if name.endswith('.amiga1'):
+            path = os.path.abspath(os.path.join(base, name))
+            if not os.path.isfile(path):
+                return "Файл модуля не найден: {}".format(name)
+        elif self.is_module(name, known):
+            return None
+        else:
+            path = os.path.abspath(os.path.join(base, name + '.amiga1'))
+            if not os.path.isfile(path):
+                return "Неизвестный модуль: {}".format(name)
+        known.update(self.include_names(path))
+        return None
+
+    def include_names(self, path):
+        """Имена переменных и классов, определённых в подключаемом файле"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return ()
+        cached = self.includes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        names = set()
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                program = compile_program(file.read(), path)
+        except (OSError, UnicodeDecodeError):
+            return names
+        for start, stop in split_units(program):
+            info = self.check_unit(program, start, stop)
+            names.update(info.definitions)
+            names.update(info.classes)
+        self.includes[path] = (mtime, names)
+        return names
+
+    def mismatch(self, var_type, value_type):
+        """Несовместимы ли тип переменной и тип значения"""
+        if var_type not in NUMERIC_TYPES + ('string',) or value_type not in NUMERIC_TYPES + ('string',):
+            return False
+        return (var_type == 'string') != (value_type == 'string')
+
+    def check_unit(self, program, start, stop):
+        """Проверяет строки [start, stop) и возвращает UnitInfo"""
+        info = UnitInfo()
+        for index in range(start, stop):
+            line = program.lines[index]
+            kind = program.kinds[index]
+            offset = program.columns[index]
+            row = index - start
+            if '{' in line or '}' in line:
+                scan_braces(info, row, offset, line)
+
+            if kind == OP_USE:
+                name = use_target(line)
+                if name:
+                    position = line.find(name)
+                    info.modules.append((row, offset + position, offset + position + len(name), name))
+            elif kind == OP_IN:
+                parts = line.split()
+                if len(parts) >= 2:
+                    name = parts[1].split('.')[0]
+                    position = line.find(name)
+                    info.modules.append((row, offset + position, offset + position + len(name), name))
+            elif kind == OP_CLASS:
+                parts = line.split()
+                if len(parts) >= 4:
+                    info.classes.add(parts[3].rstrip('{').strip())
+            elif kind == OP_METHOD:
+                parts = line.split()
+                if len(parts) >= 3:
+                    info.classes.add(parts[2].split('(')[0])
+            elif kind == OP_TYPED_VAR:
+                self.check_typed_variable(info, row, offset, line)
+            elif kind == OP_DECLARE:
+                var_part = line.split('>>', 1)[1]
+                if '=' in var_part:
+                    name, value = var_part.split('=', 1)
+                    info.definitions.setdefault(name.strip(), None)
+                    self.add_names(info, row, offset + line.find('=') + 1, value.rstrip().rstrip(';'))
+            elif kind == OP_CALL:
+                self.add_names(info, row, offset, line.rstrip(';'))
+            elif kind in (OP_IF, OP_EACH, OP_WHILE):
+                keyword_length = line.find(' ') + 1
+                end = line.find('{')
+                self.add_names(info, row, offset + keyword_length,
+                               line[keyword_length:end if end >= 0 else len(line)])
+            elif kind == OP_FOR:
+                end = line.find('{')
+                content = line[4:end if end >= 0 else len(line)]
+                if ' in ' in content:
+                    name, iterable = content.split(' in ', 1)
+                    info.definitions.setdefault(name.strip(' ('), None)
+                    self.add_names(info, row, offset + 4 + len(name) + 4, iterable)
+        return info
+
+    def check_typed_variable(self, info, row, offset, line):
+        """local int name = value; - определение переменной и проверка типа значения"""
+        parts = line.split('=', 1)
+        declaration = parts[0].split()
+        if len(declaration) < 3:
+            # local last = ... интерпретатор не выполняет: нет типа
+            info.diagnostics.append((row, offset, offset + len(parts[0].rstrip()),
+                                     "В объявлении не указан тип переменной", SEVERITY_WARNING))
+            if len(parts) > 1:
+                self.add_names(info, row, offset + len(parts[0]) + 1, parts[1].rstrip().rstrip(';'))
+            return
+
+        var_type, name = declaration[1], declaration[2]
+        info.definitions[name] = var_type
+        if len(parts) < 2:
+            return
+
+        value_start = len(parts[0]) + 1
+        raw_value = parts[1].rstrip().rstrip(';')
+        value = raw_value.strip()
+        column = offset + value_start + len(raw_value) - len(raw_value.lstrip())
+        end = column + len(value)
+        self.add_names(info, row, offset + value_start, raw_value)
+
+        value_type = literal_type(value)
+        if value_type == 'string' and var_type in NUMERIC_TYPES and not value.startswith('$'):
+            if not is_number(value[1:-1]):
+                info.diagnostics.append((row, column, end,
+                                         "Строка не приводится к {}: значение будет 0".format(var_type),
+                                         SEVERITY_WARNING))
+        elif value_type in NUMERIC_TYPES and var_type == 'string':
+            info.diagnostics.append((row, column, end, "Число присваивается переменной типа string",
+                                     SEVERITY_WARNING))
+        elif value_type == 'float' and var_type == 'int':
+            info.diagnostics.append((row, column, end, "Дробная часть будет отброшена",
+                                     SEVERITY_WARNING))
+        elif value_type is None and NAME_RE.fullmatch(value):
+            info.typed_refs.append((row, column, end, var_type, value))
+
+    def add_names(self, info, row, column, expr):
+        """Записывает имена переменных из выражения, начинающегося в столбце column"""
+        for match in NAME_RE.finditer(blank_strings(expr)):
+            name = match.group(0)
+            if name not in KEYWORDS:
+                info.names.append((row, column + match.start(), column + match.end(), name))
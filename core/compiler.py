@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+from array import array
+
+# Версия формата скомпилированной программы (меняется вместе с компилятором)
+COMPILER_VERSION = 2
+
+# Виды операторов: индексы в таблице диспетчеризации интерпретатора
+OP_NOP = 0        # пустая строка, комментарий, закрывающая скобка
+OP_USE = 1        # @use Console;
+OP_IN = 2         # @in Times.Loops @use _all;
+OP_CLASS = 3      # private local class App {
+OP_METHOD = 4     # global define OnRun() {
+OP_TYPED_VAR = 5  # local string name = ...;
+OP_DECLARE = 6    # >> name = ...;
+OP_EACH = 7
+OP_FOR = 8
+OP_WHILE = 9
+OP_IF = 10
+OP_ELSE = 11
+OP_BREAK = 12
+OP_CONTINUE = 13
+OP_CALL = 14      # Console.Print(...); numbers.push(6);
+
+OP_COUNT = 15
+
+# Операторы, у которых есть тело в фигурных скобках
+BLOCK_OPS = (OP_CLASS, OP_METHOD, OP_EACH, OP_FOR, OP_WHILE, OP_IF, OP_ELSE)
+
+class Program:
+    """Скомпилированная программа AMIGA.
+
+    Данные хранятся параллельными массивами по строкам исходника:
+    lines - текст строки без отступов, kinds - вид оператора,
+    columns - столбец начала оператора (с 1), block_ends - индекс строки,
+    закрывающей тело блока (-1, если тела нет), else_lines - индекс строки
+    else для if (-1, если else нет). Индекс в массивах на 1 меньше номера
+    строки в файле, поэтому позиции ошибок берутся без отдельной карты.
+    """
+
+    def __init__(self, lines, kinds, columns, block_ends, else_lines, filename=None):
+        self.lines = lines
+        self.kinds = kinds
+        self.columns = columns
+        self.block_ends = block_ends
+        self.else_lines = else_lines
+        self.filename = filename
+
+    def __len__(self):
+        return len(self.lines)
+
+    def position(self, index):
+        """Номер строки и столбец оператора с индексом index"""
+        return index + 1, self.columns[index]
+
+def classify(line):
+    """Определяет вид оператора в строке (порядок проверок как в интерпретаторе)"""
+    if not line or line.startswith('//'):
+        return OP_NOP
+    if line.startswith('@use'):
+        return OP_USE
+    if line.startswith('@in'):
+        return OP_IN
+    if 'class' in line:
+        return OP_CLASS
+    if 'define' in line:
+        return OP_METHOD
+    if line.startswith(('local ', 'global ')):
+        return OP_TYPED_VAR
+    if '>>' in line:
+        return OP_DECLARE
+    if line.startswith('each '):
+        return OP_EACH
+    if line.startswith('for '):
+        return OP_FOR
+    if line.startswith('while '):
+        return OP_WHILE
+    if line.startswith('if '):
+        return OP_IF
+    if line.startswith('else'):
+        return OP_ELSE
+    if line.startswith('break'):
+        return OP_BREAK
+    if line.startswith('continue'):
+        return OP_CONTINUE
+    if '(' in line:
+        return OP_CALL
+    return OP_NOP
+
+def use_target(line):
+    """Имя из строки @use: модуль или путь к файлу .amiga1 (None, если имени нет)"""
+    parts = line.split(None, 1)
+    if len(parts) < 2:
+        return None
+    return parts[1].rstrip(';').strip().strip('"')
+
+def compile_program(code, filename=None):
+    """Компилирует текст программы в Program"""
+    source_lines = code.split('\n')
+    lines = [line.strip() for line in source_lines]
+    columns = array('i', [len(raw) - len(raw.lstrip()) + 1 for raw in source_lines])
+    kinds = bytes(classify(line) for line in lines)
+    count = len(lines)
+
+    # Конец блока - первая следующая строка, после которой баланс скобок
+    # становится меньше, чем после открывающей строки
+    block_ends = array('i', [-1]) * count
+    open_blocks = []  # стек (баланс после строки, индекс строки)
+    depth = 0
+    for i, line in enumerate(lines):
+        depth += line.count('{') - line.count('}')
+        while open_blocks and depth < open_blocks[-1][0]:
+            block_ends[open_blocks.pop()[1]] = i
+
+        kind = kinds[i]
+        if kind in BLOCK_OPS and (kind != OP_ELSE or '{' in line):
+            open_blocks.append((depth, i))
+
+    # Незакрытые блоки продолжаются до конца программы
+    for _, i in open_blocks:
+        block_ends[i] = count
+
+    # Для каждого if находим else, идущий сразу после его тела
+    else_lines = array('i', [-1]) * count
+    for i in range(count):
+        if kinds[i] == OP_IF:
+            j = block_ends[i] + 1
+            while j < count and kinds[j] == OP_NOP and not lines[j].startswith('}'):
+                j += 1
+            if j < count and kinds[j] == OP_ELSE:
+                else_lines[i] = j
+
+    return Program(lines, kinds, columns, block_ends, else_lines, filename)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+from .compiler import OP_NOP
+
+# Версия формата файла с данными покрытия
+COVERAGE_VERSION = 1
+
+# Имя, под которым хранится покрытие программы без файла (новая вкладка IDE)
+UNNAMED_FILE = "<без имени>"
+
+class LineCoverage:
+    """Покрытие строк одного файла.
+
+    executable и covered - битовые карты по индексам строк (бит i
+    относится к строке i + 1), размер которых определяется числом строк.
+    """
+
+    def __init__(self, line_count, executable=None, covered=None):
+        size = (line_count + 7) // 8
+        self.line_count = line_count
+        self.executable = bytearray(executable) if executable else bytearray(size)
+        self.covered = bytearray(covered) if covered else bytearray(size)
+
+    @classmethod
+    def for_program(cls, program):
+        """Пустое покрытие с картой исполняемых строк программы"""
+        coverage = cls(len(program))
+        for index, kind in enumerate(program.kinds):
+            if kind != OP_NOP:
+                coverage.executable[index >> 3] |= 1 << (index & 7)
+        return coverage
+
+    def mark(self, index):
+        """Отмечает строку с индексом index как выполненную"""
+        self.covered[index >> 3] |= 1 << (index & 7)
+
+    def merge(self, other):
+        """Объединяет покрытие другого запуска того же файла"""
+        if other.line_count != self.line_count:
+            raise ValueError("Число строк не совпадает: файл изменился между запусками")
+        size = len(self.covered)
+        self.covered = bytearray((int.from_bytes(self.covered, 'little') |
+                                  int.from_bytes(other.covered, 'little')).to_bytes(size, 'little'))
+        self.executable = bytearray((int.from_bytes(self.executable, 'little') |
+                                     int.from_bytes(other.executable, 'little')).to_bytes(size, 'little'))
+
+    def lines(self, bits):
+        """Номера строк, для которых установлен бит"""
+        return [index + 1 for index in range(self.line_count)
+                if bits[index >> 3] >> (index & 7) & 1]
+
+    def covered_lines(self):
+        """Выполненные исполняемые строки (пустые строки и комментарии не считаются)"""
+        return self.lines(bytes(e & c for e, c in zip(self.executable, self.covered)))
+
+    def uncovered_lines(self):
+        """Исполняемые, но не выполненные строки"""
+        missing = bytes(e & ~c & 0xFF for e, c in zip(self.executable, self.covered))
+        return self.lines(missing)
+
+    def percent(self):
+        """Процент выполненных исполняемых строк"""
+        executable = sum(bin(byte).count('1') for byte in self.executable)
+        if not executable:
+            return 100.0
+        covered = sum(bin(e & c).count('1') for e, c in zip(self.executable, self.covered))
+        return covered * 100.0 / executable
+
+    def to_dict(self):
+        return {"lines": self.line_count, "executable": self.executable.hex(),
+                "covered": self.covered.hex()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["lines"], bytes.fromhex(data["executable"]), bytes.fromhex(data["covered"]))
+
+class CoverageData:
+    """Покрытие набора файлов, которое можно объединять между запусками"""
+
+    def __init__(self):
+        self.files = {}  # путь -> LineCoverage
+
+    def add(self, filename, coverage):
+        """Добавляет покрытие файла, объединяя его с уже собранным"""
+        existing = self.files.get(filename)
+        if existing is None or existing.line_count != coverage.line_count:
+            self.files[filename] = coverage
+        else:
+            existing.merge(coverage)
+
+    def update(self, other):
+        """Объединяет с другим набором"""
+        for filename, coverage in other.files.items():
+            self.add(filename, coverage)
+
+    def to_dict(self):
+        return {"version": COVERAGE_VERSION,
+                "files": {name: coverage.to_dict() for name, coverage in self.files.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        result = cls()
+        if data.get("version") == COVERAGE_VERSION:
+            for name, coverage in data.get("files", {}).items():
+                result.files[name] = LineCoverage.from_dict(coverage)
+        return result
+
+    def save(self, path):
+        """Сохраняет данные покрытия в JSON"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """Загружает данные покрытия из JSON (пустые, если файла нет)"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls.from_dict(json.load(file))
+
+    def format_report(self):
+        """Текстовый отчёт по файлам"""
+        lines = []
+        for name in sorted(self.files):
+            coverage = self.files[name]
+            lines.append("{:>6.1f}%  {}".format(coverage.percent(), name))
+        return "\n".join(lines)
+
+class CoverageCollector:
+    """Собирает покрытие строк во время выполнения через хук on_statement"""
+
+    def __init__(self):
+        self.data = CoverageData()
+        self.programs = {}  # id(program) -> (program, LineCoverage)
+        self.interpreter = None
+
+    def attach(self, interpreter):
+        """Подписывается на операторы интерпретатора"""
+        self.interpreter = interpreter
+        interpreter.add_hook("on_statement", self.on_statement)
+
+    def detach(self):
+        """Отписывается и переносит собранное покрытие в data"""
+        if self.interpreter:
+            self.interpreter.remove_hook("on_statement", self.on_statement)
+            self.interpreter = None
+        for program, coverage in self.programs.values():
+            self.data.add(program.filename or UNNAMED_FILE, coverage)
+        self.programs.clear()
+
+    def on_statement(self, program, index):
+        """Отмечает строку как выполненную"""
+        entry = self.programs.get(id(program))
+        if entry is None:
+            entry = self.programs[id(program)] = (program, LineCoverage.for_program(program))
+        entry[1].mark(index)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import time
+
+from .compiler import Program, OP_NOP
+from .errors import AMIGAStopped
+
+# Действия, которые возвращает обработчик паузы
+DEBUG_STEP = "step"
+DEBUG_CONTINUE = "continue"
+DEBUG_STOP = "stop"
+
+class Debugger:
+    """Отладчик программ AMIGA: точки останова и пошаговое выполнение.
+
+    Отладчик подписывается на on_statement только на время отладочного
+    запуска, поэтому обычные запуски идут без проверок. Точки останова
+    хранятся битовой картой по индексам строк программы.
+    """
+
+    def __init__(self, interpreter, on_pause, breakpoints=()):
+        self.interpreter = interpreter
+        self.on_pause = on_pause  # on_pause(program, index) -> DEBUG_STEP / DEBUG_CONTINUE / DEBUG_STOP
+        self.breakpoint_lines = set(breakpoints)  # номера строк (с 1)
+        self.breakpoints = bytearray()
+        self.program = None
+        self.stepping = False
+
+    def run(self, code, filename=None, step=False):
+        """Запускает программу под отладчиком"""
+        interpreter = self.interpreter
+        program = code if isinstance(code, Program) else interpreter.compile(code, filename)
+        self.program = program
+        self.stepping = step
+
+        # Битовая карта: 1 для строк с точкой останова
+        self.breakpoints = bytearray(len(program))
+        for line in self.breakpoint_lines:
+            if 1 <= line <= len(program):
+                self.breakpoints[line - 1] = 1
+
+        interpreter.add_hook("on_statement", self.on_statement)
+        try:
+            interpreter.run(program)
+        finally:
+            interpreter.remove_hook("on_statement", self.on_statement)
+
+    def on_statement(self, program, index):
+        """Останавливается на точке останова или после шага"""
+        if program is not self.program or program.kinds[index] == OP_NOP:
+            return
+        if not (self.stepping or self.breakpoints[index]):
+            return
+
+        # Показываем весь вывод до точки остановки
+        self.interpreter.flush_output()
+
+        # Время паузы не засчитывается в лимит времени выполнения
+        started = time.monotonic()
+        action = self.on_pause(program, index)
+        if self.interpreter.deadline is not None:
+            self.interpreter.deadline += time.monotonic() - started
+
+        if action == DEBUG_STOP:
+            raise AMIGAStopped("Выполнение остановлено", *program.position(index), program.filename)
+        self.stepping = action == DEBUG_STEP
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+class AMIGAError(Exception):
+    """Ошибка выполнения программы AMIGA с позицией в исходнике"""
+    
+    def __init__(self, message, line=None, column=None, filename=None):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+        self.filename = filename
+    
+    def format(self):
+        """Сообщение вида 'Ошибка в строке 5, столбец 9: ...'"""
+        where = "Ошибка"
+        if self.filename:
+            where += " в {}".format(self.filename)
+        if self.line is not None:
+            where += ", строка {}".format(self.line) if self.filename else " в строке {}".format(self.line)
+            if self.column is not None:
+                where += ", столбец {}".format(self.column)
+        return "{}: {}".format(where, self.message)
+
+class AMIGARuntimeError(AMIGAError):
+    """Ошибка, возникшая при выполнении оператора"""
+
+class AMIGAInterrupt(AMIGAError):
+    """Выполнение прервано извне; циклы программы не перехватывают его"""
+
+class AMIGALimitError(AMIGAInterrupt):
+    """Программа превысила лимит шагов или времени выполнения"""
+
+class AMIGAStopped(AMIGAInterrupt):
+    """Выполнение остановлено пользователем (например, из отладчика)"""
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .runner import find_programs
+
+# Сколько совпадений показывать в одном файле
+MAX_MATCHES_PER_FILE = 1000
+
+# Сколько последних запросов помнить для каждого файла
+QUERIES_PER_FILE = 16
+
+class SearchMatch:
+    """Совпадение в файле: строка с 1, столбец и длина в символах"""
+    __slots__ = ("path", "line", "column", "length", "text")
+
+    def __init__(self, path, line, column, length, text):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.length = length
+        self.text = text
+
+    def __repr__(self):
+        return "{}:{}:{}: {}".format(self.path, self.line, self.column + 1, self.text)
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Компилирует запрос; возвращает (шаблон, binary).
+
+    Простой текст ищется прямо в байтах отображённого файла. Регулярные
+    выражения и поиск без учёта регистра по не-ASCII тексту требуют
+    декодирования: байтовые re не знают кириллических \\w и регистров.
+    """
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    if not regex and (case_sensitive or query.isascii()):
+        return re.compile(re.escape(query).encode('utf-8'), flags), True
+    return re.compile(query if regex else re.escape(query), flags), False
+
+def scan_bytes(path, data, pattern, limit=MAX_MATCHES_PER_FILE):
+    """Совпадения байтового шаблона в буфере data (UTF-8)"""
+    matches = []
+    line = 1
+    last = 0
+    for match in pattern.finditer(data):
+        start, end = match.start(), match.end()
+        if start == end:
+            continue
+        line += data[last:start].count(b'\n')
+        last = start
+        line_start = data.rfind(b'\n', 0, start) + 1
+        line_end = data.find(b'\n', start)
+        if line_end < 0:
+            line_end = len(data)
+        text = data[line_start:line_end].decode('utf-8', errors='replace').rstrip('\r')
+        column = len(data[line_start:start].decode('utf-8', errors='replace'))
+        length = len(data[start:end].decode('utf-8', errors='replace'))
+        matches.append(SearchMatch(path, line, column, length, text))
+        if len(matches) >= limit:
+            break
+    return matches
+
+def scan_text(path, text, pattern, limit=MAX_MATCHES_PER_FILE):
+    """Совпадения строкового шаблона в тексте"""
+    matches = []
+    line = 1
+    last = 0
+    for match in pattern.finditer(text):
+        start, end = match.start(), match.end()
+        if start == end:
+            continue
+        line += text.count('\n', last, start)
+        last = start
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end < 0:
+            line_end = len(text)
+        matches.append(SearchMatch(path, line, start - line_start, end - start,
+                                   text[line_start:line_end].rstrip('\r')))
+        if len(matches) >= limit:
+            break
+    return matches
+
+def scan_file(path, pattern, binary, limit=MAX_MATCHES_PER_FILE):
+    """Ищет шаблон в файле, читая его через mmap"""
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if binary:
+                return scan_bytes(path, data, pattern, limit)
+            return scan_text(path, data[:].decode('utf-8', errors='replace'), pattern, limit)
+
+class ProjectSearch:
+    """Поиск по всем файлам .amiga1 проекта.
+
+    Файлы просматриваются в пуле потоков (re и mmap отпускают GIL на
+    больших буферах), результаты отдаются по мере готовности. Для каждого
+    файла запоминаются результаты последних запросов вместе с временем
+    изменения и размером, так что повторный поиск по неизменённым файлам
+    обходится одним os.stat на файл.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 2)
+        self.cache = {}  # путь -> (mtime_ns, размер, OrderedDict запрос -> совпадения)
+        self.lock = threading.Lock()
+
+    def search(self, root, query, regex=False, case_sensitive=False, stop_event=None):
+        """Генерирует (путь, совпадения) для файлов с совпадениями по мере готовности.
+
+        Ошибка в регулярном выражении поднимается как re.error до начала поиска.
+        """
+        pattern, binary = compile_query(query, regex, case_sensitive)
+        key = (query, regex, case_sensitive)
+        paths = find_programs(root)
+        self.prune(paths)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="amiga-search") as pool:
+            futures = [pool.submit(self.search_file, path, key, pattern, binary) for path in paths]
+            try:
+                for future in as_completed(futures):
+                    if stop_event is not None and stop_event.is_set():
+                        break
+                    matches = future.result()
+                    if matches:
+                        yield matches[0].path, matches
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def search_file(self, path, key, pattern, binary):
+        """Совпадения в одном файле (из кэша, если файл не менялся)"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        with self.lock:
+            entry = self.cache.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                results = entry[2]
+                if key in results:
+                    results.move_to_end(key)
+                    return results[key]
+            else:
+                entry = self.cache[path] = (stat.st_mtime_ns, stat.st_size, OrderedDict())
+
+        try:
+            matches = scan_file(path, pattern, binary)
+        except (OSError, ValueError):
+            return []
+
+        with self.lock:
+            results = entry[2]
+            results[key] = matches
+            while len(results) > QUERIES_PER_FILE:
+                results.popitem(last=False)
+        return matches
+
+    def prune(self, paths):
+        """Забывает файлы, которых больше нет в проекте"""
+        keep = set(paths)
+        with self.lock:
+            for path in list(self.cache):
+                if path not in keep:
+                    del self.cache[path]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import sys
+
+class ListInputProvider:
+    """Источник ввода для Console.Input из заранее заданного списка строк"""
+    
+    def __init__(self, values):
+        self.values = list(values)
+        self.position = 0
+    
+    def __call__(self, prompt=""):
+        """Возвращает следующее значение"""
+        if self.position >= len(self.values):
+            raise EOFError("Нет данных для Console.Input")
+        
+        value = self.values[self.position]
+        self.position += 1
+        return value
+    
+    def reset(self):
+        """Начинает чтение значений сначала"""
+        self.position = 0
+
+class FileInputProvider(ListInputProvider):
+    """Источник ввода из текстового файла: одна строка на каждый Console.Input"""
+    
+    def __init__(self, path, encoding='utf-8'):
+        with open(path, 'r', encoding=encoding) as file:
+            super().__init__(file.read().splitlines())
+        self.path = path
+
+class StdinInputProvider:
+    """Построчное чтение из стандартного ввода (для командной строки)"""
+    
+    def __init__(self, stream=None):
+        self.stream = stream
+    
+    def __call__(self, prompt=""):
+        """Читает одну строку из потока"""
+        # Приглашение уже выведено модулем Console, показываем его до чтения
+        sys.stdout.flush()
+        
+        line = (self.stream or sys.stdin).readline()
+        if not line:
+            raise EOFError("Нет данных для Console.Input")
+        return line.rstrip('\r\n')
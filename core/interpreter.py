@@ -1,128 +1,415 @@
 # -*- coding: utf-8 -*-
+import os
 import re
+import sys
 import time
-from .modules import ConsoleModule, TimesModule
+from .modules import ConsoleModule
+from .registry import default_registry
+from .errors import AMIGAError, AMIGARuntimeError, AMIGAInterrupt, AMIGALimitError
+from .compiler import (Program, compile_program, use_target, OP_COUNT, OP_USE, OP_IN,
+                       OP_CLASS, OP_METHOD, OP_TYPED_VAR, OP_DECLARE, OP_EACH, OP_FOR,
+                       OP_WHILE, OP_IF, OP_ELSE, OP_BREAK, OP_CONTINUE, OP_CALL)
+
+# Начало вызова метода модуля: Console.Print(, Times.Range(
+MODULE_CALL_RE = re.compile(r'([A-Za-z_]\w*)\.([A-Za-z]\w*)\(')
+
+# Маркер отсутствующей записи в кэше мест вызова
+UNRESOLVED = object()
+
+# Сколько мест вызова хранить между запусками до очистки кэша
+MAX_CALL_SITES = 10000
+
+# Как часто (в шагах) проверять лимит времени выполнения
+LIMIT_CHECK_INTERVAL = 1024
+
+# События, на которые можно подписаться через add_hook()
+HOOK_EVENTS = ("on_statement", "on_call", "on_loop_iteration")
+
+def find_closing_paren(text, open_pos):
+    """Возвращает позицию скобки, закрывающей скобку в open_pos, или -1"""
+    depth = 0
+    in_string = False
+    for pos in range(open_pos, len(text)):
+        char = text[pos]
+        if char == '"':
+            in_string = not in_string
+        elif in_string:
+            continue
+        elif char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if depth == 0:
+                return pos
+    return -1
+
+def split_arguments(args_str):
+    """Разбивает аргументы вызова по запятым верхнего уровня"""
+    args = []
+    depth = 0
+    in_string = False
+    current = ""
+    for char in args_str:
+        if char == '"':
+            in_string = not in_string
+        elif not in_string:
+            if char in '([{':
+                depth += 1
+            elif char in ')]}':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                args.append(current.strip())
+                current = ""
+                continue
+        current += char
+    if current.strip():
+        args.append(current.strip())
+    return args
+
+def write_stdout(text):
+    """Вывод в стандартный поток без добавления перевода строки"""
+    sys.stdout.write(text)
 
 class AMIGAInterpreter:
     """Интерпретатор языка AMIGA"""
     
-    def __init__(self):
+    def __init__(self, flush_policy=ConsoleModule.FLUSH_BLOCK, block_size=4096, registry=None):
         self.variables = {}  # локальные переменные
         self.global_vars = {}  # глобальные переменные
         self.classes = {}
         self.current_class = None
         self.current_method = None
-        self.output_callback = print
+        self.output_callback = write_stdout
         self.input_callback = input
         
-        # Модули
-        self.modules = {
-            "Console": ConsoleModule(self.output, self.input),
-            "Times": TimesModule(self.output)
-        }
+        # Модули создаются из реестра при первом @use или первом вызове
+        self.registry = registry or default_registry
+        self.flush_policy = flush_policy
+        self.block_size = block_size
+        self.modules = {}
+        self.call_sites = {}  # кэш мест вызова: выражение -> (метод, аргументы)
         self.imported_modules = set()
         
+        # Файлы .amiga1, подключённые через @use: скомпилированные программы
+        # (путь -> (mtime, размер, Program)) и уже выполненные в этом запуске
+        self.file_programs = {}
+        self.loaded_files = set()
+        
         # Управление циклами
         self.loop_break = False
         self.loop_continue = False
         
+        # Кэш скомпилированных программ (core.cache.ProgramCache или None)
+        self.program_cache = None
+        
+        # Лимиты выполнения: число шагов и время в секундах (None - без лимита)
+        self.max_steps = None
+        self.time_limit = None
+        self.steps_left = sys.maxsize  # шагов до следующей проверки лимитов
+        self.budget_left = None  # шагов бюджета сверх текущей порции
+        self.deadline = None
+        
+        # Таблица диспетчеризации: вид оператора -> обработчик
+        self.dispatch = [self.handle_nop] * OP_COUNT
+        self.dispatch[OP_USE] = self.handle_use
+        self.dispatch[OP_IN] = self.handle_in
+        self.dispatch[OP_CLASS] = self.handle_class
+        self.dispatch[OP_METHOD] = self.handle_method
+        self.dispatch[OP_TYPED_VAR] = self.handle_typed_statement
+        self.dispatch[OP_DECLARE] = self.handle_declaration_statement
+        self.dispatch[OP_EACH] = self.handle_each_loop
+        self.dispatch[OP_FOR] = self.handle_for_loop
+        self.dispatch[OP_WHILE] = self.handle_while_loop
+        self.dispatch[OP_IF] = self.handle_if_statement
+        self.dispatch[OP_ELSE] = self.handle_else
+        self.dispatch[OP_BREAK] = self.handle_break
+        self.dispatch[OP_CONTINUE] = self.handle_continue
+        self.dispatch[OP_CALL] = self.handle_call_statement
+        
+        # Подписчики на события выполнения (отладчик, покрытие, профилировщики)
+        self.hooks = {event: [] for event in HOOK_EVENTS}
+    
+    def add_hook(self, event, callback):
+        """Подписывает callback на событие выполнения.
+        
+        on_statement(program, index) - перед каждым оператором,
+        on_call(method, args) - перед вызовом метода модуля,
+        on_loop_iteration(program, index) - перед каждой итерацией цикла.
+        """
+        self.hooks[event].append(callback)
+        self.update_hooks()
+    
+    def remove_hook(self, event, callback):
+        """Отписывает callback от события"""
+        self.hooks[event].remove(callback)
+        self.update_hooks()
+    
+    def update_hooks(self):
+        """Подменяет методы горячего пути трассирующими версиями.
+        
+        Пока подписчиков нет, используются обычные методы класса и
+        выполнение не платит за проверку хуков.
+        """
+        self.swap_method("execute_line", self.execute_line_traced, self.hooks["on_statement"])
+        self.swap_method("call_module", self.call_module_traced, self.hooks["on_call"])
+        self.swap_method("count_step", self.count_step_traced, self.hooks["on_loop_iteration"])
+    
+    def swap_method(self, name, traced, subscribers):
+        """Ставит traced вместо метода name у экземпляра или убирает подмену"""
+        if subscribers:
+            setattr(self, name, traced)
+        elif name in self.__dict__:
+            delattr(self, name)
+    
+    def reset(self):
+        """Возвращает интерпретатор в исходное состояние для нового запуска.
+        
+        Созданные модули не пересоздаются, а сбрасываются, поэтому кэш мест
+        вызова и скомпилированные подключаемые файлы сохраняются.
+        """
+        self.variables.clear()
+        self.global_vars.clear()
+        self.classes.clear()
+        self.imported_modules.clear()
+        self.loaded_files.clear()
+        self.current_class = None
+        self.current_method = None
+        self.loop_break = False
+        self.loop_continue = False
+        
+        if len(self.call_sites) > MAX_CALL_SITES:
+            self.call_sites.clear()
+        
+        for module in self.modules.values():
+            if hasattr(module, 'reset'):
+                module.reset()
+        
+    def register_module(self, name, module):
+        """Регистрирует модуль и сбрасывает кэш мест вызова"""
+        self.modules[name] = module
+        self.call_sites.clear()
+    
+    def get_module(self, name, discover=True):
+        """Возвращает модуль по имени, создавая его из реестра при первом обращении.
+        
+        discover=False не ищет внешние модули (entry points и плагины):
+        так проверяются вызовы name.method(), где name может быть переменной.
+        """
+        module = self.modules.get(name)
+        if module is None:
+            module = self.registry.create(name, self, discover)
+            if module is not None:
+                self.register_module(name, module)
+        return module
+    
+    def resolve_call(self, expr):
+        """Возвращает (метод, аргументы) для вызова метода модуля или None.
+        
+        Разбор выполняется один раз для каждого места вызова, дальше
+        используется ссылка на связанный метод из кэша.
+        """
+        site = self.call_sites.get(expr, UNRESOLVED)
+        if site is UNRESOLVED:
+            site = self.compile_call(expr)
+            self.call_sites[expr] = site
+        return site
+    
+    def compile_call(self, expr):
+        """Разбирает Module.Method(args) в ссылку на метод и список аргументов"""
+        match = MODULE_CALL_RE.match(expr)
+        if not match:
+            return None
+        
+        name = match.group(1)
+        if name in self.variables or name in self.global_vars:
+            return None  # метод переменной: numbers.length()
+        
+        # Внешние модули создаются при @use; здесь ищутся только уже известные реестру
+        module = self.get_module(name, discover=False)
+        method = getattr(module, match.group(2), None) if module else None
+        if not callable(method):
+            return None
+        
+        # Скобка аргументов должна закрываться в самом конце выражения
+        open_pos = match.end() - 1
+        if find_closing_paren(expr, open_pos) != len(expr) - 1:
+            return None
+        
+        return method, tuple(split_arguments(expr[open_pos + 1:-1]))
+    
+    def call_module(self, site):
+        """Вызывает метод модуля из кэша мест вызова"""
+        method, args = site
+        return method(*[self.evaluate_expression(arg) for arg in args])
+    
+    def call_module_traced(self, site):
+        """call_module с уведомлением подписчиков on_call"""
+        method, args = site
+        values = [self.evaluate_expression(arg) for arg in args]
+        for hook in self.hooks["on_call"]:
+            hook(method, values)
+        return method(*values)
+    
     def output(self, text, end="\n"):
         """Вывод текста"""
         if self.output_callback:
-            self.output_callback(text + end)
+            self.output_callback(text + end if end else text)
+    
+    def flush_output(self):
+        """Сбрасывает буферизованный вывод модуля Console"""
+        console = self.modules.get("Console")
+        if console:
+            console.Flush()
     
     def input(self, prompt=""):
         """Ввод текста"""
         if self.input_callback:
-            return self.input_callback(prompt)
+            # Ожидание ввода не засчитывается в лимит времени
+            started = time.monotonic()
+            try:
+                return self.input_callback(prompt)
+            finally:
+                if self.deadline is not None:
+                    self.deadline += time.monotonic() - started
         return ""
     
-    def run(self, code: str):
-        """Запускает программу на AMIGA"""
-        lines = code.split('\n')
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Пропускаем пустые строки
-            if not line:
-                i += 1
-                continue
-            
-            try:
-                i = self.execute_line(lines, i)
-            except Exception as e:
-                self.output("Ошибка в строке {}: {}".format(i + 1, str(e)))
-                raise e
+    def start_limits(self):
+        """Настраивает счётчик шагов и срок выполнения перед запуском"""
+        if self.max_steps is None and self.time_limit is None:
+            self.steps_left = sys.maxsize
+            self.budget_left = None
+            self.deadline = None
+            return
+        
+        self.steps_left = 0
+        self.budget_left = self.max_steps
+        self.deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+    
+    def check_limits(self, program, index):
+        """Проверяет лимиты, когда закончилась очередная порция шагов"""
+        if self.budget_left is not None and self.budget_left <= 0:
+            raise AMIGALimitError("Превышен лимит шагов ({})".format(self.max_steps),
+                                  *program.position(index), program.filename)
+        self.check_deadline(program, index)
+        
+        chunk = LIMIT_CHECK_INTERVAL
+        if self.budget_left is not None:
+            chunk = min(chunk, self.budget_left)
+            self.budget_left -= chunk
+        
+        # Текущий шаг входит в новую порцию
+        self.steps_left = chunk - 1
+    
+    def check_deadline(self, program, index):
+        """Возвращает время до срока выполнения (None - срока нет) или
+        выбрасывает AMIGALimitError, если срок прошёл"""
+        if self.deadline is None:
+            return None
+        left = self.deadline - time.monotonic()
+        if left <= 0:
+            raise AMIGALimitError("Превышено время выполнения ({} с)".format(self.time_limit),
+                                  *program.position(index), program.filename)
+        return left
+    
+    def sleep(self, program, index, seconds):
+        """Ожидание в программе: не дольше срока выполнения"""
+        left = self.check_deadline(program, index)
+        time.sleep(seconds if left is None else min(seconds, left))
+        self.check_deadline(program, index)
     
-    def execute_line(self, lines, index):
+    def count_step(self, program, index):
+        """Засчитывает шаг (итерацию цикла) в лимиты выполнения"""
+        self.steps_left -= 1
+        if self.steps_left < 0:
+            self.check_limits(program, index)
+    
+    def count_step_traced(self, program, index):
+        """count_step с уведомлением подписчиков on_loop_iteration"""
+        for hook in self.hooks["on_loop_iteration"]:
+            hook(program, index)
+        AMIGAInterpreter.count_step(self, program, index)
+    
+    def compile(self, code, filename=None):
+        """Компилирует текст программы (через кэш на диске, если он задан)"""
+        if self.program_cache:
+            return self.program_cache.compile(code, filename)
+        return compile_program(code, filename)
+    
+    def run(self, code, filename=None):
+        """Запускает программу на AMIGA (текст или скомпилированную Program)"""
+        program = code if isinstance(code, Program) else self.compile(code, filename)
+        if program.filename:
+            # Сама программа не должна выполниться повторно через @use
+            self.loaded_files.add(os.path.abspath(program.filename))
+        self.start_limits()
+        try:
+            self.execute_block(program, 0, len(program))
+        except AMIGAError as e:
+            # Сначала выводим всё, что программа успела напечатать
+            self.flush_output()
+            self.output(e.format())
+            raise
+        finally:
+            self.flush_output()
+    
+    def execute_line(self, program, index):
         """Выполняет одну строку кода"""
-        line = lines[index].strip()
-        
-        # Комментарии
-        if line.startswith('//'):
-            return index + 1
-        
-        # @use
-        if line.startswith('@use'):
-            return self.handle_use(lines, index)
-        
-        # @in
-        if line.startswith('@in'):
-            return self.handle_in(lines, index)
-        
-        # class
-        if 'class' in line and not line.startswith('//'):
-            return self.handle_class(lines, index)
-        
-        # define
-        if 'define' in line and not line.startswith('//'):
-            return self.handle_method(lines, index)
-        
-        # Объявление переменных с типом (local string name)
-        if line.startswith(('local ', 'global ')):
-            self.handle_typed_variable(line)
-            return index + 1
-        
-        # Объявление переменных с >>
-        if '>>' in line and not line.startswith('//'):
-            self.handle_variable_declaration(line)
-            return index + 1
-        
-        # each цикл
-        if line.startswith('each '):
-            return self.handle_each_loop(lines, index)
-        
-        # for цикл
-        if line.startswith('for '):
-            return self.handle_for_loop(lines, index)
-        
-        # while цикл
-        if line.startswith('while '):
-            return self.handle_while_loop(lines, index)
-        
-        # if условие (многострочное)
-        if line.startswith('if '):
-            return self.handle_if_statement(lines, index)
-        
-        # else
-        if line.startswith('else'):
-            return self.handle_else(lines, index)
-        
-        # break
-        if line.startswith('break'):
-            self.loop_break = True
-            return index + 1
-        
-        # continue
-        if line.startswith('continue'):
-            self.loop_continue = True
-            return index + 1
-        
-        # Вызов методов
-        if '.Print' in line or '.Input' in line:
-            self.handle_method_call(line)
-        
+        self.steps_left -= 1
+        if self.steps_left < 0:
+            self.check_limits(program, index)
+        return self.dispatch[program.kinds[index]](program, index)
+    
+    def execute_line_traced(self, program, index):
+        """execute_line с уведомлением подписчиков on_statement"""
+        for hook in self.hooks["on_statement"]:
+            hook(program, index)
+        return AMIGAInterpreter.execute_line(self, program, index)
+    
+    def execute_block(self, program, start, stop):
+        """Выполняет строки [start, stop) до конца блока, break или continue"""
+        i = start
+        try:
+            while i < stop and not (self.loop_break or self.loop_continue):
+                i = self.execute_line(program, i)
+        except (AMIGAError, MemoryError):
+            # MemoryError не оборачивается: исполнитель пакетов отличает нехватку памяти от ошибки
+            raise
+        except Exception as e:
+            # Позиция берётся только при ошибке: i - строка, где она возникла
+            raise AMIGARuntimeError(str(e), *program.position(i), program.filename) from e
+    
+    def block_body(self, program, index):
+        """Возвращает границы тела блока и индекс строки после него"""
+        end = program.block_ends[index]
+        return index + 1, end, end + 1
+    
+    def handle_nop(self, program, index):
+        """Пустая строка, комментарий или закрывающая скобка"""
+        return index + 1
+    
+    def handle_break(self, program, index):
+        """Обрабатывает break"""
+        self.loop_break = True
+        return index + 1
+    
+    def handle_continue(self, program, index):
+        """Обрабатывает continue"""
+        self.loop_continue = True
+        return index + 1
+    
+    def handle_call_statement(self, program, index):
+        """Обрабатывает вызов метода модуля или массива"""
+        self.handle_method_call(program.lines[index])
+        return index + 1
+    
+    def handle_typed_statement(self, program, index):
+        """Обрабатывает строку с объявлением типизированной переменной"""
+        self.handle_typed_variable(program.lines[index])
+        return index + 1
+    
+    def handle_declaration_statement(self, program, index):
+        """Обрабатывает строку с объявлением переменной через >>"""
+        self.handle_variable_declaration(program.lines[index])
         return index + 1
     
     def handle_typed_variable(self, line):
@@ -171,30 +458,72 @@ class AMIGAInterpreter:
             else:
                 self.variables[var_name] = value
     
-    def handle_use(self, lines, index):
-        """Обрабатывает @use module;"""
-        line = lines[index].strip()
-        parts = line.split()
-        if len(parts) >= 2:
-            module_name = parts[1].rstrip(';')
-            if module_name in self.modules:
+    def handle_use(self, program, index):
+        """Обрабатывает @use module; и @use "file.amiga1";"""
+        module_name = use_target(program.lines[index])
+        if module_name:
+            if module_name.endswith('.amiga1'):
+                self.use_file(program, index, module_name, required=True)
+            elif self.get_module(module_name) is not None:
                 self.imported_modules.add(module_name)
+            else:
+                # Модуля с таким именем нет - ищем файл name.amiga1 рядом с программой
+                self.use_file(program, index, module_name + '.amiga1', required=False)
         return index + 1
     
-    def handle_in(self, lines, index):
+    def find_source(self, program, name):
+        """Путь к подключаемому файлу относительно каталога программы или None"""
+        base = os.path.dirname(program.filename) if program.filename else os.getcwd()
+        path = os.path.abspath(os.path.join(base, name))
+        return path if os.path.isfile(path) else None
+    
+    def load_source(self, path):
+        """Возвращает скомпилированный подключаемый файл (компилируется один раз)"""
+        stat = os.stat(path)
+        cached = self.file_programs.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        
+        with open(path, 'r', encoding='utf-8') as file:
+            program = self.compile(file.read(), path)
+        self.file_programs[path] = (stat.st_mtime_ns, stat.st_size, program)
+        return program
+    
+    def use_file(self, program, index, name, required):
+        """Выполняет подключаемый файл .amiga1 один раз за запуск"""
+        path = self.find_source(program, name)
+        if path is None:
+            if required:
+                raise AMIGARuntimeError("Файл модуля не найден: {}".format(name),
+                                        *program.position(index), program.filename)
+            return
+        
+        # Файл отмечается до выполнения, поэтому циклические @use не зацикливаются
+        if path in self.loaded_files:
+            return
+        self.loaded_files.add(path)
+        
+        library = self.load_source(path)
+        current_class, current_method = self.current_class, self.current_method
+        try:
+            self.execute_block(library, 0, len(library))
+        finally:
+            self.current_class, self.current_method = current_class, current_method
+    
+    def handle_in(self, program, index):
         """Обрабатывает @in Times.Loops @use _all;"""
-        line = lines[index].strip()
+        line = program.lines[index]
         parts = line.split()
         if len(parts) >= 3:
             module_path = parts[1]  # Times.Loops
             module_name = module_path.split('.')[0]
-            if module_name in self.modules:
+            if self.get_module(module_name) is not None:
                 self.imported_modules.add(module_name)
         return index + 1
     
-    def handle_class(self, lines, index):
+    def handle_class(self, program, index):
         """Обрабатывает объявление класса"""
-        line = lines[index].strip()
+        line = program.lines[index]
         parts = line.split()
         if len(parts) >= 4:
             class_name = parts[3].rstrip('{').strip()
@@ -205,48 +534,33 @@ class AMIGAInterpreter:
             }
         return index + 1
     
-    def handle_method(self, lines, index):
+    def handle_method(self, program, index):
         """Обрабатывает объявление метода"""
-        line = lines[index].strip()
+        line = program.lines[index]
         
         # global define OnRun() {
         method_name = line.split()[2].split('(')[0]
         self.current_method = method_name
         
-        # Ищем тело метода до закрывающей скобки
-        i = index + 1
-        body_lines = []
-        brace_count = 1
-        
-        while i < len(lines) and brace_count > 0:
-            current_line = lines[i]
-            brace_count += current_line.count('{')
-            brace_count -= current_line.count('}')
-            
-            if brace_count > 0 or current_line.strip():
-                if not (current_line.strip() == '}' and brace_count == 0):
-                    body_lines.append(current_line)
-            
-            i += 1
+        # Тело метода - до закрывающей скобки, найденной при компиляции
+        start, stop, next_index = self.block_body(program, index)
         
         # Сохраняем метод
         if self.current_class:
             self.classes[self.current_class]['methods'][method_name] = {
-                'body': body_lines,
+                'body': (program, start, stop),
                 'params': []
             }
             
             # Если это метод OnRun, выполняем его сразу
             if method_name == "OnRun":
-                self.execute_method_body(body_lines)
+                self.execute_method_body(program, start, stop)
         
-        return i
+        return next_index
     
-    def execute_method_body(self, body_lines):
+    def execute_method_body(self, program, start, stop):
         """Выполняет тело метода"""
-        j = 0
-        while j < len(body_lines):
-            j = self.execute_line(body_lines, j)
+        self.execute_block(program, start, stop)
     
     def handle_variable_declaration(self, line):
         """Обрабатывает объявление переменной с >>"""
@@ -267,6 +581,11 @@ class AMIGAInterpreter:
         """Обрабатывает вызов метода"""
         line = line.rstrip(';').strip()
         
+        # Вызов метода модуля (Console.Print, Times.Range)
+        site = self.resolve_call(line)
+        if site is not None:
+            return self.call_module(site)
+        
         # Обработка методов массивов: numbers.length()
         if '.' in line and '(' in line and ']' not in line:
             parts = line.split('.', 1)
@@ -294,28 +613,6 @@ class AMIGAInterpreter:
         # Обработка интерполяции строк
         if line.startswith('$"'):
             return self.evaluate_string_interpolation(line)
-        
-        # Обработка Console.Print с конкатенацией
-        if '.Print' in line:
-            # Разбираем Console.Print("Возраст: " .= age.toString())
-            match = re.match(r'Console\.Print\((.*)\)', line)
-            if match:
-                args_str = match.group(1)
-                # Вычисляем аргументы
-                result = self.evaluate_expression(args_str)
-                # Вызываем Print
-                if "Console" in self.modules:
-                    self.modules["Console"].Print(result)
-                return result
-        
-        # Обработка Console.Input
-        elif '.Input' in line:
-            match = re.match(r'Console\.Input\((.*)\)', line)
-            if match:
-                prompt = match.group(1)
-                if prompt.startswith('"') and prompt.endswith('"'):
-                    prompt = prompt[1:-1]
-                return self.modules["Console"].Input(prompt)
     
     def evaluate_string_interpolation(self, expr):
         """Вычисляет интерполяцию строки $"Имя: {name}" """
@@ -397,9 +694,10 @@ class AMIGAInterpreter:
         """Вычисляет выражение"""
         expr = expr.strip()
         
-        # Проверяем, является ли выражение вызовом метода
-        if '.Print' in expr or '.Input' in expr:
-            return self.handle_method_call(expr)
+        # Проверяем, является ли выражение вызовом метода модуля
+        site = self.resolve_call(expr)
+        if site is not None:
+            return self.call_module(site)
         
         # Проверяем, является ли выражение интерполяцией
         if expr.startswith('$"') and expr.endswith('"'):
@@ -439,114 +737,66 @@ class AMIGAInterpreter:
         
         return expr
     
-    def handle_if_statement(self, lines, index):
+    def is_true(self, value):
+        """Приводит значение условия к bool"""
+        if isinstance(value, str):
+            return bool(value)
+        elif isinstance(value, (int, float)):
+            return value != 0
+        return value
+    
+    def handle_if_statement(self, program, index):
         """Обрабатывает if условие (многострочное)"""
-        line = lines[index].strip()
+        line = program.lines[index]
         
         # Извлекаем условие
         condition = line[3:line.find('{')].strip()
-        
-        # Ищем тело if
-        i = index + 1
-        if_body = []
-        brace_count = 1
-        
-        while i < len(lines) and brace_count > 0:
-            current_line = lines[i]
-            brace_count += current_line.count('{')
-            brace_count -= current_line.count('}')
-            
-            if brace_count > 0 or current_line.strip():
-                if not (current_line.strip() == '}' and brace_count == 0):
-                    if_body.append(current_line)
-            
-            i += 1
-        
-        # Вычисляем условие
-        condition_value = self.evaluate_expression(condition)
-        
-        # Приводим к bool
-        if isinstance(condition_value, str):
-            condition_value = bool(condition_value)
-        elif isinstance(condition_value, (int, float)):
-            condition_value = condition_value != 0
-        
-        if condition_value:
-            # Выполняем тело if
-            j = 0
-            while j < len(if_body):
-                j = self.execute_line(if_body, j)
-            return i
-        else:
-            # Пропускаем if и ищем else
-            return self.skip_to_else(lines, i)
-    
-    def skip_to_else(self, lines, index):
-        """Пропускает блок if и ищет else"""
-        i = index
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith('else'):
-                return self.handle_else(lines, i)
-            i += 1
-        return i
+        start, stop, next_index = self.block_body(program, index)
+        else_index = program.else_lines[index]
+        
+        if self.is_true(self.evaluate_expression(condition)):
+            # Выполняем тело if и пропускаем else
+            self.execute_block(program, start, stop)
+            if else_index >= 0:
+                return self.skip_else(program, else_index)
+            return next_index
+        
+        # Выполняем else, если он есть (через execute_line, чтобы хуки увидели строку else)
+        if else_index >= 0:
+            return self.execute_line(program, else_index)
+        return next_index
+    
+    def skip_else(self, program, index):
+        """Пропускает блок else"""
+        if program.block_ends[index] < 0:
+            return index + 1
+        return program.block_ends[index] + 1
     
-    def handle_else(self, lines, index):
+    def handle_else(self, program, index):
         """Обрабатывает else"""
-        line = lines[index].strip()
-        
-        # Ищем тело else
-        i = index + 1
-        else_body = []
-        brace_count = 1 if '{' in line else 0
-        
-        while i < len(lines) and brace_count > 0:
-            current_line = lines[i]
-            brace_count += current_line.count('{')
-            brace_count -= current_line.count('}')
-            
-            if brace_count > 0 or current_line.strip():
-                if not (current_line.strip() == '}' and brace_count == 0):
-                    else_body.append(current_line)
-            
-            i += 1
-        
-        # Выполняем тело else
-        j = 0
-        while j < len(else_body):
-            j = self.execute_line(else_body, j)
+        if program.block_ends[index] < 0:
+            return index + 1
         
-        return i
+        start, stop, next_index = self.block_body(program, index)
+        self.execute_block(program, start, stop)
+        return next_index
+    
+    def finish_loop(self):
+        """Сбрасывает флаги break/continue после выхода из цикла"""
+        self.loop_break = False
+        self.loop_continue = False
     
-    def handle_each_loop(self, lines, index):
+    def handle_each_loop(self, program, index):
         """Обрабатывает each цикл"""
-        line = lines[index].strip()
-        
-        try:
-            condition = line[5:line.find('{')].strip(' (')
-        except:
-            condition = ""
-        
-        # Ищем тело цикла
-        i = index + 1
-        body_lines = []
-        brace_count = 1
-        
-        while i < len(lines) and brace_count > 0:
-            current_line = lines[i]
-            brace_count += current_line.count('{')
-            brace_count -= current_line.count('}')
-            
-            if brace_count > 0 or current_line.strip():
-                if not (current_line.strip() == '}' and brace_count == 0):
-                    body_lines.append(current_line)
-            
-            i += 1
+        line = program.lines[index]
+        condition = line[5:line.find('{')].strip(' (')
+        start, stop, next_index = self.block_body(program, index)
         
         # Выполняем цикл
         self.loop_break = False
         
         while not self.loop_break:
+            self.count_step(program, index)
             try:
                 condition_result = self.evaluate_expression(condition)
                 
@@ -555,120 +805,76 @@ class AMIGAInterpreter:
                 
                 if hasattr(condition_result, 'Delay') and callable(condition_result.Delay):
                     if not condition_result.Delay():
-                        time.sleep(0.1)
+                        self.sleep(program, index, 0.1)
                         continue
                 
                 self.loop_continue = False
-                j = 0
-                while j < len(body_lines):
-                    if self.loop_break or self.loop_continue:
-                        break
-                    j = self.execute_line(body_lines, j)
-                
-                if self.loop_break:
-                    break
-            except:
+                self.execute_block(program, start, stop)
+            except (AMIGAInterrupt, MemoryError):
+                raise
+            except Exception:
                 break
         
-        return i
+        self.finish_loop()
+        return next_index
     
-    def handle_for_loop(self, lines, index):
+    def handle_for_loop(self, program, index):
         """Обрабатывает for цикл"""
-        line = lines[index].strip()
+        line = program.lines[index]
+        start, stop, next_index = self.block_body(program, index)
         
         try:
             for_content = line[4:line.find('{')].strip(' (')
             
             if 'in' in for_content:
                 var_name, iterable_expr = for_content.split(' in ', 1)
+                var_name = var_name.strip()
                 
                 iterable = self.evaluate_expression(iterable_expr)
                 
-                i = index + 1
-                body_lines = []
-                brace_count = 1
-                
-                while i < len(lines) and brace_count > 0:
-                    current_line = lines[i]
-                    brace_count += current_line.count('{')
-                    brace_count -= current_line.count('}')
-                    
-                    if brace_count > 0 or current_line.strip():
-                        if not (current_line.strip() == '}' and brace_count == 0):
-                            body_lines.append(current_line)
-                    
-                    i += 1
-                
                 self.loop_break = False
                 
                 if hasattr(iterable, '__iter__'):
                     for item in iterable:
                         if self.loop_break:
                             break
+                        self.count_step(program, index)
                         
-                        self.variables[var_name.strip()] = item
+                        self.variables[var_name] = item
                         
                         self.loop_continue = False
-                        j = 0
-                        while j < len(body_lines):
-                            if self.loop_break or self.loop_continue:
-                                break
-                            j = self.execute_line(body_lines, j)
-                
-                return i
-        except:
+                        self.execute_block(program, start, stop)
+        except (AMIGAInterrupt, MemoryError):
+            raise
+        except Exception:
             pass
         
-        return index + 1
+        self.finish_loop()
+        return next_index
     
-    def handle_while_loop(self, lines, index):
+    def handle_while_loop(self, program, index):
         """Обрабатывает while цикл"""
-        line = lines[index].strip()
-        
-        try:
-            condition = line[6:line.find('{')].strip(' (')
-        except:
-            condition = "true"
-        
-        i = index + 1
-        body_lines = []
-        brace_count = 1
-        
-        while i < len(lines) and brace_count > 0:
-            current_line = lines[i]
-            brace_count += current_line.count('{')
-            brace_count -= current_line.count('}')
-            
-            if brace_count > 0 or current_line.strip():
-                if not (current_line.strip() == '}' and brace_count == 0):
-                    body_lines.append(current_line)
-            
-            i += 1
+        line = program.lines[index]
+        condition = line[6:line.find('{')].strip(' (')
+        start, stop, next_index = self.block_body(program, index)
         
         self.loop_break = False
         
         while True:
+            self.count_step(program, index)
             try:
-                condition_value = self.evaluate_expression(condition)
-                
-                if isinstance(condition_value, str):
-                    condition_value = bool(condition_value)
-                elif isinstance(condition_value, (int, float)):
-                    condition_value = condition_value != 0
-                
-                if not condition_value or self.loop_break:
+                if not self.is_true(self.evaluate_expression(condition)) or self.loop_break:
                     break
                 
                 self.loop_continue = False
-                j = 0
-                while j < len(body_lines):
-                    if self.loop_break or self.loop_continue:
-                        break
-                    j = self.execute_line(body_lines, j)
-            except:
+                self.execute_block(program, start, stop)
+            except (AMIGAInterrupt, MemoryError):
+                raise
+            except Exception:
                 break
         
-        return i
+        self.finish_loop()
+        return next_index
 
 class AMIGAArray:
     """Массив в языке AMIGA"""
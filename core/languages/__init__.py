@@ -1,49 +1,186 @@
 import json
+import marshal
 import os
+import struct
+
+from ..cache import default_cache_dir
+
+# Языки интерфейса (файлы <код>.json рядом с этим модулем)
+LANGUAGES = ("ru", "en", "de", "zh")
+
+# Язык, на котором написаны все строки; его текст берётся, если перевода нет
+DEFAULT_LANGUAGE = "ru"
+
+# Версия формата скомпилированного каталога
+CATALOG_VERSION = 1
+
+# Имя файла скомпилированного каталога в каталоге кэша
+CATALOG_NAME = "languages.catalog"
+
+# Длина заголовка каталога: 4 байта, little-endian
+HEADER_SIZE = struct.Struct("<I")
+
+def flatten(data, prefix=""):
+    """Вложенный словарь перевода -> плоский {"menu.file": "Файл", ...}"""
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + "."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+def source_stamp(path):
+    """Отметка исходного JSON: (mtime_ns, размер) или None, если файла нет"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
 
 class LanguageManager:
-    def __init__(self):
-        self.languages = {}
-        self.current_lang = "ru"
-        self.load_languages()
-    
-    def load_languages(self):
-        """Загружает все языки из JSON файлов"""
-        lang_dir = os.path.dirname(__file__)
-        for lang_file in ["ru.json", "en.json", "de.json", "zh.json"]:
+    """Переводы интерфейса.
+
+    Файлы <код>.json один раз компилируются в плоские словари "a.b" ->
+    текст и сохраняются одним файлом каталога: заголовок со смещениями
+    языков, затем marshal каждого языка. Язык читается из каталога при
+    первом обращении, поэтому на старте загружается только текущий;
+    get_text - один поиск в словаре. Каталог пересобирается, если JSON
+    языка изменился. Виджеты, зарегистрированные через register(),
+    обновляются все сразу при смене языка.
+    """
+
+    def __init__(self, source_dir=None, catalog_path=None):
+        self.source_dir = source_dir or os.path.dirname(os.path.abspath(__file__))
+        self.catalog_path = catalog_path or os.path.join(default_cache_dir(), CATALOG_NAME)
+        self.languages = {}  # код -> плоский словарь (только загруженные языки)
+        self.current_lang = DEFAULT_LANGUAGE
+        self.current = None  # словарь текущего языка
+        self.bindings = []   # (виджет, ключ, apply)
+        self.listeners = []  # вызываются после смены языка
+
+    def source_path(self, lang_code):
+        return os.path.join(self.source_dir, lang_code + ".json")
+
+    def catalog(self, lang_code):
+        """Плоский словарь языка (загружается при первом обращении)"""
+        catalog = self.languages.get(lang_code)
+        if catalog is None:
+            catalog = self.languages[lang_code] = self.load_language(lang_code)
+        return catalog
+
+    def load_language(self, lang_code):
+        """Читает язык из скомпилированного каталога, при устаревании пересобирает его"""
+        catalog = self.read_catalog(lang_code)
+        if catalog is None:
+            catalogs = self.compile_catalog()
+            catalog = catalogs.get(lang_code, {})
+        return catalog
+
+    def read_catalog(self, lang_code):
+        """Язык из файла каталога или None, если каталога нет или он устарел"""
+        try:
+            with open(self.catalog_path, 'rb') as file:
+                size, = HEADER_SIZE.unpack(file.read(HEADER_SIZE.size))
+                version, index = marshal.loads(file.read(size))
+                if version != CATALOG_VERSION or lang_code not in index:
+                    return None
+                stamp, offset, length = index[lang_code]
+                if stamp != source_stamp(self.source_path(lang_code)):
+                    return None
+                file.seek(HEADER_SIZE.size + size + offset)
+                return marshal.loads(file.read(length))
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+
+    def compile_catalog(self):
+        """Компилирует все языки и записывает каталог (ошибка записи не мешает работе)"""
+        catalogs = {}
+        blobs = []
+        index = {}
+        offset = 0
+        for lang_code in LANGUAGES:
+            path = self.source_path(lang_code)
             try:
-                with open(os.path.join(lang_dir, lang_file), 'r', encoding='utf-8') as f:
-                    lang_data = json.load(f)
-                    lang_code = lang_file.replace('.json', '')
-                    self.languages[lang_code] = lang_data
-            except Exception as e:
-                print(f"Ошибка загрузки {lang_file}: {e}")
-    
+                with open(path, 'r', encoding='utf-8') as file:
+                    catalogs[lang_code] = flatten(json.load(file))
+            except (OSError, ValueError) as e:
+                print(f"Ошибка загрузки {lang_code}.json: {e}")
+                continue
+            blob = marshal.dumps(catalogs[lang_code])
+            index[lang_code] = (source_stamp(path), offset, len(blob))
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = marshal.dumps((CATALOG_VERSION, index))
+        temp_path = "{}.{}.tmp".format(self.catalog_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                file.write(HEADER_SIZE.pack(len(header)))
+                file.write(header)
+                for blob in blobs:
+                    file.write(blob)
+            os.replace(temp_path, self.catalog_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return catalogs
+
     def get_text(self, key, default=None):
         """Получает текст на текущем языке по ключу"""
-        keys = key.split('.')
-        value = self.languages.get(self.current_lang, {})
-        
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                return default or key
-        
+        if self.current is None:
+            self.current = self.catalog(self.current_lang)
+        value = self.current.get(key)
+        if value is None and self.current_lang != DEFAULT_LANGUAGE:
+            value = self.catalog(DEFAULT_LANGUAGE).get(key)
         return value or default or key
-    
+
     def set_language(self, lang_code):
-        """Устанавливает текущий язык"""
-        if lang_code in self.languages:
+        """Устанавливает текущий язык и обновляет зарегистрированные виджеты"""
+        if lang_code not in LANGUAGES:
+            return False
+        catalog = self.catalog(lang_code)
+        if not catalog:
+            return False
+        if lang_code != self.current_lang:
             self.current_lang = lang_code
-            return True
-        return False
-    
+            self.current = catalog
+            self.relocalize()
+        return True
+
     def get_language_name(self, lang_code=None):
         """Возвращает название языка на самом языке"""
         if lang_code is None:
             lang_code = self.current_lang
-        return self.languages.get(lang_code, {}).get("language", lang_code)
+        return self.catalog(lang_code).get("language", lang_code)
+
+    def register(self, widget, key, apply=None):
+        """Переводит виджет сейчас и при каждой смене языка.
+
+        apply(текст) применяет перевод (по умолчанию - параметр text
+        виджета); для пунктов меню и вкладок передаётся своя функция.
+        Уничтоженные виджеты забываются при следующей смене языка.
+        """
+        if apply is None:
+            apply = lambda text: widget.configure(text=text)
+        self.bindings.append((widget, key, apply))
+        apply(self.get_text(key))
+
+    def relocalize(self):
+        """Обновляет все зарегистрированные виджеты за один проход"""
+        alive = []
+        for binding in self.bindings:
+            widget, key, apply = binding
+            if not widget.winfo_exists():
+                continue
+            apply(self.get_text(key))
+            alive.append(binding)
+        self.bindings = alive
+        for listener in self.listeners:
+            listener()
 
 # СОЗДАЁМ ГЛОБАЛЬНЫЙ ЭКЗЕМПЛЯР
-lang_manager = LanguageManager()  # <--- Вот он!
\ No newline at end of file
+lang_manager = LanguageManager()  # <--- Вот он!
@@ -4,9 +4,47 @@ import time
 class ConsoleModule:
     """Модуль Console для ввода/вывода"""
     
-    def __init__(self, output_callback=None, input_callback=None):
+    # Политики сброса буфера вывода
+    FLUSH_LINE = "line"    # после каждой выведенной строки
+    FLUSH_BLOCK = "block"  # при накоплении block_size символов
+    FLUSH_END = "end"      # только в конце программы или по Console.Flush()
+    
+    def __init__(self, output_callback=None, input_callback=None,
+                 flush_policy=FLUSH_BLOCK, block_size=4096):
         self.output_callback = output_callback
         self.input_callback = input_callback or input
+        self.flush_policy = flush_policy
+        self.block_size = block_size
+        
+        # Буфер вывода: список кусков текста и их суммарная длина
+        self.buffer = []
+        self.buffered = 0
+    
+    def write(self, text):
+        """Добавляет текст в буфер вывода согласно политике сброса"""
+        if not self.output_callback:
+            return
+        
+        self.buffer.append(text)
+        self.buffered += len(text)
+        
+        if self.flush_policy == self.FLUSH_LINE:
+            self.Flush()
+        elif self.flush_policy == self.FLUSH_BLOCK and self.buffered >= self.block_size:
+            self.Flush()
+    
+    def Flush(self):
+        """Передаёт накопленный вывод в консоль"""
+        if self.buffer:
+            output = "".join(self.buffer)
+            self.buffer.clear()
+            self.buffered = 0
+            self.output_callback(output, end="")
+    
+    def reset(self):
+        """Очищает буфер вывода перед новым запуском"""
+        self.buffer.clear()
+        self.buffered = 0
     
     def Print(self, *args):
         """Выводит текст в консоль"""
@@ -18,14 +56,14 @@ class ConsoleModule:
                 texts.append(str(arg))
         
         output = " ".join(texts)
-        if self.output_callback:
-            self.output_callback(output)
+        self.write(output + "\n")
         return output
     
     def Input(self, prompt=""):
         """Вводит текст из консоли"""
-        if self.output_callback:
-            self.output_callback(prompt, end="")
+        # Приглашение и весь предыдущий вывод должны появиться до чтения
+        self.write(prompt)
+        self.Flush()
         
         if self.input_callback:
             value = self.input_callback()
@@ -38,7 +76,9 @@ class TimesModule:
     def __init__(self, output_callback=None):
         self.output_callback = output_callback
     
-    class Seconds:
+    # Вложенные классы названы иначе, чем фабричные методы ниже:
+    # иначе метод Range перекрывает класс Range и вызывает сам себя
+    class SecondsValue:
         """Класс для работы с секундами"""
         def __init__(self, value):
             self.value = float(value)
@@ -49,7 +89,7 @@ class TimesModule:
         def __float__(self):
             return self.value
     
-    class Range:
+    class RangeIterator:
         """Класс для диапазонов"""
         def __init__(self, end):
             self.start = 0
@@ -70,7 +110,7 @@ class TimesModule:
             """Сброс итератора"""
             self.current = self.start
     
-    class Timer:
+    class DelayTimer:
         """Таймер для each цикла"""
         def __init__(self, delay):
             self.delay = float(delay)
@@ -86,12 +126,21 @@ class TimesModule:
     
     def Range(self, value):
         """Создает диапазон"""
-        return self.Range(value)
+        return self.RangeIterator(value)
     
     def Seconds(self, value):
         """Создает объект секунд"""
-        return self.Seconds(value)
+        return self.SecondsValue(value)
     
     def Timer(self, delay):
         """Создает таймер"""
-        return self.Timer(delay)
\ No newline at end of file
+        return self.DelayTimer(delay)
+
+def create_console(interpreter):
+    """Фабрика модуля Console для реестра модулей"""
+    return ConsoleModule(interpreter.output, interpreter.input,
+                         interpreter.flush_policy, interpreter.block_size)
+
+def create_times(interpreter):
+    """Фабрика модуля Times для реестра модулей"""
+    return TimesModule(interpreter.output)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import tracemalloc
+
+class MemoryProfiler:
+    """Профилирование памяти программы AMIGA через tracemalloc.
+
+    Профилировщик подписывается на on_statement и перед каждым оператором
+    смотрит, на сколько выросла отслеживаемая память с начала предыдущего
+    оператора, и записывает прирост на строку AMIGA, которая выполнялась
+    в это время.
+    """
+
+    def __init__(self, interpreter, top=10):
+        self.interpreter = interpreter
+        self.top = top
+        self.line_allocations = {}  # (файл, строка) -> выделено байт
+        self.line_texts = {}
+        self.current_line = None
+        self.last_size = 0
+        self.peak = 0
+        self.start_snapshot = None
+        self.end_snapshot = None
+
+    def run(self, code, filename=None):
+        """Выполняет программу под профилировщиком"""
+        interpreter = self.interpreter
+
+        tracemalloc.start()
+        self.start_snapshot = tracemalloc.take_snapshot()
+        self.last_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+        interpreter.add_hook("on_statement", self.account)
+        try:
+            interpreter.run(code, filename)
+        finally:
+            interpreter.remove_hook("on_statement", self.account)
+            self.account(None, None)
+            self.peak = tracemalloc.get_traced_memory()[1]
+            self.end_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    def account(self, program, index):
+        """Записывает прирост памяти на текущую строку и переключается на новую"""
+        size = tracemalloc.get_traced_memory()[0]
+        if self.current_line is not None and size > self.last_size:
+            key = self.current_line
+            self.line_allocations[key] = self.line_allocations.get(key, 0) + size - self.last_size
+        self.last_size = size
+
+        if program is None:
+            self.current_line = None
+            return
+
+        key = (program.filename, index + 1)
+        if key not in self.line_texts:
+            self.line_texts[key] = program.lines[index]
+        self.current_line = key
+
+    def top_lines(self):
+        """Строки AMIGA с наибольшим выделением памяти"""
+        items = sorted(self.line_allocations.items(), key=lambda item: item[1], reverse=True)
+        return items[:self.top]
+
+    def top_python_sites(self):
+        """Места в коде интерпретатора с наибольшим приростом памяти за запуск"""
+        if not self.start_snapshot or not self.end_snapshot:
+            return []
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        end = self.end_snapshot.filter_traces(ignore)
+        start = self.start_snapshot.filter_traces(ignore)
+        return end.compare_to(start, 'lineno')[:self.top]
+
+    def format_report(self):
+        """Текстовый отчёт о памяти"""
+        lines = ["=" * 60, "Память", "=" * 60]
+        lines.append("Пик: {}".format(format_size(self.peak)))
+        lines.append("Всего выделено строками AMIGA: {}".format(
+            format_size(sum(self.line_allocations.values()))))
+
+        lines.append("")
+        lines.append("Строки с наибольшим выделением:")
+        for (filename, line), size in self.top_lines():
+            where = "{}:{}".format(filename, line) if filename else "строка {}".format(line)
+            lines.append("  {:>10}  {:<24} {}".format(format_size(size), where,
+                                                      self.line_texts.get((filename, line), "")))
+
+        sites = self.top_python_sites()
+        if sites:
+            lines.append("")
+            lines.append("Прирост по коду интерпретатора:")
+            for stat in sites:
+                frame = stat.traceback[0]
+                lines.append("  {:>10}  {}:{}".format(format_size(stat.size_diff),
+                                                      frame.filename, frame.lineno))
+        return "\n".join(lines)
+
+def format_size(size):
+    """Размер в байтах в читаемом виде"""
+    for unit in ("Б", "КБ", "МБ"):
+        if abs(size) < 1024:
+            return "{:.1f} {}".format(size, unit) if unit != "Б" else "{} {}".format(size, unit)
+        size /= 1024
+    return "{:.1f} ГБ".format(size)
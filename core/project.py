@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import ProgramCache, source_hash
+from .compiler import compile_program, use_target, OP_USE
+from .registry import default_registry
+from .runner import find_programs
+
+# Файл состояния сборки в корне проекта
+STATE_FILE = '.amiga_build.json'
+
+# Версия формата файла состояния
+STATE_VERSION = 1
+
+def find_imports(program, registry=default_registry):
+    """Файлы, подключаемые программой через @use.
+
+    Возвращает (пути, ненайденные): имя без .amiga1 считается файлом,
+    только если модуля с таким именем нет, как и в интерпретаторе.
+    """
+    base = os.path.dirname(os.path.abspath(program.filename or '.'))
+    imports = []
+    missing = []
+    for index, kind in enumerate(program.kinds):
+        if kind != OP_USE:
+            continue
+        name = use_target(program.lines[index])
+        if not name:
+            continue
+        if name.endswith('.amiga1'):
+            path = os.path.abspath(os.path.join(base, name))
+            if not os.path.isfile(path):
+                missing.append(name)
+                continue
+        elif registry.factory(name) is None:
+            path = os.path.abspath(os.path.join(base, name + '.amiga1'))
+            if not os.path.isfile(path):
+                continue
+        else:
+            continue
+        if path not in imports:
+            imports.append(path)
+    return imports, missing
+
+def compile_file(path, cache_dir=None):
+    """Компилирует файл и кладёт результат в кэш (выполняется в процессе пула)"""
+    result = {"file": path, "hash": None, "imports": [], "time": 0.0, "error": None}
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            code = file.read()
+        start = time.perf_counter()
+        program = compile_program(code, path)
+        result["time"] = round(time.perf_counter() - start, 6)
+
+        key = source_hash(code)
+        ProgramCache(cache_dir).store(key, program)
+        result["hash"] = key
+
+        imports, missing = find_imports(program)
+        result["imports"] = imports
+        if missing:
+            result["error"] = "Файл модуля не найден: {}".format(", ".join(missing))
+    except (OSError, UnicodeDecodeError) as e:
+        result["error"] = str(e)
+    return result
+
+def build_order(dirty, imports):
+    """Разбивает файлы на уровни: файлы одного уровня не зависят друг от друга.
+
+    Зависимости из того же набора попадают в более ранние уровни; файлы
+    из циклов собираются последним уровнем.
+    """
+    pending = {path: {dep for dep in imports.get(path, ()) if dep in dirty and dep != path}
+               for path in dirty}
+    levels = []
+    while pending:
+        ready = sorted(path for path, deps in pending.items() if not deps)
+        if not ready:
+            levels.append(sorted(pending))
+            break
+        levels.append(ready)
+        for path in ready:
+            del pending[path]
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return levels
+
+class ProjectBuilder:
+    """Инкрементальная сборка проекта из нескольких файлов .amiga1.
+
+    Состояние прошлой сборки (время изменения, размер, хэш и подключаемые
+    файлы) хранится в .amiga_build.json. Пересобираются изменённые файлы
+    и все файлы, которые подключают их прямо или через другие файлы;
+    независимые файлы компилируются параллельно в нескольких процессах.
+    """
+
+    def __init__(self, root, cache_dir=None, workers=None):
+        self.root = os.path.abspath(root)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.state_path = os.path.join(self.root, STATE_FILE)
+
+    def load_state(self):
+        """Читает состояние прошлой сборки (пути в нём относительные)"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if state.get("version") != STATE_VERSION:
+            return {}
+
+        files = {}
+        for name, entry in state["files"].items():
+            entry["imports"] = [os.path.join(self.root, dep) for dep in entry["imports"]]
+            files[os.path.join(self.root, name)] = entry
+        return files
+
+    def save_state(self, files):
+        """Сохраняет состояние сборки"""
+        relative = {}
+        for path, entry in files.items():
+            entry = dict(entry, imports=[os.path.relpath(dep, self.root) for dep in entry["imports"]])
+            relative[os.path.relpath(path, self.root)] = entry
+        state = {"version": STATE_VERSION, "files": relative}
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(state, file, ensure_ascii=False, indent=1)
+        os.replace(temp_path, self.state_path)
+
+    def changed_files(self, paths, state):
+        """Файлы, изменившиеся с прошлой сборки (и файлы, собранные с ошибкой)"""
+        changed = set()
+        for path in paths:
+            entry = state.get(path)
+            if not entry or entry["error"]:
+                changed.add(path)
+                continue
+            stat = os.stat(path)
+            if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            if entry["size"] == stat.st_size:
+                # Время изменилось, но содержимое могло остаться прежним
+                with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                    if source_hash(file.read()) == entry["hash"]:
+                        entry["mtime"] = stat.st_mtime_ns
+                        continue
+            changed.add(path)
+        return changed
+
+    def dependents(self, targets, imports):
+        """Все файлы, которые подключают targets прямо или косвенно"""
+        users = {}
+        for path, deps in imports.items():
+            for dep in deps:
+                users.setdefault(dep, set()).add(path)
+
+        found = set()
+        stack = list(targets)
+        while stack:
+            for user in users.get(stack.pop(), ()):
+                if user not in found:
+                    found.add(user)
+                    stack.append(user)
+        return found
+
+    def build(self, force=False):
+        """Собирает проект и возвращает отчёт со временем компиляции по файлам"""
+        start = time.perf_counter()
+        paths = [os.path.abspath(path) for path in find_programs(self.root)]
+        state = {} if force else self.load_state()
+        imports = {path: set(entry["imports"]) for path, entry in state.items()}
+
+        changed = self.changed_files(paths, state)
+        removed = set(state) - set(paths)
+        dirty = (changed | self.dependents(changed | removed, imports)) & set(paths)
+
+        files = {path: state[path] for path in paths if path in state and path not in dirty}
+        results = {}
+        levels = build_order(dirty, imports)
+        if dirty:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for level in levels:
+                    for result in pool.map(compile_file, level, [self.cache_dir] * len(level)):
+                        results[result["file"]] = result
+
+        for path, result in results.items():
+            stat = os.stat(path)
+            files[path] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "hash": result["hash"],
+                           "imports": result["imports"], "error": result["error"]}
+        self.save_state(files)
+
+        report_files = []
+        for path in paths:
+            result = results.get(path)
+            if result is None:
+                report_files.append({"file": path, "status": "unchanged", "time": 0.0, "error": None})
+            else:
+                report_files.append({"file": path, "status": "error" if result["error"] else "compiled",
+                                     "time": result["time"], "error": result["error"]})
+
+        return {
+            "root": self.root,
+            "total": len(paths),
+            "compiled": sum(1 for item in report_files if item["status"] == "compiled"),
+            "unchanged": sum(1 for item in report_files if item["status"] == "unchanged"),
+            "errors": sum(1 for item in report_files if item["status"] == "error"),
+            "levels": len(levels),
+            "time": round(time.perf_counter() - start, 6),
+            "files": report_files
+        }
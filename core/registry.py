@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import importlib
+import importlib.util
+import os
+
+# Группа entry points, через которую пакеты добавляют свои модули AMIGA
+ENTRY_POINT_GROUP = "amiga.modules"
+
+# Переменная окружения со списком каталогов плагинов (через os.pathsep)
+PLUGIN_PATH_ENV = "AMIGA_PLUGIN_PATH"
+
+# Встроенные модули: фабрики задаются строкой "модуль:функция" и
+# импортируются только при первом @use
+BUILTIN_MODULES = {
+    "Console": __package__ + ".modules:create_console",
+    "Times": __package__ + ".modules:create_times",
+}
+
+def load_object(reference):
+    """Импортирует объект по ссылке вида "пакет.модуль:имя" """
+    module_name, _, attribute = reference.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+class ModuleRegistry:
+    """Реестр фабрик модулей AMIGA.
+
+    Фабрика - функция factory(interpreter), создающая объект модуля, или
+    строка "пакет.модуль:функция". Внешние модули ищутся один раз, при
+    первом обращении к неизвестному имени: в entry points группы
+    amiga.modules и в файлах *.py каталогов плагинов. Файл плагина
+    определяет функцию register(registry).
+    """
+
+    def __init__(self, plugin_dirs=None, builtins=BUILTIN_MODULES):
+        self.factories = dict(builtins)
+        if plugin_dirs is None:
+            plugin_dirs = [path for path in os.environ.get(PLUGIN_PATH_ENV, "").split(os.pathsep) if path]
+        self.plugin_dirs = list(plugin_dirs)
+        self.discovered = False
+
+    def register(self, name, factory):
+        """Добавляет фабрику модуля (заменяет существующую)"""
+        self.factories[name] = factory
+
+    def names(self):
+        """Имена всех известных модулей"""
+        self.discover()
+        return sorted(self.factories)
+
+    def factory(self, name, discover=True):
+        """Возвращает фабрику модуля или None.
+
+        При discover=False неизвестное имя не запускает поиск внешних модулей.
+        """
+        factory = self.factories.get(name)
+        if factory is None and discover and not self.discovered:
+            self.discover()
+            factory = self.factories.get(name)
+        if isinstance(factory, str):
+            factory = self.factories[name] = load_object(factory)
+        return factory
+
+    def create(self, name, interpreter, discover=True):
+        """Создаёт модуль для интерпретатора или возвращает None"""
+        factory = self.factory(name, discover)
+        return factory(interpreter) if factory else None
+
+    def discover(self):
+        """Ищет модули в entry points и каталогах плагинов (один раз)"""
+        if self.discovered:
+            return
+        self.discovered = True
+
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception:
+            found = []
+        for entry_point in found:
+            self.factories.setdefault(entry_point.name, entry_point.value)
+
+        for directory in self.plugin_dirs:
+            self.load_plugins(directory)
+
+    def load_plugins(self, directory):
+        """Загружает файлы плагинов *.py из каталога"""
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.py') or name.startswith('_'):
+                continue
+            path = os.path.join(directory, name)
+            spec = importlib.util.spec_from_file_location("amiga_plugin_" + name[:-3], path)
+            plugin = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(plugin)
+            register = getattr(plugin, 'register', None)
+            if callable(register):
+                register(self)
+
+# Реестр по умолчанию, общий для всех интерпретаторов процесса
+default_registry = ModuleRegistry()
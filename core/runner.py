@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import resource
+except ImportError:  # Windows: лимит памяти недоступен
+    resource = None
+
+from .interpreter import AMIGAInterpreter
+from .inputs import ListInputProvider, FileInputProvider
+from .errors import AMIGAError, AMIGALimitError
+from .coverage import CoverageCollector, CoverageData, LineCoverage
+
+# Запас времени для сигнала-страховки сверх лимита интерпретатора, с
+ALARM_GRACE = 1.0
+
+class RunTimeout(BaseException):
+    """Программа не остановилась по лимиту интерпретатора (например, в time.sleep).
+    
+    Наследуется от BaseException, как KeyboardInterrupt, чтобы обработчики
+    ошибок внутри циклов интерпретатора не перехватывали его.
+    """
+
+# Сколько последних символов вывода программы попадает в отчёт
+OUTPUT_LIMIT = 64 * 1024
+
+class OutputTail:
+    """Вывод программы, от которого хранятся только последние limit символов"""
+
+    def __init__(self, limit=OUTPUT_LIMIT):
+        self.limit = limit
+        self.parts = deque()
+        self.size = 0
+        self.truncated = False
+
+    def append(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        while self.size > self.limit and len(self.parts) > 1:
+            self.size -= len(self.parts.popleft())
+            self.truncated = True
+
+    def text(self):
+        text = "".join(self.parts)
+        if len(text) > self.limit:
+            text = text[-self.limit:]
+            self.truncated = True
+        return text
+
+# Интерпретатор процесса-исполнителя, переиспользуется через reset()
+worker_interpreter = None
+
+def get_interpreter():
+    """Возвращает чистый интерпретатор текущего процесса"""
+    global worker_interpreter
+    if worker_interpreter is None:
+        worker_interpreter = AMIGAInterpreter()
+    else:
+        worker_interpreter.reset()
+    return worker_interpreter
+
+def limit_memory(memory_limit):
+    """Ограничивает адресное пространство процесса-исполнителя (в МБ)"""
+    if resource and memory_limit:
+        limit = int(memory_limit * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def on_alarm(signum, frame):
+    """Обработчик сигнала таймера"""
+    raise RunTimeout()
+
+def find_programs(directory):
+    """Возвращает отсортированный список файлов .amiga1 в каталоге и подкаталогах"""
+    programs = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.amiga1'):
+                programs.append(os.path.join(root, name))
+    return programs
+
+def run_program(path, time_limit=None, max_steps=None, coverage=False):
+    """Выполняет одну программу в чистом интерпретаторе и возвращает результат.
+    
+    Данные для Console.Input берутся из файла с тем же именем и
+    расширением .in, если он есть; иначе ввод пустой. При coverage=True
+    в результат добавляется покрытие строк (битовые карты в hex). Из
+    вывода сохраняются последние OUTPUT_LIMIT символов; если начало
+    отброшено, output_truncated равен True.
+    """
+    output = OutputTail()
+    interpreter = get_interpreter()
+    interpreter.output_callback = output.append
+    interpreter.time_limit = time_limit
+    interpreter.max_steps = max_steps
+    
+    input_path = os.path.splitext(path)[0] + '.in'
+    if os.path.exists(input_path):
+        interpreter.input_callback = FileInputProvider(input_path)
+    else:
+        interpreter.input_callback = ListInputProvider([])
+    
+    result = {"file": path, "status": "ok", "exit_code": 0, "error": None,
+              "line": None, "column": None}
+    
+    collector = CoverageCollector() if coverage else None
+    if collector:
+        collector.attach(interpreter)
+    
+    use_alarm = bool(time_limit) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, time_limit + ALARM_GRACE)
+    
+    start = time.perf_counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            code = file.read()
+        interpreter.run(code, path)
+    except AMIGALimitError as e:
+        result.update(status="timeout", exit_code=2, error=str(e), line=e.line, column=e.column)
+    except RunTimeout:
+        result.update(status="timeout", exit_code=2,
+                      error="Превышено время выполнения ({} с)".format(time_limit))
+    except MemoryError:
+        result.update(status="memory", exit_code=3, error="Превышен лимит памяти")
+    except AMIGAError as e:
+        result.update(status="error", exit_code=1, error=str(e), line=e.line, column=e.column)
+    except Exception as e:
+        result.update(status="error", exit_code=1, error=str(e))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if collector:
+            collector.detach()
+    
+    result["time"] = round(time.perf_counter() - start, 6)
+    result["output"] = output.text()
+    result["output_truncated"] = output.truncated
+    if collector:
+        result["coverage"] = collector.data.to_dict()["files"]
+    return result
+
+def crashed_result(path, error):
+    """Результат программы, процесс-исполнитель которой завершился аварийно"""
+    return {"file": path, "status": "crashed", "exit_code": 4,
+            "error": "Процесс-исполнитель завершился аварийно: {}".format(error or type(error).__name__),
+            "line": None, "column": None, "time": 0.0, "output": "", "output_truncated": False}
+
+def run_directory(directory, workers=None, time_limit=10.0, memory_limit=256, max_steps=None,
+                  coverage=False):
+    """Параллельно выполняет все программы каталога и возвращает отчёт.
+    
+    Каждая программа выполняется в процессе пула в сброшенном интерпретаторе;
+    memory_limit задаётся в мегабайтах на процесс-исполнитель. При
+    coverage=True покрытие всех запусков объединяется по файлам в поле
+    "coverage" отчёта. Если процесс-исполнитель падает (например, его
+    убивает система), программы без результата получают статус "crashed",
+    а отчёт по остальным сохраняется.
+    """
+    programs = find_programs(directory)
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=limit_memory,
+                             initargs=(memory_limit,)) as pool:
+        futures = {pool.submit(run_program, path, time_limit, max_steps, coverage): index
+                   for index, path in enumerate(programs)}
+        results = [None] * len(programs)
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = crashed_result(programs[index], e)
+    
+    passed = sum(1 for result in results if result["status"] == "ok")
+    report = {
+        "directory": directory,
+        "total": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "time": round(time.perf_counter() - start, 6),
+        "results": results
+    }
+    if coverage:
+        report["coverage"] = merge_coverage(results).to_dict()
+    return report
+
+def merge_coverage(results):
+    """Объединяет покрытие из результатов запусков по файлам"""
+    data = CoverageData()
+    for result in results:
+        for filename, coverage in result.pop("coverage", {}).items():
+            data.add(filename, LineCoverage.from_dict(coverage))
+    return data
+
+def write_report(report, path):
+    """Сохраняет отчёт в JSON"""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
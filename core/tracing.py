@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from collections import Counter, deque
+
+class SamplingTracer:
+    """Трассировщик, записывающий каждый N-й оператор в кольцевой буфер.
+
+    Подписывается на on_statement интерпретатора; буфер хранит последние
+    size записей (файл, строка, номер оператора), старые вытесняются.
+    """
+
+    def __init__(self, every=100, size=4096):
+        self.every = every
+        self.records = deque(maxlen=size)
+        self.statements = 0
+        self.countdown = every
+        self.interpreter = None
+
+    def attach(self, interpreter):
+        """Подписывается на операторы интерпретатора"""
+        self.interpreter = interpreter
+        interpreter.add_hook("on_statement", self.on_statement)
+
+    def detach(self):
+        """Отписывается от интерпретатора"""
+        if self.interpreter:
+            self.interpreter.remove_hook("on_statement", self.on_statement)
+            self.interpreter = None
+
+    def on_statement(self, program, index):
+        """Считает операторы и записывает каждый every-й"""
+        self.statements += 1
+        self.countdown -= 1
+        if self.countdown:
+            return
+        self.countdown = self.every
+        self.records.append((program.filename, index + 1, self.statements))
+
+    def hot_lines(self, top=10):
+        """Строки, чаще всего попадавшие в выборку"""
+        counts = Counter((filename, line) for filename, line, _ in self.records)
+        return counts.most_common(top)
+
+    def format_report(self, top=10):
+        """Текстовый отчёт по выборке"""
+        lines = ["=" * 60, "Трассировка (каждый {}-й оператор)".format(self.every), "=" * 60]
+        lines.append("Выполнено операторов: {}".format(self.statements))
+        lines.append("Записей в буфере: {}".format(len(self.records)))
+        lines.append("")
+        lines.append("Самые частые строки:")
+        total = len(self.records) or 1
+        for (filename, line), count in self.hot_lines(top):
+            where = "{}:{}".format(filename, line) if filename else "строка {}".format(line)
+            lines.append("  {:>6.1f}%  {}".format(count * 100.0 / total, where))
+        return "\n".join(lines)
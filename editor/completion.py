@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+import re
+import tkinter as tk
+
+from core.compiler import classify, OP_TYPED_VAR, OP_DECLARE, OP_FOR, OP_CLASS, OP_METHOD
+from core.registry import default_registry
+from .syntax import KEYWORDS
+
+# Типы переменных для автодополнения
+TYPE_NAMES = ("int", "float", "string")
+
+# Методы массивов, доступные через точку
+ARRAY_MEMBERS = ("length", "push", "pop", "shift", "toString")
+
+# Слово перед курсором: необязательный объект с точкой и начало имени
+WORD_BEFORE_RE = re.compile(r'(?:([A-Za-z_]\w*)\.)?([A-Za-z_]\w*)?$')
+
+class TrieNode:
+    """Узел префиксного дерева"""
+    __slots__ = ("children", "count", "kind")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0      # сколько раз слово добавлено (одно имя объявляется в разных строках)
+        self.kind = None
+
+class PrefixTrie:
+    """Префиксное дерево слов со счётчиком ссылок"""
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def add(self, word, kind):
+        """Добавляет слово (повторное добавление увеличивает счётчик)"""
+        node = self.root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = TrieNode()
+            node = child
+        node.count += 1
+        node.kind = kind
+
+    def remove(self, word):
+        """Уменьшает счётчик слова и удаляет пустые ветви"""
+        path = []
+        node = self.root
+        for char in word:
+            path.append((node, char))
+            node = node.children.get(char)
+            if node is None:
+                return
+        if node.count:
+            node.count -= 1
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.count or child.children:
+                break
+            del parent.children[char]
+
+    def complete(self, prefix, limit=50):
+        """Слова с префиксом prefix по алфавиту: список (слово, вид)"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        result = []
+        stack = [(node, prefix)]
+        while stack and len(result) < limit:
+            node, word = stack.pop()
+            if node.count:
+                result.append((word, node.kind))
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], word + char))
+        return result
+
+def public_members(module):
+    """Методы модуля, доступные из AMIGA (с заглавной буквы, без вложенных классов)"""
+    names = []
+    for name in dir(module):
+        if name[:1].isupper():
+            value = getattr(module, name)
+            if callable(value) and not isinstance(value, type):
+                names.append(name)
+    return names
+
+def line_symbols(line):
+    """Имена, которые объявляет строка: кортеж (имя, вид)"""
+    line = line.strip()
+    kind = classify(line)
+    if kind == OP_TYPED_VAR:
+        parts = line.split('=', 1)[0].split()
+        if len(parts) >= 3:
+            return ((parts[2], "variable"),)
+    elif kind == OP_DECLARE:
+        var_part = line.split('>>', 1)[1]
+        if '=' in var_part:
+            return ((var_part.split('=', 1)[0].strip(), "variable"),)
+    elif kind == OP_FOR:
+        content = line[4:].strip(' (')
+        if ' in ' in content:
+            return ((content.split(' in ', 1)[0].strip(), "variable"),)
+    elif kind == OP_METHOD:
+        parts = line.split()
+        if len(parts) >= 3:
+            return ((parts[2].split('(')[0], "method"),)
+    elif kind == OP_CLASS:
+        parts = line.split()
+        if len(parts) >= 4:
+            return ((parts[3].rstrip('{').strip(), "class"),)
+    return ()
+
+class SymbolIndex:
+    """Индекс имён буфера для автодополнения.
+
+    Для каждой строки хранится кортеж объявленных в ней имён, все имена
+    лежат в префиксном дереве. При правке пересчитываются только
+    изменённые строки, поэтому поиск не просматривает текст заново.
+    """
+
+    def __init__(self, registry=default_registry):
+        self.trie = PrefixTrie()
+        self.lines = []
+        self.variables = {}  # имя -> число объявлений (для методов массивов)
+        for word in KEYWORDS:
+            self.trie.add(word, "keyword")
+        for word in TYPE_NAMES:
+            self.trie.add(word, "type")
+        for name in registry.names():
+            self.trie.add(name, "module")
+
+    def update(self, first, stop, new_lines):
+        """Заменяет строки [first, stop) (с 0) строками new_lines"""
+        for symbols in self.lines[first:stop]:
+            for name, kind in symbols:
+                self.trie.remove(name)
+                if kind == "variable":
+                    self.variables[name] -= 1
+        symbols_list = [line_symbols(line) for line in new_lines]
+        self.lines[first:stop] = symbols_list
+        for symbols in symbols_list:
+            for name, kind in symbols:
+                self.trie.add(name, kind)
+                if kind == "variable":
+                    self.variables[name] = self.variables.get(name, 0) + 1
+
+    def rebuild(self, text):
+        """Строит индекс заново по всему тексту"""
+        self.update(0, len(self.lines), text.split('\n'))
+
+    def complete(self, prefix, limit=50):
+        """Имена с префиксом prefix"""
+        return self.trie.complete(prefix, limit)
+
+    def is_variable(self, name):
+        """Объявлена ли переменная name в тексте"""
+        return self.variables.get(name, 0) > 0
+
+class CompletionPopup:
+    """Всплывающий список автодополнения под курсором.
+
+    members(name) возвращает методы модуля name; без него после точки
+    предлагаются только методы массивов.
+    """
+
+    def __init__(self, text_widget, index, members=None, limit=50):
+        self.text = text_widget
+        self.index = index
+        self.members = members
+        self.limit = limit
+        self.window = None
+        self.listbox = None
+        self.items = []
+        self.prefix = ""
+        self.pending = None
+
+    def schedule(self, event=None):
+        """Обновляет список после того, как символ попадёт в текст"""
+        if self.pending is None:
+            self.pending = self.text.after_idle(self.refresh)
+
+    def refresh(self, force=False):
+        """Пересчитывает варианты для слова перед курсором"""
+        self.pending = None
+        before = self.text.get("insert linestart", "insert")
+        match = WORD_BEFORE_RE.search(before)
+        owner, prefix = match.group(1), match.group(2) or ""
+
+        if owner:
+            items = [(name, "member") for name in self.member_names(owner) if name.startswith(prefix)]
+        elif prefix and (force or self.is_visible() or len(prefix) >= 2):
+            items = [item for item in self.index.complete(prefix, self.limit) if item[0] != prefix]
+        else:
+            items = []
+
+        if not items:
+            self.hide()
+            return
+        self.prefix = prefix
+        self.show(items)
+
+    def member_names(self, owner):
+        """Методы модуля или массива"""
+        if self.members:
+            names = self.members(owner)
+            if names:
+                return names
+        if self.index.is_variable(owner):
+            return ARRAY_MEMBERS
+        return ()
+
+    def is_visible(self):
+        return self.window is not None
+
+    def show(self, items):
+        """Показывает список под курсором"""
+        if self.window is None:
+            self.window = tk.Toplevel(self.text)
+            self.window.wm_overrideredirect(True)
+            self.listbox = tk.Listbox(self.window, height=8, activestyle="dotbox",
+                                      font=self.text.cget("font"), exportselection=False)
+            self.listbox.pack(fill=tk.BOTH, expand=True)
+            self.listbox.bind("<Double-Button-1>", lambda e: self.accept())
+
+        self.listbox.delete(0, tk.END)
+        width = 10
+        for name, kind in items:
+            label = "{}  ({})".format(name, kind) if kind else name
+            width = max(width, len(label))
+            self.listbox.insert(tk.END, label)
+        self.items = items
+        self.listbox.config(width=width + 2, height=min(8, len(items)))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(0)
+        self.listbox.activate(0)
+
+        bbox = self.text.bbox("insert")
+        if bbox:
+            x, y, _, height = bbox
+            self.window.wm_geometry("+{}+{}".format(self.text.winfo_rootx() + x,
+                                                     self.text.winfo_rooty() + y + height))
+
+    def hide(self, event=None):
+        """Прячет список"""
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+            self.listbox = None
+
+    def move(self, delta):
+        """Сдвигает выделение; возвращает True, если список открыт"""
+        if self.window is None:
+            return False
+        current = self.listbox.curselection()
+        position = (current[0] if current else 0) + delta
+        position = max(0, min(position, self.listbox.size() - 1))
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(position)
+        self.listbox.activate(position)
+        self.listbox.see(position)
+        return True
+
+    def accept(self):
+        """Вставляет выбранный вариант; возвращает True, если список был открыт"""
+        if self.window is None:
+            return False
+        current = self.listbox.curselection()
+        if current:
+            name = self.items[current[0]][0]
+            self.text.insert("insert", name[len(self.prefix):])
+        self.hide()
+        return True
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from core.checker import StaticChecker, SEVERITY_ERROR
+
+# Теги подчёркивания ошибок и предупреждений
+ERROR_TAG = "diagnostic_error"
+WARNING_TAG = "diagnostic_warning"
+
+class DiagnosticsController:
+    """Фоновая проверка текста редактора с подчёркиванием ошибок.
+
+    Проверка запускается через delay мс после последней правки в
+    отдельном потоке; результат забирается из главного потока опросом
+    через after(), поэтому набор текста не ждёт проверку. Если за время
+    проверки текст снова изменился, результат отбрасывается.
+    """
+
+    def __init__(self, text_widget, get_filename=None, delay=400, poll_interval=50):
+        self.text = text_widget
+        self.get_filename = get_filename or (lambda: None)
+        self.delay = delay
+        self.poll_interval = poll_interval
+        self.checker = StaticChecker()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="amiga-checker")
+        self.pending = None      # id отложенного запуска
+        self.future = None
+        self.generation = 0      # номер правки; устаревшие результаты не показываются
+        self.diagnostics = []
+        self.configure_tags()
+
+    def configure_tags(self, is_light_theme=False):
+        """Настраивает подчёркивание"""
+        self.text.tag_configure(ERROR_TAG, underline=True, underlinefg="#e51400")
+        self.text.tag_configure(WARNING_TAG, underline=True,
+                                underlinefg="#bf8803" if is_light_theme else "#cca700")
+
+    def schedule(self):
+        """Откладывает проверку до паузы в наборе"""
+        self.generation += 1
+        if self.pending:
+            self.text.after_cancel(self.pending)
+        self.pending = self.text.after(self.delay, self.start)
+
+    def start(self):
+        """Запускает проверку текущего текста в фоновом потоке"""
+        self.pending = None
+        if self.future and not self.future.done():
+            # Предыдущая проверка ещё идёт: повторим после неё
+            self.pending = self.text.after(self.poll_interval, self.start)
+            return
+        code = self.text.get("1.0", "end-1c")
+        self.future = self.executor.submit(self.checker.check, code, self.get_filename())
+        self.text.after(self.poll_interval, self.poll, self.future, self.generation)
+
+    def poll(self, future, generation):
+        """Забирает результат проверки, когда он готов"""
+        if not future.done():
+            self.text.after(self.poll_interval, self.poll, future, generation)
+            return
+        if generation != self.generation or future.exception() is not None:
+            return
+        self.show(future.result())
+
+    def show(self, diagnostics):
+        """Подчёркивает места из списка Diagnostic"""
+        self.diagnostics = diagnostics
+        self.clear_tags()
+        for item in diagnostics:
+            tag = ERROR_TAG if item.severity == SEVERITY_ERROR else WARNING_TAG
+            self.text.tag_add(tag, "{}.{}".format(item.line, item.column - 1),
+                              "{}.{}".format(item.line, item.end_column - 1))
+
+    def clear_tags(self):
+        """Снимает подчёркивание"""
+        self.text.tag_remove(ERROR_TAG, "1.0", tk.END)
+        self.text.tag_remove(WARNING_TAG, "1.0", tk.END)
+
+    def messages_at(self, line):
+        """Сообщения для строки line"""
+        return [item.message for item in self.diagnostics if item.line == line]
+
+    def close(self):
+        """Останавливает фоновый поток"""
+        if self.pending:
+            self.text.after_cancel(self.pending)
+            self.pending = None
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import os
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# Суффикс идентификатора временного узла "…" у ещё не прочитанного каталога
+PLACEHOLDER_SUFFIX = "\0"
+
+# Период проверки прочитанных каталогов на изменения, мс
+POLL_INTERVAL = 2000
+
+# Сколько узлов добавлять за один вызов after()
+INSERT_CHUNK = 500
+
+# Служебные каталоги, которые не показываются
+IGNORED_NAMES = {"__pycache__"}
+
+def list_directory(path):
+    """Читает каталог: (mtime_ns, [(имя, каталог ли), ...]).
+
+    Сначала каталоги, затем файлы, по алфавиту без учёта регистра;
+    скрытые элементы пропускаются. Время берётся до чтения, поэтому
+    изменение во время чтения заметит следующая проверка.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            if entry.name.startswith('.') or entry.name in IGNORED_NAMES:
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((not is_dir, entry.name.lower(), entry.name, is_dir))
+    entries.sort()
+    return mtime, [(name, is_dir) for _, _, name, is_dir in entries]
+
+class ProjectTree:
+    """Ленивое дерево файлов проекта в ttk.Treeview.
+
+    Идентификатор узла - полный путь. Каталог читается (os.scandir в
+    фоновом потоке) только когда его раскрывают, до этого у него один
+    временный дочерний узел, чтобы была видна стрелка. Большие каталоги
+    добавляются порциями через after(). Прочитанные каталоги раз в
+    poll_interval мс сверяются по времени изменения и при изменении
+    перечитываются; дерево обновляется по разнице, без перестройки.
+    """
+
+    def __init__(self, tree, poll_interval=POLL_INTERVAL):
+        self.tree = tree
+        self.poll_interval = poll_interval
+        self.root = None
+        self.loaded = {}      # путь каталога -> mtime_ns при последнем чтении
+        self.loading = set()
+        self.poll_id = None
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="amiga-tree")
+        self.tree.bind('<<TreeviewOpen>>', self.on_open, add="+")
+
+    def open(self, root):
+        """Показывает папку root"""
+        self.stop_watching()
+        self.root = os.path.abspath(root)
+        self.loaded = {}
+        self.loading = set()
+        self.tree.delete(*self.tree.get_children())
+        name = os.path.basename(self.root) or self.root
+        self.tree.insert("", tk.END, iid=self.root, text="📂 " + name, open=True)
+        self.load(self.root)
+        self.poll_id = self.tree.after(self.poll_interval, self.poll)
+
+    def on_open(self, event=None):
+        """Читает каталог при первом раскрытии"""
+        path = self.tree.focus()
+        if path and path not in self.loaded and self.tree.exists(path + PLACEHOLDER_SUFFIX):
+            self.load(path)
+
+    def load(self, path):
+        """Читает каталог в фоновом потоке"""
+        if path in self.loading:
+            return
+        self.loading.add(path)
+        self.wait(self.executor.submit(list_directory, path), path)
+
+    def wait(self, future, path):
+        """Ждёт окончания чтения каталога, не блокируя интерфейс"""
+        if not future.done():
+            self.tree.after(30, self.wait, future, path)
+            return
+        self.loading.discard(path)
+        if future.exception() is not None or not self.tree.exists(path):
+            return
+        mtime, entries = future.result()
+        self.apply(path, mtime, entries)
+
+    def apply(self, path, mtime, entries):
+        """Приводит дочерние узлы каталога к списку entries"""
+        self.loaded[path] = mtime
+        wanted = [os.path.join(path, name) for name, _ in entries]
+        wanted_set = set(wanted)
+
+        children = self.tree.get_children(path)
+        removed = [item for item in children if item not in wanted_set]
+        if removed:
+            self.tree.delete(*removed)
+            self.forget(removed)
+
+        present = set(children).difference(removed)
+        new = [(index, item, name, is_dir)
+               for index, (item, (name, is_dir)) in enumerate(zip(wanted, entries))
+               if item not in present]
+        self.insert_chunk(path, new, 0)
+
+    def insert_chunk(self, parent, new, start):
+        """Добавляет очередную порцию узлов (по возрастанию позиции)"""
+        if not self.tree.exists(parent):
+            return
+        for index, item, name, is_dir in new[start:start + INSERT_CHUNK]:
+            if self.tree.exists(item):
+                continue
+            self.tree.insert(parent, index, iid=item, text=("📁 " if is_dir else "📄 ") + name)
+            if is_dir:
+                self.tree.insert(item, tk.END, iid=item + PLACEHOLDER_SUFFIX, text="…")
+        if start + INSERT_CHUNK < len(new):
+            self.tree.after(1, self.insert_chunk, parent, new, start + INSERT_CHUNK)
+
+    def forget(self, items):
+        """Перестаёт следить за удалёнными каталогами и их подкаталогами"""
+        prefixes = tuple(item + os.sep for item in items)
+        for path in list(self.loaded):
+            if path in items or path.startswith(prefixes):
+                del self.loaded[path]
+
+    def poll(self):
+        """Проверяет прочитанные каталоги на изменения (замена inotify опросом)"""
+        self.poll_id = self.tree.after(self.poll_interval, self.poll)
+        for path, mtime in list(self.loaded.items()):
+            if path in self.loading:
+                continue
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                continue  # каталог удалён: узел уберёт проверка родителя
+            if current != mtime:
+                self.load(path)
+
+    def refresh(self):
+        """Перечитывает все раскрытые каталоги"""
+        for path in list(self.loaded):
+            self.load(path)
+
+    def stop_watching(self):
+        """Останавливает проверку изменений"""
+        if self.poll_id:
+            self.tree.after_cancel(self.poll_id)
+            self.poll_id = None
+
+    def close(self):
+        """Останавливает проверку и фоновый поток"""
+        self.stop_watching()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .storage import atomic_write
+
+# Версия формата журнала
+JOURNAL_VERSION = 1
+
+# Расширения файлов журнала вкладки
+SNAPSHOT_SUFFIX = '.snap'
+LOG_SUFFIX = '.log'
+
+# Файл блокировки в каталоге журналов процесса: пока процесс жив, файл заблокирован
+LOCK_NAME = 'owner.lock'
+
+# Журнал сжимается в новый снимок, когда правок больше этого размера
+# (но не меньше размера самого снимка), байт
+COMPACT_MIN_BYTES = 64 * 1024
+
+def default_journal_dir():
+    """Каталог журнала по умолчанию: ~/.amiga_journal"""
+    return os.path.join(os.path.expanduser("~"), ".amiga_journal")
+
+def lock_directory(directory):
+    """Блокирует каталог журналов без ожидания: открытый файл блокировки или None.
+
+    Блокировку снимает система, когда процесс завершается (в том числе
+    аварийно), поэтому свободная блокировка значит, что владельца нет.
+    """
+    try:
+        file = open(os.path.join(directory, LOCK_NAME), 'a+b')
+    except OSError:
+        return None
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        file.close()
+        return None
+    return file
+
+def release_directory(directory, lock):
+    """Снимает блокировку и удаляет каталог журналов, если он пуст"""
+    lock.close()
+    for path in (os.path.join(directory, LOCK_NAME), directory):
+        try:
+            if path == directory:
+                os.rmdir(path)
+            else:
+                os.remove(path)
+        except OSError:
+            pass
+
+def apply_edit(lines, first, last, text):
+    """Заменяет строки first..last (с 1) списка lines строками текста text"""
+    lines[first - 1:last] = text.split('\n')
+
+def merge_edits(previous, edit):
+    """Склеивает правку с предыдущей, если она целиком внутри её результата.
+
+    Набор текста в одной строке даёт одну запись вместо записи на
+    каждую клавишу. Возвращает склеенную правку или None.
+    """
+    first0, last0, text0 = previous
+    first, last, text = edit
+    lines = text0.split('\n')
+    if first < first0 or last > first0 + len(lines) - 1:
+        return None
+    apply_edit(lines, first - first0 + 1, last - first0 + 1, text)
+    return first0, last0, '\n'.join(lines)
+
+class TabJournal:
+    """Журнал одной вкладки: снимок текста и правки после него.
+
+    Правки приходят от перехватчика команд редактора (диапазоны строк) и
+    копятся в памяти; flush() дописывает их в <id>.log, так что цена
+    автосохранения зависит от объёма правок, а не от размера файла. Когда
+    журнал разрастается, compact() пишет новый снимок и начинает журнал
+    заново. Номер поколения в каждой записи отсекает записи старого
+    журнала, если сбой случился между записью снимка и очисткой журнала.
+    """
+
+    def __init__(self, directory, editor, get_title, journal_id=None):
+        self.directory = directory
+        self.editor = editor
+        self.get_title = get_title
+        self.id = journal_id or uuid.uuid4().hex
+        self.snapshot_path = os.path.join(directory, self.id + SNAPSHOT_SUFFIX)
+        self.log_path = os.path.join(directory, self.id + LOG_SUFFIX)
+        self.generation = 0       # 0 - снимка ещё нет
+        self.snapshot_size = 0
+        self.log_size = 0
+        self.pending = []         # правки (first, last, text), ещё не записанные
+        self.needs_snapshot = False
+        editor.change_listeners.append(self.on_lines_changed)
+
+    def on_lines_changed(self, first, last, new_last):
+        """Запоминает правку (вызывается из перехватчика команд редактора)"""
+        if self.editor.loading:
+            return  # загружаемый текст совпадает с файлом на диске
+        if first is None:
+            # Изменился весь текст: дешевле записать снимок
+            self.needs_snapshot = True
+            self.pending = []
+            return
+        edit = (first, last, self.editor.text.get("{}.0".format(first), "{}.end".format(new_last)))
+        if self.pending:
+            merged = merge_edits(self.pending[-1], edit)
+            if merged is not None:
+                self.pending[-1] = merged
+                return
+        self.pending.append(edit)
+
+    def flush(self):
+        """Дописывает накопленные правки на диск"""
+        if not (self.pending or self.needs_snapshot):
+            return
+        if self.generation == 0 or self.needs_snapshot:
+            self.compact()
+            return
+
+        data = ''.join(json.dumps({"g": self.generation, "f": first, "l": last, "t": text},
+                                  ensure_ascii=False) + '\n'
+                       for first, last, text in self.pending).encode('utf-8')
+        with open(self.log_path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self.pending = []
+        self.log_size += len(data)
+        if self.log_size > max(COMPACT_MIN_BYTES, self.snapshot_size):
+            self.compact()
+
+    def compact(self):
+        """Пишет снимок текущего текста и очищает журнал правок"""
+        os.makedirs(self.directory, exist_ok=True)
+        self.generation += 1
+        snapshot = {
+            "version": JOURNAL_VERSION,
+            "generation": self.generation,
+            "path": self.editor.filename,
+            "title": self.get_title(),
+            "text": self.editor.text.get("1.0", "end-1c")
+        }
+        data = json.dumps(snapshot, ensure_ascii=False)
+        atomic_write(self.snapshot_path, data)
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self.snapshot_size = len(data)
+        self.log_size = 0
+        self.pending = []
+        self.needs_snapshot = False
+
+    def discard(self):
+        """Удаляет журнал (вкладка сохранена или закрыта)"""
+        self.pending = []
+        self.needs_snapshot = False
+        self.generation = 0
+        self.log_size = 0
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def attach(self, editor):
+        """Получает правки нового редактора вкладки (после выгрузки вкладки)"""
+        self.detach()
+        self.editor = editor
+        editor.change_listeners.append(self.on_lines_changed)
+
+    def detach(self):
+        """Перестаёт получать правки редактора"""
+        if self.on_lines_changed in self.editor.change_listeners:
+            self.editor.change_listeners.remove(self.on_lines_changed)
+
+def recover_tab(snapshot_path):
+    """Восстанавливает текст вкладки из снимка и журнала правок.
+
+    Возвращает словарь с path, title и text или None, если снимок
+    повреждён. Обрезанная при сбое последняя запись журнала пропускается.
+    """
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("version") != JOURNAL_VERSION:
+        return None
+
+    lines = snapshot["text"].split('\n')
+    log_path = snapshot_path[:-len(SNAPSHOT_SUFFIX)] + LOG_SUFFIX
+    try:
+        with open(log_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    edit = json.loads(line)
+                except ValueError:
+                    break
+                if edit["g"] == snapshot["generation"]:
+                    apply_edit(lines, edit["f"], edit["l"], edit["t"])
+    except OSError:
+        pass
+    return {"path": snapshot["path"], "title": snapshot["title"], "text": '\n'.join(lines)}
+
+class Journal:
+    """Журналы автосохранения всех вкладок процесса.
+
+    Каждый процесс пишет в свой подкаталог общего каталога и держит в нём
+    заблокированный файл owner.lock. Оставшимися после сбоя считаются
+    только подкаталоги, блокировку которых удалось взять: журналы другого
+    работающего экземпляра IDE не трогаются.
+    """
+
+    def __init__(self, directory=None):
+        self.root = directory or default_journal_dir()
+        self.directory = os.path.join(self.root, uuid.uuid4().hex)
+        self.tabs = []
+        self.claimed = {}  # каталог завершившегося процесса -> его файл блокировки
+        self.lock = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.lock = lock_directory(self.directory)
+        except OSError:
+            pass  # ошибки записи журнала покажет flush()
+
+    def track(self, editor, get_title):
+        """Начинает вести журнал вкладки"""
+        tab = TabJournal(self.directory, editor, get_title)
+        self.tabs.append(tab)
+        return tab
+
+    def untrack(self, tab):
+        """Закрывает журнал вкладки и удаляет его файлы"""
+        tab.detach()
+        tab.discard()
+        if tab in self.tabs:
+            self.tabs.remove(tab)
+
+    def flush(self):
+        """Дописывает правки всех вкладок; возвращает ошибки записи"""
+        errors = []
+        for tab in self.tabs:
+            try:
+                tab.flush()
+            except OSError as e:
+                errors.append(e)
+        return errors
+
+    def leftovers(self):
+        """Снимки вкладок завершившихся процессов (их вкладки не закрылись).
+
+        Каталоги таких процессов остаются заблокированными этим процессом
+        до recover() или discard_leftovers(), чтобы их не забрал другой.
+        """
+        try:
+            names = sorted(os.listdir(self.root))
+        except OSError:
+            return []
+        snapshots = []
+        for name in names:
+            directory = os.path.join(self.root, name)
+            if directory == self.directory or not os.path.isdir(directory):
+                continue
+            if directory not in self.claimed:
+                lock = lock_directory(directory)
+                if lock is None:
+                    continue  # владелец ещё работает
+                self.claimed[directory] = lock
+            try:
+                files = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            snapshots.extend(os.path.join(directory, file) for file in files if file.endswith(SNAPSHOT_SUFFIX))
+        return snapshots
+
+    def recover(self):
+        """Тексты вкладок прошлого запуска; их файлы журнала удаляются"""
+        recovered = []
+        for snapshot_path in self.leftovers():
+            tab = recover_tab(snapshot_path)
+            if tab is not None:
+                recovered.append(tab)
+            self.remove_files(snapshot_path)
+        self.release_claimed()
+        return recovered
+
+    def discard_leftovers(self):
+        """Удаляет журналы прошлого запуска без восстановления"""
+        for snapshot_path in self.leftovers():
+            self.remove_files(snapshot_path)
+        self.release_claimed()
+
+    def release_claimed(self):
+        """Удаляет разобранные каталоги завершившихся процессов"""
+        for directory, lock in self.claimed.items():
+            release_directory(directory, lock)
+        self.claimed = {}
+
+    def remove_files(self, snapshot_path):
+        for path in (snapshot_path, snapshot_path[:-len(SNAPSHOT_SUFFIX)] + LOG_SUFFIX):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Обычное завершение: журналы больше не нужны"""
+        for tab in list(self.tabs):
+            self.untrack(tab)
+        if self.lock is not None:
+            release_directory(self.directory, self.lock)
+            self.lock = None
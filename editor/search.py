@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+import bisect
+import queue
+import re
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+# Теги совпадений
+MATCH_TAG = "search_match"
+CURRENT_TAG = "search_current"
+
+# Сколько совпадений отправлять из потока поиска за раз
+BATCH_SIZE = 1000
+
+# Сколько совпадений подсвечивать за один вызов after(), чтобы не тормозить ввод
+TAGS_PER_TICK = 5000
+
+# С какого числа замен «Заменить все» заменяет текст целиком, а не по одному совпадению
+BULK_REPLACE_THRESHOLD = 200
+
+def compile_pattern(query, regex=False, case_sensitive=False):
+    """Компилирует строку поиска в регулярное выражение (re.error при ошибке)"""
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(query if regex else re.escape(query), flags)
+
+def line_starts(text):
+    """Смещения начала каждой строки текста"""
+    return [0] + [match.end() for match in re.finditer('\n', text)]
+
+def to_index(starts, offset):
+    """Смещение в тексте -> индекс Tk вида "строка.столбец" """
+    line = bisect.bisect_right(starts, offset) - 1
+    return "{}.{}".format(line + 1, offset - starts[line])
+
+def to_offset(starts, index):
+    """Индекс Tk "строка.столбец" -> смещение в тексте"""
+    line, column = index_key(index)
+    return starts[line - 1] + column
+
+def index_key(index):
+    """Индекс Tk -> кортеж (строка, столбец) для сравнения"""
+    line, column = index.split('.')
+    return int(line), int(column)
+
+def find_matches(pattern, text, starts, start=0, end=None, stop_event=None):
+    """Генерирует пачки совпадений [(начало, конец), ...] как индексы Tk.
+
+    Пустые совпадения пропускаются. stop_event прерывает поиск между пачками.
+    """
+    batch = []
+    for match in pattern.finditer(text, start, len(text) if end is None else end):
+        if match.start() == match.end():
+            continue
+        batch.append((to_index(starts, match.start()), to_index(starts, match.end())))
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+            if stop_event is not None and stop_event.is_set():
+                return
+    if batch:
+        yield batch
+
+class SearchPanel(ttk.Frame):
+    """Панель поиска и замены над редактором.
+
+    Поиск идёт в фоновом потоке по снимку текста: сначала синхронно
+    ищется видимая часть, затем поток передаёт пачки совпадений через
+    очередь, а главный поток подсвечивает их порциями в after(), так что
+    редактор остаётся отзывчивым и на файлах в сотни тысяч строк.
+    """
+
+    def __init__(self, parent, text_widget, on_replace=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.text = text_widget
+        self.on_replace = on_replace  # вызывается после замены (перекраска синтаксиса)
+
+        self.query_var = tk.StringVar()
+        self.replace_var = tk.StringVar()
+        self.regex_var = tk.BooleanVar(value=False)
+        self.case_var = tk.BooleanVar(value=False)
+        self.status_var = tk.StringVar()
+
+        self.pattern = None
+        self.matches = []       # отсортированные пары индексов Tk
+        self.match_keys = []    # index_key начала каждого совпадения (для bisect)
+        self.current = -1
+        self.results = queue.Queue()
+        self.stop_event = None
+        self.searching = False
+        self.pending = None
+        self.generation = 0     # номер поиска; опрос старого поиска прекращается
+
+        self.setup_ui()
+        self.text.tag_configure(MATCH_TAG, background="#f6e58d", foreground="#000000")
+        self.text.tag_configure(CURRENT_TAG, background="#f0932b", foreground="#000000")
+        self.text.tag_raise("sel")
+
+    def setup_ui(self):
+        """Создание элементов панели"""
+        self.query_entry = ttk.Entry(self, textvariable=self.query_var, width=30)
+        self.query_entry.grid(row=0, column=0, padx=2, pady=2, sticky=tk.EW)
+        ttk.Button(self, text="▲", width=3, command=lambda: self.step(-1)).grid(row=0, column=1, padx=1)
+        ttk.Button(self, text="▼", width=3, command=lambda: self.step(1)).grid(row=0, column=2, padx=1)
+        ttk.Checkbutton(self, text="Regex", variable=self.regex_var,
+                        command=self.schedule_search).grid(row=0, column=3, padx=2)
+        ttk.Checkbutton(self, text="Aa", variable=self.case_var,
+                        command=self.schedule_search).grid(row=0, column=4, padx=2)
+        ttk.Label(self, textvariable=self.status_var, width=18).grid(row=0, column=5, padx=4)
+        ttk.Button(self, text="✕", width=3, command=self.close).grid(row=0, column=6, padx=1)
+
+        self.replace_entry = ttk.Entry(self, textvariable=self.replace_var, width=30)
+        self.replace_entry.grid(row=1, column=0, padx=2, pady=2, sticky=tk.EW)
+        ttk.Button(self, text="Заменить", command=self.replace_current).grid(row=1, column=1, columnspan=2, padx=1)
+        ttk.Button(self, text="Заменить все", command=self.replace_all).grid(row=1, column=3, columnspan=2, padx=1)
+        self.columnconfigure(0, weight=1)
+
+        self.query_var.trace_add("write", lambda *args: self.schedule_search())
+        self.query_entry.bind("<Return>", lambda e: self.step(1))
+        self.query_entry.bind("<Shift-Return>", lambda e: self.step(-1))
+        self.query_entry.bind("<Escape>", lambda e: self.close())
+        self.replace_entry.bind("<Escape>", lambda e: self.close())
+
+    def focus_query(self):
+        """Переводит фокус в строку поиска, подставляя выделенный текст"""
+        try:
+            selected = self.text.get("sel.first", "sel.last")
+        except tk.TclError:
+            selected = ""
+        if selected and '\n' not in selected:
+            self.query_var.set(selected)
+        self.query_entry.focus_set()
+        self.query_entry.select_range(0, tk.END)
+
+    def schedule_search(self, delay=150):
+        """Откладывает поиск до паузы в наборе"""
+        self.cancel_pending()
+        self.pending = self.after(delay, self.search)
+
+    def cancel_pending(self):
+        """Отменяет отложенный поиск"""
+        if self.pending:
+            self.after_cancel(self.pending)
+            self.pending = None
+
+    def search(self):
+        """Запускает поиск по всему тексту"""
+        self.cancel_pending()
+        self.cancel()
+        self.clear_tags()
+        self.matches = []
+        self.match_keys = []
+        self.current = -1
+
+        query = self.query_var.get()
+        if not query:
+            self.status_var.set("")
+            return
+        try:
+            self.pattern = compile_pattern(query, self.regex_var.get(), self.case_var.get())
+        except re.error as e:
+            self.pattern = None
+            self.status_var.set("Ошибка: {}".format(e))
+            return
+
+        text = self.text.get("1.0", "end-1c")
+        starts = line_starts(text)
+
+        # Видимая часть подсвечивается сразу, не дожидаясь потока
+        first = int(self.text.index("@0,0").split('.')[0])
+        last = int(self.text.index("@0,{}".format(self.text.winfo_height())).split('.')[0])
+        visible_end = starts[last] if last < len(starts) else len(text)
+        for batch in find_matches(self.pattern, text, starts, starts[first - 1], visible_end):
+            self.add_tags(batch)
+
+        self.stop_event = threading.Event()
+        self.results = queue.Queue()
+        self.searching = True
+        self.generation += 1
+        self.status_var.set("Поиск...")
+        worker = threading.Thread(target=self.search_worker,
+                                  args=(self.pattern, text, starts, self.stop_event, self.results),
+                                  daemon=True)
+        worker.start()
+        self.after(20, self.poll, self.generation)
+
+    def search_worker(self, pattern, text, starts, stop_event, results):
+        """Поток поиска: складывает пачки совпадений в очередь"""
+        for batch in find_matches(pattern, text, starts, stop_event=stop_event):
+            results.put(batch)
+        results.put(None)
+
+    def poll(self, generation):
+        """Забирает найденные совпадения и подсвечивает их порциями"""
+        if not self.searching or generation != self.generation:
+            return
+        tagged = 0
+        while tagged < TAGS_PER_TICK:
+            try:
+                batch = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self.searching = False
+                break
+            self.matches.extend(batch)
+            self.match_keys.extend(index_key(start) for start, end in batch)
+            self.add_tags(batch)
+            tagged += len(batch)
+
+        self.status_var.set("{}{}".format(len(self.matches), "..." if self.searching else " совп."))
+        if self.searching:
+            self.after(20, self.poll, generation)
+        elif self.matches and self.current < 0:
+            self.select(self.nearest(self.text.index("insert")))
+
+    def add_tags(self, batch):
+        """Подсвечивает пачку совпадений одним вызовом Tk"""
+        ranges = [index for pair in batch for index in pair]
+        self.text.tag_add(MATCH_TAG, *ranges)
+
+    def clear_tags(self):
+        """Снимает подсветку совпадений"""
+        self.text.tag_remove(MATCH_TAG, "1.0", tk.END)
+        self.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+
+    def cancel(self):
+        """Останавливает идущий поиск"""
+        if self.stop_event:
+            self.stop_event.set()
+        self.searching = False
+
+    def nearest(self, index):
+        """Номер первого совпадения не раньше index"""
+        number = bisect.bisect_left(self.match_keys, index_key(index))
+        return number if number < len(self.matches) else 0
+
+    def select(self, number):
+        """Делает совпадение текущим и прокручивает к нему"""
+        if not self.matches:
+            return
+        self.current = number % len(self.matches)
+        start, end = self.matches[self.current]
+        self.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+        self.text.tag_add(CURRENT_TAG, start, end)
+        self.text.mark_set("insert", end)
+        self.text.see(start)
+        self.status_var.set("{} из {}".format(self.current + 1, len(self.matches)))
+
+    def step(self, delta):
+        """Переход к следующему или предыдущему совпадению"""
+        if self.pending or not self.pattern:
+            self.search()
+            return
+        if self.matches:
+            self.select(self.current + delta if self.current >= 0 else self.nearest(self.text.index("insert")))
+
+    def replacement_for(self, match, replacement):
+        """Текст замены для совпадения re.Match (группы подставляются в режиме regex)"""
+        if self.regex_var.get():
+            return match.expand(replacement)
+        return replacement
+
+    def replace_current(self):
+        """Заменяет текущее совпадение и переходит к следующему"""
+        if self.current < 0 or not self.matches:
+            self.step(1)
+            return
+        start, end = self.matches[self.current]
+        # Совпадение ищется заново во всём тексте: просмотр назад и вперёд
+        # и \b видят окружение так же, как при поиске
+        text = self.text.get("1.0", "end-1c")
+        starts = line_starts(text)
+        match = self.pattern.match(text, to_offset(starts, start))
+        if match is None or match.end() != to_offset(starts, end):
+            self.search()  # текст изменился после поиска
+            return
+        self.text.delete(start, end)
+        self.text.insert(start, self.replacement_for(match, self.replace_var.get()))
+        if self.on_replace:
+            self.on_replace()
+        self.search()
+
+    def replace_all(self):
+        """Заменяет все совпадения одним шагом отмены"""
+        if self.pattern is None:
+            self.search()
+        if self.pattern is None:
+            return
+        self.cancel()
+
+        text = self.text.get("1.0", "end-1c")
+        # Пустые совпадения не заменяются (как и не подсвечиваются при поиске)
+        matches = [match for match in self.pattern.finditer(text) if match.start() != match.end()]
+        count = len(matches)
+        replacement = self.replace_var.get()
+        if not count:
+            self.status_var.set("Нет совпадений")
+            return
+
+        insert = self.text.index("insert")
+        # Все замены - один шаг отмены (правки одного события редактор склеивает сам)
+        self.text.edit_separator()
+        try:
+            if count >= BULK_REPLACE_THRESHOLD:
+                # Много замен: одна правка всего текста быстрее тысяч insert/delete
+                pieces = []
+                position = 0
+                for match in matches:
+                    pieces.append(text[position:match.start()])
+                    pieces.append(self.replacement_for(match, replacement))
+                    position = match.end()
+                pieces.append(text[position:])
+                self.text.delete("1.0", "end-1c")
+                self.text.insert("1.0", "".join(pieces))
+            else:
+                starts = line_starts(text)
+                for match in reversed(matches):
+                    start, end = to_index(starts, match.start()), to_index(starts, match.end())
+                    self.text.delete(start, end)
+                    self.text.insert(start, self.replacement_for(match, replacement))
+        finally:
+            self.text.edit_separator()
+
+        self.text.mark_set("insert", insert)
+        self.text.see("insert")
+        if self.on_replace:
+            self.on_replace()
+        # Правки запланировали повторный поиск; после замены всех совпадений он не нужен
+        self.cancel_pending()
+        self.clear_tags()
+        self.matches = []
+        self.match_keys = []
+        self.current = -1
+        self.status_var.set("Заменено: {}".format(count))
+
+    def close(self):
+        """Прячет панель и снимает подсветку"""
+        self.cancel()
+        self.clear_tags()
+        self.matches = []
+        self.match_keys = []
+        self.current = -1
+        self.pack_forget()
+        self.text.focus_set()
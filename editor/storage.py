@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Результаты сохранения
+SAVE_SAVED = "saved"
+SAVE_UNCHANGED = "unchanged"
+SAVE_CONFLICT = "conflict"
+
+def text_hash(text):
+    """Хэш текста файла"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class FileState:
+    """Файл на диске при последнем открытии или сохранении"""
+    __slots__ = ("mtime", "size", "hash")
+
+    def __init__(self, mtime, size, hash):
+        self.mtime = mtime  # st_mtime_ns
+        self.size = size
+        self.hash = hash    # хэш текста (после чтения в текстовом режиме)
+
+def read_file(path, encoding='utf-8'):
+    """Читает файл: (текст, FileState)"""
+    with open(path, 'r', encoding=encoding) as file:
+        stat = os.fstat(file.fileno())
+        text = file.read()
+    return text, FileState(stat.st_mtime_ns, stat.st_size, text_hash(text))
+
+def is_modified_externally(path, state):
+    """Изменился ли файл на диске после state.
+
+    Совпадение времени изменения и размера считается отсутствием
+    изменений; при расхождении сравнивается содержимое, чтобы простое
+    обновление времени файла не считалось правкой.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if stat.st_mtime_ns == state.mtime and stat.st_size == state.size:
+        return False
+    try:
+        text, _ = read_file(path)
+    except (OSError, UnicodeDecodeError):
+        return True
+    return text_hash(text) != state.hash
+
+def atomic_write(path, text, encoding='utf-8'):
+    """Записывает файл атомарно: во временный файл рядом, затем os.replace.
+
+    При сбое во время записи на диске остаётся старая версия файла.
+    Возвращает FileState записанного файла.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    stat = os.stat(path)
+    return FileState(stat.st_mtime_ns, stat.st_size, text_hash(text))
+
+class FileSaver:
+    """Сохранение файлов в фоновом потоке.
+
+    Записи выполняются по очереди в одном потоке, поэтому порядок
+    сохранений одного файла не нарушается. Главный поток передаёт снимок
+    текста и получает Future с (результат, FileState).
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="amiga-save")
+
+    def save(self, path, text, state=None, force=False):
+        """Ставит сохранение в очередь.
+
+        state - состояние файла при открытии или прошлом сохранении. Если
+        файл с тех пор изменили на диске, результат SAVE_CONFLICT и файл
+        не трогается (force=True перезаписывает); если текст не изменился -
+        SAVE_UNCHANGED без записи.
+        """
+        return self.executor.submit(self.write, path, text, state, force)
+
+    def write(self, path, text, state, force):
+        if state is not None and not force:
+            if is_modified_externally(path, state):
+                return SAVE_CONFLICT, state
+            if text_hash(text) == state.hash and os.path.exists(path):
+                return SAVE_UNCHANGED, state
+        return SAVE_SAVED, atomic_write(path, text)
+
+    def snapshot(self, path):
+        """Future с FileState файла на диске (после потоковой загрузки)"""
+        return self.executor.submit(lambda: read_file(path)[1])
+
+    def close(self):
+        """Дожидается незаконченных сохранений"""
+        self.executor.shutdown(wait=True)
@@ -2,6 +2,18 @@
 import re
 import tkinter as tk
 
+# Теги подсветки синтаксиса; остальные теги (выделение, отладчик,
+# покрытие) подсветка не трогает
+SYNTAX_TAGS = ("class", "decorator", "keyword", "comment", "string", "number", "operator")
+
+# Ключевые слова языка (подсветка и автодополнение)
+KEYWORDS = [
+    'if', 'then', 'elsif', 'else', 'while', 'for', 'each',
+    'break', 'continue', 'return', 'global', 'local', 'private',
+    'public', 'class', 'define', 'true', 'false', 'in',
+    'array', 'length', 'push', 'pop', 'shift'
+]
+
 class AMIGASyntaxHighlighter:
     """Подсветка синтаксиса для языка AMIGA"""
     
@@ -63,8 +75,8 @@ class AMIGASyntaxHighlighter:
         if end is None:
             end = self.text.index(tk.END)
             
-        # Снимаем все теги в диапазоне
-        for tag in self.text.tag_names():
+        # Снимаем теги подсветки в диапазоне
+        for tag in SYNTAX_TAGS:
             self.text.tag_remove(tag, start, end)
         
         # Получаем текст
@@ -137,16 +149,8 @@ class AMIGASyntaxHighlighter:
     
     def highlight_keywords(self, start, text):
         """Подсветка ключевых слов"""
-        keywords = [
-            'if', 'then', 'elsif', 'else', 'while', 'for', 'each',
-            'break', 'continue', 'return', 'global', 'local', 'private',
-            'public', 'class', 'define', 'true', 'false', 'in',
-            'array', 'length', 'push', 'pop', 'shift'  # <--- новые слова
-        ]
-        # ... остальной код
-        
         # Создаём паттерн для поиска целых слов
-        pattern = r'\b(' + '|'.join(keywords) + r')\b'
+        pattern = r'\b(' + '|'.join(KEYWORDS) + r')\b'
         start_line = start.split('.')[0]
         
         for match in re.finditer(pattern, text):
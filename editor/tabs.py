@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from .syntax import SYNTAX_TAGS
+
+# Теги, которые сохраняются в снимке выгруженной вкладки
+SNAPSHOT_TAGS = SYNTAX_TAGS + ("covered", "uncovered")
+
+# Сколько вкладок держать с живыми виджетами (включая текущую)
+MAX_LOADED_TABS = 4
+
+# Признак несохранённых изменений в заголовке вкладки
+DIRTY_MARK = "● "
+
+class TabSnapshot:
+    """Выгруженная вкладка: текст и диапазоны тегов вместо виджетов"""
+    __slots__ = ("text", "tags", "highlighted", "breakpoints", "undo")
+
+    def __init__(self, text, tags, highlighted, breakpoints, undo=None):
+        self.text = text
+        self.tags = tags                # тег -> кортеж индексов (начало, конец, ...)
+        self.highlighted = highlighted  # bytes: флаг подсветки строки
+        self.breakpoints = breakpoints
+        self.undo = undo                # editor.undo.UndoManager вкладки
+
+class TabState:
+    """Состояние вкладки, которое живёт дольше её виджетов"""
+
+    def __init__(self, frame, title):
+        self.frame = frame
+        self.title = title
+        self.editor = None
+        self.path = None
+        self.dirty = False
+        self.version = 0        # счётчик правок (сохранение сбрасывает dirty, только если правок не было)
+        self.cursor = "1.0"
+        self.yview = 0.0
+        self.file_state = None  # editor.storage.FileState
+        self.journal = None     # editor.journal.TabJournal
+        self.snapshot = None    # TabSnapshot, пока вкладка выгружена
+        self.pinned = False     # не выгружать (например, идёт выполнение)
+        self.read_only = False  # файл загружен не полностью: правка и сохранение запрещены
+        self.last_used = 0
+
+    @property
+    def is_loaded(self):
+        return self.editor is not None
+
+    def get_text(self):
+        """Текст вкладки для сохранения (из редактора или снимка)"""
+        if self.editor is not None:
+            return self.editor.get_file_text()
+        return self.snapshot.text
+
+class TabManager:
+    """Вкладки редактора с общим состоянием и выгрузкой скрытых вкладок.
+
+    Для каждой вкладки хранится TabState: путь, признак изменений,
+    курсор, прокрутка. Живые виджеты (Text, номера строк, подсветка,
+    проверка) есть только у max_loaded недавно открытых вкладок;
+    остальные выгружаются в TabSnapshot - текст и диапазоны тегов - и
+    восстанавливаются при переключении без повторной подсветки.
+    """
+
+    def __init__(self, notebook, create_editor, max_loaded=MAX_LOADED_TABS):
+        self.notebook = notebook
+        self.create_editor = create_editor  # create_editor(frame) -> AMIGAEditor
+        self.max_loaded = max_loaded
+        self.tabs = {}       # имя виджета фрейма -> TabState
+        self.active = None
+        self.clock = 0
+        self.listeners = []  # вызываются с TabState после смены вкладки
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed, add="+")
+
+    def new_tab(self, title, position=tk.END):
+        """Создаёт вкладку с редактором и делает её текущей"""
+        frame = ttk.Frame(self.notebook)
+        state = TabState(frame, title)
+        self.tabs[str(frame)] = state
+        self.attach_editor(state, self.create_editor(frame))
+        self.notebook.insert(position, frame, text=title)
+        self.notebook.select(frame)
+        self.activate(state)
+        return state
+
+    def attach_editor(self, state, editor):
+        """Связывает редактор с состоянием вкладки"""
+        editor.pack(fill=tk.BOTH, expand=True)
+        editor.filename = state.path
+        state.editor = editor
+        if state.read_only:
+            editor.text.config(state=tk.DISABLED)
+        editor.change_listeners.append(lambda first, last, new_last: self.on_edit(state))
+        if state.journal is not None:
+            state.journal.attach(editor)
+
+    def current(self):
+        """Текущая вкладка (вкладка "+" текущей не считается)"""
+        return self.active
+
+    def find(self, path):
+        """Вкладка с файлом path"""
+        for state in self.tabs.values():
+            if state.path and os.path.abspath(state.path) == path:
+                return state
+        return None
+
+    def select(self, state):
+        """Переключается на вкладку"""
+        self.notebook.select(state.frame)
+        self.activate(state)
+
+    def on_tab_changed(self, event=None):
+        state = self.tabs.get(self.notebook.select())
+        if state is not None and state is not self.active:
+            self.activate(state)
+
+    def activate(self, state):
+        """Делает вкладку текущей: загружает её и выгружает давно скрытые"""
+        self.load(state)
+        self.clock += 1
+        state.last_used = self.clock
+        self.active = state
+        self.unload_hidden()
+        for listener in self.listeners:
+            listener(state)
+
+    def set_path(self, state, path):
+        """Меняет файл вкладки"""
+        state.path = path
+        if state.editor is not None:
+            state.editor.filename = path
+
+    def set_read_only(self, state):
+        """Запрещает правку вкладки (текст не совпадает с файлом и не должен его заменить)"""
+        state.read_only = True
+        if state.editor is not None:
+            state.editor.text.config(state=tk.DISABLED)
+
+    def set_title(self, state, title):
+        state.title = title
+        self.update_title(state)
+
+    def on_edit(self, state):
+        """Правка текста вкладки"""
+        if state.editor is not None and state.editor.loading:
+            return
+        state.version += 1
+        self.set_dirty(state)
+
+    def set_dirty(self, state, dirty=True):
+        """Отмечает несохранённые изменения"""
+        if state.dirty != dirty:
+            state.dirty = dirty
+            self.update_title(state)
+
+    def update_title(self, state):
+        self.notebook.tab(state.frame, text=(DIRTY_MARK if state.dirty else "") + state.title)
+
+    def unload_hidden(self):
+        """Выгружает скрытые вкладки сверх max_loaded, начиная с давно открытых"""
+        loaded = [state for state in self.tabs.values()
+                  if state.is_loaded and state is not self.active and not state.pinned]
+        extra = sum(1 for state in self.tabs.values() if state.is_loaded) - self.max_loaded
+        for state in sorted(loaded, key=lambda state: state.last_used)[:max(extra, 0)]:
+            self.unload(state)
+
+    def unload(self, state):
+        """Заменяет виджеты вкладки снимком текста и тегов"""
+        editor = state.editor
+        if editor is None or editor.loading:
+            return False
+        if state.journal is not None:
+            try:
+                state.journal.flush()
+            except OSError:
+                return False  # правки ещё не на диске: оставляем редактор
+            state.journal.detach()
+
+        text = editor.text
+        state.cursor = text.index("insert")
+        state.yview = text.yview()[0]
+        tags = {}
+        for tag in SNAPSHOT_TAGS:
+            ranges = text.tag_ranges(tag)
+            if ranges:
+                tags[tag] = tuple(str(index) for index in ranges)
+        state.snapshot = TabSnapshot(text.get("1.0", "end-1c"), tags, bytes(bytearray(editor.highlighted)),
+                                     set(editor.line_numbers.breakpoints), editor.export_undo())
+        state.editor = None
+        editor.destroy()
+        return True
+
+    def load(self, state):
+        """Восстанавливает виджеты выгруженной вкладки"""
+        if state.editor is not None:
+            return
+        snapshot = state.snapshot
+        editor = self.create_editor(state.frame)
+        text = editor.text
+        editor.import_undo(snapshot.undo)
+        editor.undo_manager.pause()
+        try:
+            text.insert("1.0", snapshot.text)
+        finally:
+            editor.undo_manager.resume()
+        for tag, ranges in snapshot.tags.items():
+            text.tag_add(tag, *ranges)
+        if "covered" in snapshot.tags or "uncovered" in snapshot.tags:
+            editor.configure_coverage_tags()
+        editor.highlighted = list(snapshot.highlighted)
+        editor.line_numbers.breakpoints = set(snapshot.breakpoints)
+        text.mark_set("insert", state.cursor)
+        text.yview_moveto(state.yview)
+        state.snapshot = None
+        self.attach_editor(state, editor)
+
+    def loaded_editors(self):
+        """Редакторы загруженных вкладок"""
+        return [state.editor for state in self.tabs.values() if state.is_loaded]
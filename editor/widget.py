@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
+import codecs
+import os
 import tkinter as tk
 from tkinter import ttk
 from .syntax import AMIGASyntaxHighlighter
+from .diagnostics import DiagnosticsController
+from .completion import SymbolIndex, CompletionPopup
+from .search import SearchPanel
+from .undo import UndoManager, text_end
 from .themes import THEMES
 
+# Сколько строк выше и ниже видимой области подсвечивать заранее
+HIGHLIGHT_MARGIN = 50
+
+# Размер порции при открытии большого файла, байт
+LOAD_CHUNK_SIZE = 256 * 1024
+
 class LineNumbers(tk.Canvas):
     """Виджет для отображения номеров строк"""
     
@@ -12,6 +24,10 @@ class LineNumbers(tk.Canvas):
         self.text_widget = text_widget
         self.is_light_theme = is_light_theme
         
+        # Точки останова (номера строк) и строка, где стоит отладчик
+        self.breakpoints = set()
+        self.debug_line = None
+        
         # Цвета в зависимости от темы
         if is_light_theme:
             self.bg_color = "#f0f0f0"
@@ -28,12 +44,28 @@ class LineNumbers(tk.Canvas):
         self.text_widget.bind('<Button-1>', self.on_text_change)
         self.text_widget.bind('<Configure>', self.on_text_change)
         
+        # Щелчок по номеру строки ставит или снимает точку останова
+        self.bind('<Button-1>', self.toggle_breakpoint)
+        
         self.redraw()
     
     def on_text_change(self, event=None):
         """Обновление номеров строк при изменении текста"""
         self.redraw()
     
+    def toggle_breakpoint(self, event):
+        """Ставит или снимает точку останова на строке под курсором мыши"""
+        try:
+            line = int(self.text_widget.index("@0,{}".format(event.y)).split('.')[0])
+        except (tk.TclError, ValueError):
+            return
+        
+        if line in self.breakpoints:
+            self.breakpoints.remove(line)
+        else:
+            self.breakpoints.add(line)
+        self.redraw()
+    
     def update_theme(self, theme):
         """Обновляет цвета темы"""
         self.bg_color = theme["editor"]["bg"] if not self.is_light_theme else "#f0f0f0"
@@ -62,6 +94,14 @@ class LineNumbers(tk.Canvas):
                 if dline:
                     y = dline[1]
                 
+                # Точка останова и указатель отладчика
+                if line_num in self.breakpoints:
+                    center = y + line_height // 2
+                    self.create_oval(4, center - 4, 12, center + 4, fill="#e51400", outline="")
+                if line_num == self.debug_line:
+                    center = y + line_height // 2
+                    self.create_polygon(14, center - 4, 20, center, 14, center + 4, fill="#f0a30a", outline="")
+                
                 # Рисуем номер строки
                 self.create_text(
                     40, y + line_height//2,
@@ -81,6 +121,7 @@ class AMIGAEditor(ttk.Frame):
         
         self.is_light_theme = is_light_theme
         self.custom_font = custom_font
+        self.filename = None  # путь к файлу вкладки (для проверки @use)
         
         # Настройка цветов в зависимости от темы
         if is_light_theme:
@@ -102,12 +143,36 @@ class AMIGAEditor(ttk.Frame):
         # Подсветка синтаксиса
         self.highlighter = AMIGASyntaxHighlighter(self.text, is_light_theme)
         
+        # Фоновая проверка кода
+        self.diagnostics = DiagnosticsController(self.text, lambda: self.filename)
+        self.diagnostics.configure_tags(is_light_theme)
+        
+        # Индекс имён и автодополнение обновляются по изменённым строкам
+        self.symbols = SymbolIndex()
+        self.completion = CompletionPopup(self.text, self.symbols)
+        
+        # Подсветка только видимых строк: флаг "подсвечена" для каждой строки
+        self.highlighted = [False]
+        self.highlight_pending = None
+        self.loading = False  # идёт потоковая загрузка файла
+        
+        # Своя история отмены: правки записывает перехватчик команд Text
+        self.undo_manager = UndoManager()
+        self.undo_batch_pending = None
+        
+        self.change_listeners = [self.on_lines_changed, self.on_highlight_lines_changed]
+        self.install_change_proxy()
+        
+        # Панель поиска создаётся при первом открытии
+        self.search_panel = None
+        
     def setup_ui(self):
         """Создание интерфейса редактора"""
         # Создаем фрейм для редактора с рамкой
         editor_frame = tk.Frame(self, bg="#cccccc" if self.is_light_theme else "#333333", 
                                 bd=1, relief=tk.SUNKEN)
         editor_frame.pack(fill=tk.BOTH, expand=True)
+        self.editor_frame = editor_frame
         
         # Создаем текстовое поле с кастомным шрифтом
         self.text = tk.Text(
@@ -117,9 +182,7 @@ class AMIGAEditor(ttk.Frame):
             fg=self.fg_color,
             insertbackground=self.insert_bg,
             font=self.custom_font,  # Используем кастомный шрифт!
-            undo=True,
-            autoseparators=True,
-            maxundo=-1,
+            undo=False,
             selectbackground=self.select_bg,
             selectforeground=self.select_fg,
             padx=5,
@@ -133,7 +196,8 @@ class AMIGAEditor(ttk.Frame):
         
         # Скроллбар
         scrollbar = ttk.Scrollbar(editor_frame, orient=tk.VERTICAL, command=self.text.yview)
-        self.text.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = scrollbar
+        self.text.configure(yscrollcommand=self.on_yscroll)
         
         # Размещение элементов
         self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
@@ -145,10 +209,35 @@ class AMIGAEditor(ttk.Frame):
         # Подсветка в реальном времени
         self.text.bind('<KeyRelease>', self.on_text_changed)
         self.text.bind('<<Paste>>', self.on_text_changed)
-        self.text.bind('<Return>', self.on_text_changed)
+        self.text.bind('<Return>', self.handle_return)
         self.text.bind('<BackSpace>', self.on_text_changed)
+        self.text.bind('<BackSpace>', lambda e: self.completion.is_visible() and self.completion.schedule(),
+                       add="+")
         self.text.bind('<Delete>', self.on_text_changed)
         
+        # Любое изменение текста (ввод, вставка, отмена) запускает проверку
+        self.text.bind('<<Modified>>', self.on_modified)
+        self.text.bind('<Destroy>', self.on_destroy, add="+")
+        self.text.bind('<Configure>', self.schedule_highlight, add="+")
+        
+        # Автодополнение
+        self.text.bind('<Key>', self.on_key, add="+")
+        self.text.bind('<Control-space>', lambda e: self.completion.refresh(force=True) or "break")
+        self.text.bind('<Down>', lambda e: "break" if self.completion.move(1) else None)
+        self.text.bind('<Up>', lambda e: "break" if self.completion.move(-1) else None)
+        self.text.bind('<Escape>', self.completion.hide)
+        self.text.bind('<FocusOut>', self.completion.hide, add="+")
+        self.text.bind('<Button-1>', self.completion.hide, add="+")
+        
+        # Поиск и замена (привязка к виджету, чтобы перекрыть Ctrl+H/Ctrl+F класса Text)
+        self.text.bind('<Control-f>', lambda e: self.show_search() or "break")
+        self.text.bind('<Control-h>', lambda e: self.show_search(replace=True) or "break")
+        self.text.bind('<F3>', lambda e: self.find_next(1) or "break")
+        self.text.bind('<Shift-F3>', lambda e: self.find_next(-1) or "break")
+        
+        # Отмена и повтор (Ctrl+Z вызывает <<Undo>>, а edit undo перехватывается)
+        self.text.bind('<Control-y>', lambda e: self.redo() or "break")
+        
         # Табуляция
         self.text.bind('<Tab>', self.handle_tab)
         self.text.bind('<Shift-Tab>', self.handle_shift_tab)
@@ -166,10 +255,303 @@ class AMIGAEditor(ttk.Frame):
         self.line_numbers.redraw()
         return None
     
+    def install_change_proxy(self):
+        """Перехватывает команды виджета Text, чтобы знать, какие строки изменились.
+        
+        Команда Tcl виджета переименовывается, а на её место ставится
+        proxy_command, которая передаёт вызов дальше, после insert,
+        delete и replace сообщает подписчикам диапазон строк и записывает
+        правку в историю отмены. Команды edit undo/redo/separator/reset
+        выполняет UndoManager, поэтому стандартные привязки Text работают.
+        """
+        widget = str(self.text)
+        self.text_command = widget + "_orig"
+        self.tk.call("rename", widget, self.text_command)
+        self.tk.createcommand(widget, self.proxy_command)
+    
+    def proxy_command(self, *args):
+        """Выполняет команду виджета и уведомляет об изменённых строках"""
+        call = self.tk.call
+        command = args[0] if args else ""
+        if command in ("insert", "delete", "replace") and len(args) > 1:
+            lines_before = self.line_count()
+            first = min(int(str(call(self.text_command, "index", args[1])).split('.')[0]), lines_before)
+            last = first
+            if command != "insert":
+                # delete с одним индексом удаляет один символ (Backspace, Delete); если это
+                # перевод строки, затронута и следующая строка
+                end = args[2] if len(args) > 2 else args[1] + "+1c"
+                last = min(int(str(call(self.text_command, "index", end)).split('.')[0]), lines_before)
+            edit = None
+            if not self.loading and self.undo_manager.is_recording():
+                edit = self.describe_edit(command, args)
+            result = call((self.text_command,) + args)
+            if edit is not None:
+                self.undo_manager.record(*edit)
+                self.schedule_undo_batch_end()
+            self.notify_change(first, last, last + self.line_count() - lines_before)
+            return result
+        
+        if command == "edit" and len(args) > 1:
+            if args[1] == "undo":
+                return self.undo()
+            if args[1] == "redo":
+                return self.redo()
+            if args[1] == "separator":
+                return self.undo_manager.separator()
+            if args[1] == "reset":
+                return self.undo_manager.reset()
+            if args[1] == "canundo":
+                return self.undo_manager.can_undo()
+            if args[1] == "canredo":
+                return self.undo_manager.can_redo()
+        return call((self.text_command,) + args)
+    
+    def describe_edit(self, command, args):
+        """Правка, которую сделает команда: ((строка, столбец), удалённый текст, вставленный текст).
+        
+        Вызывается до выполнения команды; индексы приводятся так же, как
+        это делает Text (вставка в end - перед последним переводом строки,
+        удаление не затрагивает его). None - команда ничего не изменит.
+        """
+        call = self.tk.call
+        original = self.text_command
+        
+        def clamp(index):
+            index = str(call(original, "index", index))
+            if call(original, "compare", index, ">", "end-1c"):
+                return str(call(original, "index", "end-1c"))
+            return index
+        
+        start = clamp(args[1])
+        removed = ""
+        if command == "insert":
+            inserted = "".join(args[2::2])
+        else:
+            if command == "delete" and len(args) > 3:
+                # Удаление нескольких диапазонов сразу: историю не восстановить
+                self.undo_manager.reset()
+                return None
+            end = clamp(args[2] if len(args) > 2 else args[1] + "+1c")
+            if call(original, "compare", start, "<", end):
+                removed = str(call(original, "get", start, end))
+            inserted = "".join(args[3::2]) if command == "replace" else ""
+        if not (removed or inserted):
+            return None
+        line, column = start.split('.')
+        return (int(line), int(column)), removed, inserted
+    
+    def schedule_undo_batch_end(self):
+        """Правки до конца обработки события попадают в один шаг отмены"""
+        if self.undo_batch_pending is None:
+            self.undo_batch_pending = self.text.after_idle(self.end_undo_batch)
+    
+    def end_undo_batch(self):
+        self.undo_batch_pending = None
+        self.undo_manager.end_batch()
+    
+    def apply_undo_edit(self, index, old, new):
+        """Заменяет текст old в позиции index текстом new (шаг отмены или повтора)"""
+        start = "{}.{}".format(*index)
+        if old:
+            self.text.delete(start, "{}.{}".format(*text_end(index, old)))
+        if new:
+            self.text.insert(start, new)
+    
+    def undo(self):
+        """Отменяет последний шаг правок"""
+        return self.restore_cursor(self.undo_manager.undo(self.apply_undo_edit))
+    
+    def redo(self):
+        """Повторяет отменённый шаг правок"""
+        return self.restore_cursor(self.undo_manager.redo(self.apply_undo_edit))
+    
+    def restore_cursor(self, cursor):
+        """Ставит курсор после отменённой или повторённой правки"""
+        if cursor is None:
+            return None
+        self.text.tag_remove("sel", "1.0", tk.END)
+        self.text.mark_set("insert", "{}.{}".format(*cursor))
+        self.text.see("insert")
+        self.on_text_changed()
+        return None
+    
+    def line_count(self):
+        """Число строк текста"""
+        return int(str(self.tk.call(self.text_command, "index", "end-1c")).split('.')[0])
+    
+    def notify_change(self, first, last, new_last):
+        """Сообщает подписчикам, что строки first..last стали строками first..new_last.
+        
+        Номера строк с 1; None означает, что изменился весь текст.
+        """
+        for listener in self.change_listeners:
+            listener(first, last, new_last)
+    
+    def on_lines_changed(self, first, last, new_last):
+        """Обновляет индекс имён по изменённым строкам"""
+        if first is None:
+            self.symbols.rebuild(self.text.get("1.0", "end-1c"))
+            return
+        lines = self.text.get("{}.0".format(first), "{}.end".format(new_last)).split('\n')
+        self.symbols.update(first - 1, last, lines)
+    
+    def show_search(self, replace=False):
+        """Открывает панель поиска (replace - с переходом в поле замены)"""
+        if self.search_panel is None:
+            self.search_panel = SearchPanel(self, self.text, on_replace=self.on_text_changed)
+            self.change_listeners.append(self.on_search_text_changed)
+        if not self.search_panel.winfo_ismapped():
+            self.search_panel.pack(side=tk.TOP, fill=tk.X, before=self.editor_frame)
+        self.search_panel.focus_query()
+        if replace:
+            self.search_panel.replace_entry.focus_set()
+        self.search_panel.schedule_search(0)
+    
+    def find_next(self, delta=1):
+        """Переход к следующему (delta=-1 - предыдущему) совпадению"""
+        if self.search_panel is None:
+            self.show_search()
+        else:
+            self.search_panel.step(delta)
+    
+    def on_search_text_changed(self, first, last, new_last):
+        """После правки текста совпадения ищутся заново, если панель открыта"""
+        if self.search_panel.winfo_ismapped() and self.search_panel.query_var.get():
+            self.search_panel.schedule_search(400)
+    
+    def on_highlight_lines_changed(self, first, last, new_last):
+        """Помечает изменённые строки как неподсвеченные"""
+        if first is None:
+            self.highlighted = [False] * self.line_count()
+        else:
+            self.highlighted[first - 1:last] = [False] * (new_last - first + 1)
+    
+    def on_yscroll(self, first, last):
+        """Прокрутка: обновляет скроллбар и подсвечивает открывшиеся строки"""
+        self.scrollbar.set(first, last)
+        self.schedule_highlight()
+    
+    def schedule_highlight(self, event=None):
+        """Подсвечивает видимую область, когда Tk освободится"""
+        if self.highlight_pending is None:
+            self.highlight_pending = self.text.after_idle(self.run_scheduled_highlight)
+    
+    def run_scheduled_highlight(self):
+        self.highlight_pending = None
+        self.highlight_syntax()
+        self.line_numbers.redraw()
+    
+    def visible_lines(self):
+        """Номера первой и последней видимых строк"""
+        first = int(self.text.index("@0,0").split('.')[0])
+        last = int(self.text.index("@0,{}".format(self.text.winfo_height())).split('.')[0])
+        return first, last
+    
+    def load_file(self, file, on_progress=None, on_done=None, encoding='utf-8'):
+        """Загружает файл порциями в after(), не останавливая интерфейс.
+        
+        file - файл, открытый в двоичном режиме (открывает вызывающий, чтобы
+        ошибка открытия случилась до создания вкладки); закрывается в конце.
+        Пока файл читается, текст только для чтения и не попадает в
+        историю отмены; подсвечиваются только видимые строки.
+        on_progress(доля) вызывается после каждой порции, on_done(ошибка
+        или None) - в конце.
+        """
+        size = max(os.fstat(file.fileno()).st_size, 1)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        
+        self.loading = True
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+        
+        def finish(error=None):
+            file.close()
+            self.loading = False
+            if not self.text.winfo_exists():
+                return
+            self.text.config(state=tk.NORMAL)
+            self.undo_manager.reset()
+            self.text.mark_set("insert", "1.0")
+            self.on_text_changed()
+            if on_done:
+                on_done(error)
+        
+        def read_chunk():
+            if not self.text.winfo_exists():
+                finish()
+                return
+            try:
+                data = file.read(LOAD_CHUNK_SIZE)
+                chunk = decoder.decode(data, final=not data)
+            except (OSError, UnicodeDecodeError) as e:
+                finish(e)
+                return
+            if chunk:
+                self.text.config(state=tk.NORMAL)
+                self.text.insert("end-1c", chunk)
+                self.text.config(state=tk.DISABLED)
+            if not data:
+                finish()
+                return
+            if on_progress:
+                on_progress(file.tell() / size)
+            self.text.after(1, read_chunk)
+        
+        read_chunk()
+    
+    def on_destroy(self, event=None):
+        """Останавливает фоновую проверку и убирает перехват команд"""
+        if event is not None and event.widget is not self.text:
+            return
+        self.diagnostics.close()
+        if self.search_panel is not None:
+            self.search_panel.cancel()
+        self.completion.hide()
+        try:
+            self.tk.deletecommand(str(self.text))
+        except tk.TclError:
+            pass
+    
+    def on_key(self, event):
+        """Показывает или обновляет автодополнение после ввода символа"""
+        if (event.char and (event.char.isalnum() or event.char in '_.')) or self.completion.is_visible():
+            self.completion.schedule()
+    
+    def handle_return(self, event):
+        """Enter выбирает вариант автодополнения, если список открыт"""
+        if self.completion.accept():
+            return "break"
+        return self.on_text_changed(event)
+    
+    def on_modified(self, event=None):
+        """Откладывает фоновую проверку после изменения текста"""
+        if self.text.edit_modified():
+            self.text.edit_modified(False)
+            self.diagnostics.schedule()
+    
     def highlight_syntax(self):
-        """Подсветка синтаксиса всего текста"""
-        if self.highlighter:
-            self.highlighter.highlight()
+        """Подсветка синтаксиса видимой части текста.
+        
+        Подсвечиваются только строки около видимой области, которые
+        изменились или ещё не подсвечивались, поэтому стоимость не зависит
+        от длины файла.
+        """
+        if not self.highlighter:
+            return
+        first, last = self.visible_lines()
+        first = max(1, first - HIGHLIGHT_MARGIN)
+        last = min(len(self.highlighted), last + HIGHLIGHT_MARGIN)
+        line = first
+        while line <= last:
+            if self.highlighted[line - 1]:
+                line += 1
+                continue
+            run_start = line
+            while line <= last and not self.highlighted[line - 1]:
+                self.highlighted[line - 1] = True
+                line += 1
+            self.highlighter.highlight("{}.0".format(run_start), "{}.end".format(line - 1))
     
     def apply_theme(self, theme_name):
         """Применить тему"""
@@ -202,6 +584,7 @@ class AMIGAEditor(ttk.Frame):
         
         # Обновляем подсветку синтаксиса
         self.highlighter.update_theme(theme_name)
+        self.diagnostics.configure_tags(self.is_light_theme)
         
         # Обновляем номера строк
         self.line_numbers.update_theme(theme)
@@ -211,6 +594,8 @@ class AMIGAEditor(ttk.Frame):
     
     def handle_tab(self, event):
         """Обработка табуляции"""
+        if self.completion.accept():
+            return "break"
         self.text.insert(tk.INSERT, "    ")
         self.on_text_changed()
         return "break"
@@ -274,14 +659,72 @@ class AMIGAEditor(ttk.Frame):
         self.on_text_changed()
         return "break"
     
+    def export_undo(self):
+        """История отмены для снимка выгружаемой вкладки"""
+        self.undo_manager.end_batch()
+        return self.undo_manager
+    
+    def import_undo(self, history):
+        """Восстанавливает историю отмены из снимка вкладки"""
+        self.undo_manager = history if history is not None else UndoManager()
+        self.undo_manager.separator()
+    
+    def get_breakpoints(self):
+        """Номера строк с точками останова"""
+        return set(self.line_numbers.breakpoints)
+    
+    def set_debug_line(self, line):
+        """Подсвечивает строку, на которой остановлен отладчик (None - снять)"""
+        self.text.tag_remove("debug_line", "1.0", tk.END)
+        self.line_numbers.debug_line = line
+        if line is not None:
+            self.text.tag_configure("debug_line", background="#fff3b0" if self.is_light_theme else "#4b4b18")
+            self.text.tag_add("debug_line", "{}.0".format(line), "{}.0 + 1 lines".format(line))
+            self.text.see("{}.0".format(line))
+        self.line_numbers.redraw()
+    
+    def show_coverage(self, covered, uncovered):
+        """Подсвечивает выполненные и невыполненные строки"""
+        self.clear_coverage()
+        for tag, lines in (("covered", covered), ("uncovered", uncovered)):
+            for line in lines:
+                self.text.tag_add(tag, "{}.0".format(line), "{}.0 + 1 lines".format(line))
+        self.configure_coverage_tags()
+    
+    def configure_coverage_tags(self):
+        """Цвета подсветки покрытия (под остальными тегами)"""
+        if self.is_light_theme:
+            self.text.tag_configure("covered", background="#e3f6e3")
+            self.text.tag_configure("uncovered", background="#fbe3e3")
+        else:
+            self.text.tag_configure("covered", background="#1e3a1e")
+            self.text.tag_configure("uncovered", background="#4a1f1f")
+        self.text.tag_lower("covered")
+        self.text.tag_lower("uncovered")
+    
+    def clear_coverage(self):
+        """Снимает подсветку покрытия"""
+        self.text.tag_remove("covered", "1.0", tk.END)
+        self.text.tag_remove("uncovered", "1.0", tk.END)
+    
     def get_all_text(self):
         """Получить весь текст из редактора"""
         return self.text.get(1.0, tk.END).rstrip()
     
+    def get_file_text(self):
+        """Текст для сохранения в файл: точно как в редакторе, без служебного
+        перевода строки Tk в конце (хэш совпадает с хэшем при чтении файла)"""
+        return self.text.get("1.0", "end-1c")
+    
     def set_text(self, text):
-        """Установить текст в редактор"""
-        self.text.delete(1.0, tk.END)
-        self.text.insert(1.0, text)
+        """Установить текст в редактор (новый текст начинает историю отмены заново)"""
+        self.undo_manager.pause()
+        try:
+            self.text.delete(1.0, tk.END)
+            self.text.insert(1.0, text)
+        finally:
+            self.undo_manager.resume()
+        self.undo_manager.reset()
         self.highlight_syntax()
         self.line_numbers.redraw()
     
@@ -3,22 +3,40 @@
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import tkinter.simpledialog as simpledialog
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import tkinter.font as tkfont
 import os
 import sys
+import re
+import queue
+import threading
 
 # Добавляем пути для импортов
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from editor.widget import AMIGAEditor
+from editor.completion import public_members
+from editor.filetree import ProjectTree
+from editor.storage import FileSaver, read_file, SAVE_CONFLICT, SAVE_SAVED
+from editor.journal import Journal
+from editor.tabs import TabManager
 from core.interpreter import AMIGAInterpreter
+from core.inputs import FileInputProvider
+from core.cache import ProgramCache
+from core.debugger import Debugger, DEBUG_STEP, DEBUG_CONTINUE, DEBUG_STOP
+from core.coverage import CoverageCollector, CoverageData, UNNAMED_FILE
+from core.finder import ProjectSearch, compile_query
 from windows.about_window import AboutWindow
 from core.languages import lang_manager
 from editor.themes import THEMES
 
+# Файлы больше этого размера (байт) открываются порциями
+STREAM_OPEN_SIZE = 512 * 1024
+
+# Период записи журнала автосохранения, мс
+AUTOSAVE_INTERVAL = 5000
+
 class AMIGAIDE:
     def __init__(self, root):
         self.root = root
@@ -31,14 +49,35 @@ class AMIGAIDE:
         # Устанавливаем иконку
         self.set_program_icon()
         
-        # Текущий файл
+        # Текущий файл и редактор (следуют за выбранной вкладкой)
         self.current_file = None
+        self.editor = None
+        self.run_editor = None  # редактор запущенной программы (для строки отладчика)
         self.current_theme = "light"
         
         # Интерпретатор
         self.interpreter = AMIGAInterpreter()
         self.interpreter.output_callback = self.append_output
         self.interpreter.input_callback = self.get_input
+        self.interpreter.program_cache = ProgramCache()
+        self.interpreter.time_limit = 30  # бесконечный цикл не должен вешать IDE
+        self.input_provider = None  # заранее заданный ввод для текущего запуска
+        self.running = False
+        self.debug_paused = False
+        
+        # Сохранение файлов в фоновом потоке
+        self.saver = FileSaver()
+        
+        # Журнал автосохранения вкладок (восстановление после сбоя)
+        self.journal = Journal()
+        
+        # Папка проекта и поиск по её файлам
+        self.project_root = None
+        self.project_search = ProjectSearch()
+        self.search_stop = None
+        self.search_generation = 0
+        self.search_matches = {}  # элемент дерева результатов -> SearchMatch
+        self.search_found = [0, 0]  # совпадений, файлов
         
         # Настройка стиля
         self.style = tb.Style(theme="cosmo")
@@ -51,6 +90,11 @@ class AMIGAIDE:
         # Привязка горячих клавиш
         self.setup_shortcuts()
         
+        # Автосохранение и восстановление после сбоя
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+        self.root.after(AUTOSAVE_INTERVAL, self.autosave)
+        self.root.after(200, self.offer_recovery)
+        
     def set_program_icon(self):
         """Устанавливает иконку программы"""
         try:
@@ -69,42 +113,93 @@ class AMIGAIDE:
         
         # Файл
         file_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Файл", menu=file_menu)
-        file_menu.add_command(label="Новый (Ctrl+N)", command=self.new_file, accelerator="Ctrl+N")
-        file_menu.add_command(label="Открыть (Ctrl+O)", command=self.open_file, accelerator="Ctrl+O")
-        file_menu.add_command(label="Сохранить (Ctrl+S)", command=self.save_file, accelerator="Ctrl+S")
-        file_menu.add_command(label="Сохранить как...", command=self.save_as_file)
+        menubar.add_cascade(menu=file_menu)
+        self.localize_menu(menubar, "menu.file")
+        file_menu.add_command(command=self.new_file, accelerator="Ctrl+N")
+        self.localize_menu(file_menu, "menu.new", "{} (Ctrl+N)")
+        file_menu.add_command(command=self.open_file, accelerator="Ctrl+O")
+        self.localize_menu(file_menu, "menu.open", "{} (Ctrl+O)")
+        file_menu.add_command(command=self.open_folder)
+        self.localize_menu(file_menu, "menu.open_folder")
+        file_menu.add_command(command=self.save_file, accelerator="Ctrl+S")
+        self.localize_menu(file_menu, "menu.save", "{} (Ctrl+S)")
+        file_menu.add_command(command=self.save_as_file)
+        self.localize_menu(file_menu, "menu.save_as", "{}...")
         file_menu.add_separator()
-        file_menu.add_command(label="Выход", command=self.root.quit)
+        file_menu.add_command(command=self.quit_app)
+        self.localize_menu(file_menu, "menu.exit")
         
         # Правка
         edit_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Правка", menu=edit_menu)
-        edit_menu.add_command(label="Отменить (Ctrl+Z)", command=lambda: self.editor.text.edit_undo())
-        edit_menu.add_command(label="Повторить (Ctrl+Y)", command=lambda: self.editor.text.edit_redo())
+        menubar.add_cascade(menu=edit_menu)
+        self.localize_menu(menubar, "menu.edit")
+        edit_menu.add_command(command=lambda: self.editor.undo())
+        self.localize_menu(edit_menu, "menu.undo", "{} (Ctrl+Z)")
+        edit_menu.add_command(command=lambda: self.editor.redo())
+        self.localize_menu(edit_menu, "menu.redo", "{} (Ctrl+Y)")
+        edit_menu.add_separator()
+        edit_menu.add_command(command=lambda: self.root.focus_get().event_generate("<<Cut>>"))
+        self.localize_menu(edit_menu, "menu.cut", "{} (Ctrl+X)")
+        edit_menu.add_command(command=lambda: self.root.focus_get().event_generate("<<Copy>>"))
+        self.localize_menu(edit_menu, "menu.copy", "{} (Ctrl+C)")
+        edit_menu.add_command(command=lambda: self.root.focus_get().event_generate("<<Paste>>"))
+        self.localize_menu(edit_menu, "menu.paste", "{} (Ctrl+V)")
         edit_menu.add_separator()
-        edit_menu.add_command(label="Вырезать (Ctrl+X)", command=lambda: self.root.focus_get().event_generate("<<Cut>>"))
-        edit_menu.add_command(label="Копировать (Ctrl+C)", command=lambda: self.root.focus_get().event_generate("<<Copy>>"))
-        edit_menu.add_command(label="Вставить (Ctrl+V)", command=lambda: self.root.focus_get().event_generate("<<Paste>>"))
+        edit_menu.add_command(command=lambda: self.editor.show_search(), accelerator="Ctrl+F")
+        self.localize_menu(edit_menu, "menu.find", "{} (Ctrl+F)")
+        edit_menu.add_command(command=lambda: self.editor.show_search(replace=True), accelerator="Ctrl+H")
+        self.localize_menu(edit_menu, "menu.replace", "{} (Ctrl+H)")
+        edit_menu.add_command(command=lambda: self.editor.find_next(1), accelerator="F3")
+        self.localize_menu(edit_menu, "menu.find_next", "{} (F3)")
+        
+        # Запуск
+        run_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(menu=run_menu)
+        self.localize_menu(menubar, "menu.run")
+        run_menu.add_command(command=self.run_code, accelerator="F5")
+        self.localize_menu(run_menu, "menu.run_code", "{} (F5)")
+        run_menu.add_command(command=self.run_with_input_file)
+        self.localize_menu(run_menu, "menu.run_with_input")
+        run_menu.add_command(command=lambda: self.run_code(coverage=True))
+        self.localize_menu(run_menu, "menu.run_coverage")
+        run_menu.add_command(command=self.load_coverage)
+        self.localize_menu(run_menu, "menu.load_coverage")
+        run_menu.add_command(command=lambda: self.editor.clear_coverage())
+        self.localize_menu(run_menu, "menu.hide_coverage")
+        run_menu.add_separator()
+        run_menu.add_command(command=self.debug_code, accelerator="F6")
+        self.localize_menu(run_menu, "menu.debug", "{} (F6)")
+        run_menu.add_command(command=lambda: self.debug_command(DEBUG_STEP), accelerator="F10")
+        self.localize_menu(run_menu, "menu.step", "{} (F10)")
+        run_menu.add_command(command=lambda: self.debug_command(DEBUG_CONTINUE), accelerator="F8")
+        self.localize_menu(run_menu, "menu.continue", "{} (F8)")
+        run_menu.add_command(command=lambda: self.debug_command(DEBUG_STOP), accelerator="Shift+F5")
+        self.localize_menu(run_menu, "menu.stop", "{} (Shift+F5)")
         
         # Вид
         view_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Вид", menu=view_menu)
+        menubar.add_cascade(menu=view_menu)
+        self.localize_menu(menubar, "menu.view")
         
         self.theme_var = tk.StringVar(value="Светлая")
-        view_menu.add_radiobutton(label="Светлая тема", variable=self.theme_var, value="Светлая", command=lambda: self.toggle_theme("light"))
-        view_menu.add_radiobutton(label="Тёмная тема", variable=self.theme_var, value="Тёмная", command=lambda: self.toggle_theme("dark"))
+        view_menu.add_radiobutton(variable=self.theme_var, value="Светлая", command=lambda: self.toggle_theme("light"))
+        self.localize_menu(view_menu, "menu.light_theme")
+        view_menu.add_radiobutton(variable=self.theme_var, value="Тёмная", command=lambda: self.toggle_theme("dark"))
+        self.localize_menu(view_menu, "menu.dark_theme")
         view_menu.add_separator()
         
         self.sidebar_var = tk.BooleanVar(value=True)
-        view_menu.add_checkbutton(label="Боковая панель", variable=self.sidebar_var, command=self.toggle_sidebar)
+        view_menu.add_checkbutton(variable=self.sidebar_var, command=self.toggle_sidebar)
+        self.localize_menu(view_menu, "menu.sidebar")
         
         self.output_var = tk.BooleanVar(value=True)
-        view_menu.add_checkbutton(label="Панель вывода", variable=self.output_var, command=self.toggle_output)
+        view_menu.add_checkbutton(variable=self.output_var, command=self.toggle_output)
+        self.localize_menu(view_menu, "menu.output_panel")
         
-        # Язык
+        # Язык (названия языков не переводятся)
         lang_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Язык", menu=lang_menu)
+        menubar.add_cascade(menu=lang_menu)
+        self.localize_menu(menubar, "menu.language")
         lang_menu.add_command(label="🇷🇺 Русский", command=lambda: self.switch_language("ru"))
         lang_menu.add_command(label="🇬🇧 English", command=lambda: self.switch_language("en"))
         lang_menu.add_command(label="🇩🇪 Deutsch", command=lambda: self.switch_language("de"))
@@ -112,9 +207,12 @@ class AMIGAIDE:
         
         # Помощь
         help_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Помощь", menu=help_menu)
-        help_menu.add_command(label="Примеры кода", command=self.show_examples)
-        help_menu.add_command(label="О программе", command=self.show_about)
+        menubar.add_cascade(menu=help_menu)
+        self.localize_menu(menubar, "menu.help")
+        help_menu.add_command(command=self.show_examples)
+        self.localize_menu(help_menu, "menu.examples")
+        help_menu.add_command(command=self.show_about)
+        self.localize_menu(help_menu, "menu.about")
         
         # === ПАНЕЛЬ ИНСТРУМЕНТОВ (С КНОПКАМИ) ===
         toolbar = tb.Frame(self.root, bootstyle="secondary")
@@ -123,47 +221,86 @@ class AMIGAIDE:
         # Кнопка запуска (ЗЕЛЁНАЯ!)
         self.run_button = tb.Button(
             toolbar,
-            text="▶ ЗАПУСК (F5)",
             command=self.run_code,
             bootstyle="success",
             width=15
         )
+        self.localize(self.run_button, "toolbar.run", "▶ {} (F5)")
         self.run_button.pack(side=LEFT, padx=2, pady=2)
         
+        # Кнопки отладчика
+        self.debug_button = tb.Button(
+            toolbar,
+            command=self.debug_code,
+            bootstyle="success-outline",
+            width=14
+        )
+        self.localize(self.debug_button, "toolbar.debug", "🐞 {} (F6)")
+        self.debug_button.pack(side=LEFT, padx=2, pady=2)
+        
+        self.step_button = tb.Button(
+            toolbar,
+            command=lambda: self.debug_command(DEBUG_STEP),
+            bootstyle="info-outline",
+            width=6,
+            state=DISABLED
+        )
+        self.localize(self.step_button, "toolbar.step")
+        self.step_button.pack(side=LEFT, padx=2, pady=2)
+        
+        self.continue_button = tb.Button(
+            toolbar,
+            command=lambda: self.debug_command(DEBUG_CONTINUE),
+            bootstyle="info-outline",
+            width=11,
+            state=DISABLED
+        )
+        self.localize(self.continue_button, "toolbar.continue")
+        self.continue_button.pack(side=LEFT, padx=2, pady=2)
+        
+        self.stop_button = tb.Button(
+            toolbar,
+            command=lambda: self.debug_command(DEBUG_STOP),
+            bootstyle="danger-outline",
+            width=6,
+            state=DISABLED
+        )
+        self.localize(self.stop_button, "toolbar.stop")
+        self.stop_button.pack(side=LEFT, padx=2, pady=2)
+        
         # Кнопка очистки
         self.clear_button = tb.Button(
             toolbar,
-            text="Очистить вывод",
             command=self.clear_output,
             bootstyle="secondary",
             width=12
         )
+        self.localize(self.clear_button, "menu.clear_output")
         self.clear_button.pack(side=LEFT, padx=2, pady=2)
         
         # Кнопка новой вкладки
         self.new_tab_button = tb.Button(
             toolbar,
-            text="+ Новая вкладка",
             command=self.new_file,
             bootstyle="info",
             width=12
         )
+        self.localize(self.new_tab_button, "toolbar.new_tab", "+ {}")
         self.new_tab_button.pack(side=LEFT, padx=2, pady=2)
         
         # Кнопка сохранения
         self.save_button = tb.Button(
             toolbar,
-            text="💾 Сохранить",
             command=self.save_file,
             bootstyle="warning",
             width=10
         )
+        self.localize(self.save_button, "menu.save", "💾 {}")
         self.save_button.pack(side=LEFT, padx=2, pady=2)
         
         # Кнопка темы
         self.theme_button = tb.Button(
             toolbar,
-            text="🌓 Тема",
             command=lambda: self.toggle_theme("dark" if self.current_theme == "light" else "light"),
             bootstyle="primary",
             width=8
@@ -183,7 +320,9 @@ class AMIGAIDE:
         sidebar_header = tb.Frame(self.sidebar, bootstyle="secondary")
         sidebar_header.pack(fill=X, pady=(0, 1))
         
-        tb.Label(sidebar_header, text="ПРОВОДНИК", font=("Segoe UI", 9, "bold")).pack(side=LEFT, padx=5, pady=5)
+        explorer_label = tb.Label(sidebar_header, font=("Segoe UI", 9, "bold"))
+        explorer_label.pack(side=LEFT, padx=5, pady=5)
+        self.localize(explorer_label, "sidebar.explorer")
         
         # Ноутбук для вкладок в боковой панели
         self.sidebar_notebook = tb.Notebook(self.sidebar, bootstyle="secondary")
@@ -191,7 +330,8 @@ class AMIGAIDE:
         
         # Вкладка "Файлы"
         files_frame = tb.Frame(self.sidebar_notebook)
-        self.sidebar_notebook.add(files_frame, text="📁 Файлы")
+        self.sidebar_notebook.add(files_frame)
+        self.localize_tab(self.sidebar_notebook, files_frame, "sidebar.files", "📁 {}")
         
         # Дерево файлов
         self.file_tree = ttk.Treeview(files_frame, selectmode="browse", show="tree")
@@ -200,10 +340,13 @@ class AMIGAIDE:
         file_scroll = tb.Scrollbar(files_frame, orient=VERTICAL, command=self.file_tree.yview)
         file_scroll.pack(side=RIGHT, fill=Y)
         self.file_tree.config(yscrollcommand=file_scroll.set)
+        self.file_tree.bind('<Double-Button-1>', self.on_file_tree_open)
+        self.project_tree = ProjectTree(self.file_tree)
         
         # Вкладка "Примеры"
         examples_frame = tb.Frame(self.sidebar_notebook)
-        self.sidebar_notebook.add(examples_frame, text="📚 Примеры")
+        self.sidebar_notebook.add(examples_frame)
+        self.localize_tab(self.sidebar_notebook, examples_frame, "sidebar.examples", "📚 {}")
         
         # Список примеров
         self.examples_listbox = tk.Listbox(examples_frame, bg="#f8f9fa", fg="#212529", font=("Consolas", 10))
@@ -217,6 +360,61 @@ class AMIGAIDE:
         # Загружаем примеры
         self.load_examples_list()
         
+        # Вкладка "Переменные" (заполняется при остановке отладчика)
+        variables_frame = tb.Frame(self.sidebar_notebook)
+        self.sidebar_notebook.add(variables_frame)
+        self.localize_tab(self.sidebar_notebook, variables_frame, "sidebar.variables", "🔍 {}")
+        
+        self.variables_tree = ttk.Treeview(variables_frame, columns=("value", "scope"), show="tree headings")
+        for column, key in (("#0", "sidebar.name"), ("value", "sidebar.value"), ("scope", "sidebar.scope")):
+            lang_manager.register(self.variables_tree, key,
+                                  lambda text, column=column: self.variables_tree.heading(column, text=text))
+        self.variables_tree.column("#0", width=70)
+        self.variables_tree.column("value", width=110)
+        self.variables_tree.column("scope", width=50)
+        self.variables_tree.pack(side=LEFT, fill=BOTH, expand=True)
+        
+        variables_scroll = tb.Scrollbar(variables_frame, orient=VERTICAL, command=self.variables_tree.yview)
+        variables_scroll.pack(side=RIGHT, fill=Y)
+        self.variables_tree.config(yscrollcommand=variables_scroll.set)
+        
+        # Вкладка "Поиск" по файлам проекта
+        search_frame = tb.Frame(self.sidebar_notebook)
+        self.sidebar_notebook.add(search_frame)
+        self.localize_tab(self.sidebar_notebook, search_frame, "sidebar.search", "🔎 {}")
+        
+        search_bar = tb.Frame(search_frame)
+        search_bar.pack(fill=X, padx=2, pady=2)
+        self.project_query_var = tk.StringVar()
+        project_query_entry = tb.Entry(search_bar, textvariable=self.project_query_var)
+        project_query_entry.pack(side=LEFT, fill=X, expand=True)
+        project_query_entry.bind('<Return>', lambda e: self.start_project_search())
+        project_search_button = tb.Button(search_bar, command=self.start_project_search, bootstyle="secondary")
+        project_search_button.pack(side=RIGHT, padx=(2, 0))
+        self.localize(project_search_button, "sidebar.find")
+        
+        search_options = tb.Frame(search_frame)
+        search_options.pack(fill=X, padx=2)
+        self.project_regex_var = tk.BooleanVar(value=False)
+        self.project_case_var = tk.BooleanVar(value=False)
+        tb.Checkbutton(search_options, text="Regex", variable=self.project_regex_var).pack(side=LEFT)
+        tb.Checkbutton(search_options, text="Aa", variable=self.project_case_var).pack(side=LEFT, padx=5)
+        
+        self.project_search_status = tb.Label(search_frame, text="", font=("Segoe UI", 8))
+        self.project_search_status.pack(fill=X, padx=2)
+        
+        results_frame = tb.Frame(search_frame)
+        results_frame.pack(fill=BOTH, expand=True)
+        self.search_tree = ttk.Treeview(results_frame, selectmode="browse", show="tree")
+        self.search_tree.pack(side=LEFT, fill=BOTH, expand=True)
+        self.search_tree.bind('<Double-Button-1>', self.open_search_result)
+        
+        search_scroll = tb.Scrollbar(results_frame, orient=VERTICAL, command=self.search_tree.yview)
+        search_scroll.pack(side=RIGHT, fill=Y)
+        self.search_tree.config(yscrollcommand=search_scroll.set)
+        
+        self.debug_action = tk.StringVar()
+        
         # === ЦЕНТРАЛЬНАЯ ПАНЕЛЬ (РЕДАКТОР) ===
         center_frame = tb.Frame(self.root)
         center_frame.grid(row=1, column=1, sticky="nsew")
@@ -226,6 +424,8 @@ class AMIGAIDE:
         # Вкладки редактора
         self.tabs = tb.Notebook(center_frame, bootstyle="primary")
         self.tabs.grid(row=0, column=0, sticky="ew", padx=2, pady=(2, 0))
+        self.tab_manager = TabManager(self.tabs, self.create_editor)
+        self.tab_manager.listeners.append(self.on_tab_activated)
         
         # Кнопка "Новый файл" на вкладках
         tab_controls = tb.Frame(self.tabs)
@@ -244,9 +444,32 @@ class AMIGAIDE:
         output_header = tb.Frame(self.output_frame)
         output_header.pack(fill=X)
         
-        tb.Label(output_header, text="ВЫВОД", font=("Segoe UI", 9, "bold")).pack(side=LEFT, padx=5)
+        output_label = tb.Label(output_header, font=("Segoe UI", 9, "bold"))
+        output_label.pack(side=LEFT, padx=5)
+        self.localize(output_label, "output.title")
+        
+        output_clear_button = tb.Button(output_header, command=self.clear_output, bootstyle="secondary", width=10)
+        output_clear_button.pack(side=RIGHT, padx=5)
+        self.localize(output_clear_button, "output.clear")
+        
+        # Строка ввода для Console.Input (вместо модального диалога)
+        input_bar = tb.Frame(self.output_frame)
+        input_bar.pack(side=BOTTOM, fill=X, padx=5, pady=(0, 5))
         
-        tb.Button(output_header, text="Очистить", command=self.clear_output, bootstyle="secondary", width=10).pack(side=RIGHT, padx=5)
+        input_label = tb.Label(input_bar, font=("Segoe UI", 9))
+        input_label.pack(side=LEFT, padx=(0, 5))
+        self.localize(input_label, "output.input")
+        
+        self.input_var = tk.StringVar()
+        self.input_done = tk.BooleanVar(value=False)
+        self.input_entry = tb.Entry(input_bar, textvariable=self.input_var, font=("Consolas", 10), state=DISABLED)
+        self.input_entry.pack(side=LEFT, fill=X, expand=True)
+        self.input_entry.bind('<Return>', self.submit_input)
+        
+        self.input_button = tb.Button(input_bar, command=self.submit_input,
+                                      bootstyle="secondary", width=10, state=DISABLED)
+        self.input_button.pack(side=RIGHT, padx=(5, 0))
+        self.localize(self.input_button, "output.send")
         
         # Текст вывода
         self.output_text = tk.Text(self.output_frame, wrap=WORD, bg="#f8f9fa", fg="#212529",
@@ -257,41 +480,142 @@ class AMIGAIDE:
         status_bar = tb.Frame(self.root, bootstyle="secondary")
         status_bar.grid(row=3, column=0, columnspan=2, sticky="ew")
         
-        self.status_label = tb.Label(status_bar, text="Готов к работе", font=("Segoe UI", 9))
+        self.status_label = tb.Label(status_bar, text=lang_manager.get_text("status.ready"), font=("Segoe UI", 9))
         self.status_label.pack(side=LEFT, padx=5)
         
-        self.lang_status = tb.Label(status_bar, text="Русский", font=("Segoe UI", 9))
+        self.lang_status = tb.Label(status_bar, font=("Segoe UI", 9))
         self.lang_status.pack(side=LEFT, padx=15)
+        self.localize(self.lang_status, "language")
         
-        self.theme_status = tb.Label(status_bar, text="Светлая", font=("Segoe UI", 9))
+        self.theme_status = tb.Label(status_bar, font=("Segoe UI", 9))
         self.theme_status.pack(side=LEFT, padx=15)
+        self.update_theme_status()
         
-        self.cursor_pos_label = tb.Label(status_bar, text="Стр: 1, Стлб: 1", font=("Segoe UI", 9))
+        self.cursor_pos_label = tb.Label(status_bar, font=("Segoe UI", 9))
         self.cursor_pos_label.pack(side=RIGHT, padx=5)
+        self.show_cursor_position(1, 1)
         
         self.encoding_status = tb.Label(status_bar, text="UTF-8", font=("Segoe UI", 9))
         self.encoding_status.pack(side=RIGHT, padx=5)
+        
+        # Индикатор загрузки большого файла (показывается только во время загрузки)
+        self.load_progress = tb.Progressbar(status_bar, length=150, mode="determinate", bootstyle="info")
     
-    def create_new_tab(self):
+    def create_new_tab(self, title=None):
         """Создаёт новую вкладку с редактором"""
-        tab_frame = tb.Frame(self.tabs)
+        # Номер вкладки (новая встаёт перед вкладкой "+")
+        tab_num = len(self.tabs.tabs())
+        tab = self.tab_manager.new_tab(title or f"Новый {tab_num}.amiga1", position=tab_num - 1)
         
-        # Редактор
-        editor = AMIGAEditor(tab_frame, is_light_theme=(self.current_theme == "light"))
-        editor.pack(fill=BOTH, expand=True)
+        # Правки вкладки пишутся в журнал автосохранения
+        tab.journal = self.journal.track(tab.editor, lambda: tab.title)
+        return tab.editor
+    
+    def create_editor(self, frame):
+        """Редактор для вкладки (новой или загружаемой после выгрузки)"""
+        editor = AMIGAEditor(frame, is_light_theme=(self.current_theme == "light"))
         
         # Привязываем события
         editor.text.bind('<<CursorMove>>', self.update_cursor_position)
         editor.text.bind('<KeyRelease>', self.on_key_release)
-        
-        # Номер вкладки
-        tab_num = len(self.tabs.tabs())
-        self.tabs.insert(tab_num - 1, tab_frame, text=f"Новый {tab_num}.amiga1")
-        self.tabs.select(tab_frame)
-        
-        self.editor = editor
+        editor.completion.members = self.module_members
         return editor
     
+    def on_tab_activated(self, tab):
+        """Смена вкладки: меню и запуск работают с её редактором и файлом"""
+        self.editor = tab.editor
+        self.current_file = tab.path
+        self.update_cursor_position()
+    
+    def set_tab_file(self, tab, path, title=None):
+        """Привязывает вкладку к файлу"""
+        self.tab_manager.set_path(tab, path)
+        self.tab_manager.set_title(tab, title or os.path.basename(path))
+        if tab is self.tab_manager.current():
+            self.current_file = path
+    
+    def autosave(self):
+        """Дописывает правки всех вкладок в журнал"""
+        errors = self.journal.flush()
+        if errors:
+            self.status_label.config(text=f"Ошибка автосохранения: {errors[0]}")
+        self.root.after(AUTOSAVE_INTERVAL, self.autosave)
+    
+    def offer_recovery(self):
+        """Предлагает восстановить вкладки после аварийного завершения"""
+        leftovers = self.journal.leftovers()
+        if not leftovers:
+            return
+        if not messagebox.askyesno("Восстановление",
+                                   f"После аварийного завершения остались несохранённые вкладки: {len(leftovers)}.\n"
+                                   "Восстановить их?"):
+            self.journal.discard_leftovers()
+            return
+        recovered = self.journal.recover()
+        for item in recovered:
+            editor = self.create_new_tab(item["title"])
+            tab = self.tab_manager.current()
+            if item["path"]:
+                self.set_tab_file(tab, item["path"], item["title"])
+            editor.set_text(item["text"])
+            tab.journal.needs_snapshot = True  # старый журнал удалён, текст есть только в памяти
+        self.status_label.config(text=f"Восстановлено вкладок: {len(recovered)}")
+    
+    def quit_app(self):
+        """Выход: предлагает сохранить изменённые вкладки, дожидается сохранений
+        и удаляет журнал автосохранения. При отмене журналы остаются."""
+        dirty = [tab for tab in self.tab_manager.tabs.values() if tab.dirty and not tab.read_only]
+        if dirty:
+            names = "\n".join(tab.title for tab in dirty)
+            answer = messagebox.askyesnocancel("Выход",
+                                               f"Есть несохранённые вкладки:\n{names}\n\nСохранить их перед выходом?")
+            if answer is None:
+                return
+            if answer:
+                for tab in dirty:
+                    if not self.save_before_quit(tab):
+                        return
+        self.saver.close()
+        self.journal.close()
+        self.root.destroy()
+    
+    def save_before_quit(self, tab):
+        """Сохраняет вкладку при выходе и ждёт записи; False - выход отменён"""
+        self.tab_manager.select(tab)
+        path = tab.path
+        if not path:
+            path = filedialog.asksaveasfilename(
+                title="Сохранить файл AMIGA",
+                defaultextension=".amiga1",
+                filetypes=[("AMIGA files", "*.amiga1"), ("All files", "*.*")]
+            )
+            if not path:
+                return False
+            tab.file_state = None
+            self.set_tab_file(tab, os.path.abspath(path))
+            path = tab.path
+        force = False
+        while True:
+            try:
+                status, state = self.saver.save(path, tab.get_text(), tab.file_state, force).result()
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {e}")
+                return False
+            if status != SAVE_CONFLICT:
+                break
+            if not messagebox.askyesno("Файл изменён",
+                                       f"Файл {path} изменён на диске другой программой.\nПерезаписать его?"):
+                return False
+            force = True
+        tab.file_state = state
+        self.tab_manager.set_dirty(tab, False)
+        return True
+    
+    def module_members(self, name):
+        """Методы модуля name для автодополнения (модуль создаётся при первом обращении)"""
+        module = self.interpreter.get_module(name)
+        return public_members(module) if module is not None else ()
+    
     def load_examples_list(self):
         """Загружает список примеров"""
         examples_dir = os.path.join(os.path.dirname(__file__), "examples")
@@ -333,30 +657,58 @@ class AMIGAIDE:
     def toggle_theme(self, theme_name):
         """Переключение темы"""
         self.current_theme = theme_name
-        self.editor.apply_theme(theme_name)
-        
-        # Обновляем текст кнопки
-        self.theme_button.config(text="🌓 Светлая" if theme_name == "dark" else "🌓 Тёмная")
+        for editor in self.tab_manager.loaded_editors():
+            editor.apply_theme(theme_name)
         
         if theme_name == "dark":
             self.output_text.config(bg="#1e1e1e", fg="#d4d4d4")
-            self.theme_status.config(text="Тёмная")
         else:
             self.output_text.config(bg="#f8f9fa", fg="#212529")
-            self.theme_status.config(text="Светлая")
+        self.update_theme_status()
+    
+    def update_theme_status(self):
+        """Название темы в строке состояния и на кнопке (кнопка - тема, на которую переключит)"""
+        dark = self.current_theme == "dark"
+        self.theme_status.config(text=lang_manager.get_text("status.dark" if dark else "status.light"))
+        self.theme_button.config(text="🌓 " + lang_manager.get_text("status.light" if dark else "status.dark"))
+    
+    def localize(self, widget, key, template="{}"):
+        """Переводит текст виджета сейчас и при смене языка"""
+        lang_manager.register(widget, key, lambda text: widget.configure(text=template.format(text)))
+    
+    def localize_menu(self, menu, key, template="{}"):
+        """Переводит последний добавленный пункт меню"""
+        index = menu.index(tk.END)
+        lang_manager.register(menu, key, lambda text: menu.entryconfigure(index, label=template.format(text)))
+    
+    def localize_tab(self, notebook, frame, key, template="{}"):
+        """Переводит заголовок вкладки"""
+        lang_manager.register(frame, key, lambda text: notebook.tab(frame, text=template.format(text)))
     
     def switch_language(self, lang_code):
-        """Переключение языка"""
-        lang_names = {"ru": "Русский", "en": "English", "de": "Deutsch", "zh": "中文"}
-        self.lang_status.config(text=lang_names.get(lang_code, "Русский"))
-        # TODO: полная локализация интерфейса
+        """Переключение языка: все зарегистрированные надписи обновляются разом"""
+        if not lang_manager.set_language(lang_code):
+            return
+        self.update_theme_status()
+        self.update_cursor_position()
+        self.status_label.config(text=lang_manager.get_text("status.ready"))
+    
+    def show_cursor_position(self, line, column):
+        """Позиция курсора в строке состояния (столбец с 1)"""
+        self.cursor_pos_label.config(text="{}: {}, {}: {}".format(
+            lang_manager.get_text("status.line"), line, lang_manager.get_text("status.column"), column))
     
     def update_cursor_position(self, event=None):
         """Обновляет позицию курсора"""
         try:
             cursor_pos = self.editor.text.index(tk.INSERT)
             line, col = cursor_pos.split('.')
-            self.cursor_pos_label.config(text=f"Стр: {line}, Стлб: {int(col) + 1}")
+            self.show_cursor_position(line, int(col) + 1)
+            
+            # Сообщения проверки кода для строки под курсором
+            messages = self.editor.diagnostics.messages_at(int(line))
+            if messages:
+                self.status_label.config(text="; ".join(messages))
         except:
             pass
     
@@ -377,39 +729,236 @@ class AMIGAIDE:
         )
         
         if filename:
+            self.open_path(filename)
+    
+    def open_path(self, filename):
+        """Открывает файл в новой вкладке или переключается на уже открытую"""
+        filename = os.path.abspath(filename)
+        tab = self.tab_manager.find(filename)
+        if tab is not None:
+            self.tab_manager.select(tab)
+            return tab.editor
+        
+        try:
+            if os.path.getsize(filename) >= STREAM_OPEN_SIZE:
+                # Большой файл вставляется порциями, окно не замирает. Файл
+                # открывается до создания вкладки: при ошибке не остаётся
+                # пустой вкладки, привязанной к файлу
+                file = open(filename, 'rb')
+                editor = self.create_new_tab(os.path.basename(filename))
+                tab = self.tab_manager.current()
+                self.set_tab_file(tab, filename)
+                self.load_progress.pack(side=RIGHT, padx=5)
+                editor.load_file(file,
+                                 on_progress=lambda fraction: self.show_load_progress(filename, fraction),
+                                 on_done=lambda error: self.on_file_loaded(tab, filename, error))
+                return editor
+            
+            content, state = read_file(filename)
+            
+            # Создаём новую вкладку
+            editor = self.create_new_tab(os.path.basename(filename))
+            tab = self.tab_manager.current()
+            self.set_tab_file(tab, filename)
+            tab.file_state = state
+            editor.set_text(content)
+            tab.journal.discard()  # текст совпадает с файлом на диске
+            self.tab_manager.set_dirty(tab, False)
+            
+            self.status_label.config(text=f"Открыт: {filename}")
+            return editor
+            
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+            return None
+    
+    def show_load_progress(self, filename, fraction):
+        """Показывает ход загрузки большого файла"""
+        self.load_progress['value'] = fraction * 100
+        self.status_label.config(text=f"Открытие {os.path.basename(filename)}: {int(fraction * 100)}%")
+    
+    def on_file_loaded(self, tab, filename, error):
+        """Загрузка большого файла закончена"""
+        self.load_progress.pack_forget()
+        if error is not None:
+            # В вкладке только часть файла: её нельзя сохранить поверх оригинала
+            self.tab_manager.set_read_only(tab)
+            self.set_tab_file(tab, None, os.path.basename(filename) + " (не загружен)")
+            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {error}")
+            self.status_label.config(text=f"Ошибка открытия: {filename}")
+        else:
+            self.status_label.config(text=f"Открыт: {filename}")
+            self.when_done(self.saver.snapshot(filename), lambda future: self.set_file_state(tab, future))
+    
+    def set_file_state(self, tab, future):
+        """Запоминает состояние файла на диске для проверки при сохранении"""
+        if future.exception() is None:
+            tab.file_state = future.result()
+    
+    def when_done(self, future, callback, interval=50):
+        """Вызывает callback(future) в главном потоке, когда future завершится"""
+        if future.done():
+            callback(future)
+        else:
+            self.root.after(interval, self.when_done, future, callback, interval)
+    
+    def open_folder(self):
+        """Открывает папку проекта в дереве файлов"""
+        folder = filedialog.askdirectory(title="Открыть папку проекта")
+        if folder:
+            self.project_root = os.path.abspath(folder)
+            self.project_tree.open(self.project_root)
+            self.sidebar_notebook.select(0)  # вкладка "Файлы"
+            self.status_label.config(text=f"Проект: {self.project_root}")
+    
+    def on_file_tree_open(self, event=None):
+        """Открывает файл, выбранный в дереве"""
+        path = self.file_tree.focus()
+        if path and os.path.isfile(path):
+            self.open_path(path)
+    
+    def start_project_search(self):
+        """Запускает поиск по файлам проекта в фоновом потоке"""
+        query = self.project_query_var.get()
+        if not query:
+            return
+        root = self.project_root or (os.path.dirname(self.current_file) if self.current_file else None)
+        if root is None:
+            messagebox.showinfo("Поиск", "Сначала откройте папку проекта (Файл → Открыть папку...)")
+            return
+        regex, case_sensitive = self.project_regex_var.get(), self.project_case_var.get()
+        try:
+            compile_query(query, regex, case_sensitive)
+        except re.error as e:
+            self.project_search_status.config(text=f"Ошибка: {e}")
+            return
+        
+        # Предыдущий поиск останавливается, его результаты больше не показываются
+        if self.search_stop:
+            self.search_stop.set()
+        self.search_stop = threading.Event()
+        self.search_generation += 1
+        self.search_tree.delete(*self.search_tree.get_children())
+        self.search_matches = {}
+        self.search_found = [0, 0]
+        
+        results = queue.Queue()
+        thread = threading.Thread(target=self.project_search_worker,
+                                  args=(root, query, regex, case_sensitive, self.search_stop, results),
+                                  daemon=True)
+        thread.start()
+        self.project_search_status.config(text="Поиск...")
+        self.root.after(50, self.poll_project_search, self.search_generation, root, results)
+    
+    def project_search_worker(self, root, query, regex, case_sensitive, stop_event, results):
+        """Фоновый поток: передаёт результаты поиска по файлам через очередь"""
+        try:
+            for path, matches in self.project_search.search(root, query, regex, case_sensitive, stop_event):
+                results.put((path, matches))
+        finally:
+            results.put(None)
+    
+    def poll_project_search(self, generation, root, results):
+        """Показывает найденное по мере поступления"""
+        if generation != self.search_generation:
+            return
+        done = False
+        while True:
             try:
-                with open(filename, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                
-                # Создаём новую вкладку
-                editor = self.create_new_tab()
-                editor.set_text(content)
-                self.current_file = filename
-                
-                # Обновляем название вкладки
-                current_tab = self.tabs.select()
-                self.tabs.tab(current_tab, text=os.path.basename(filename))
-                
-                self.status_label.config(text=f"Открыт: {filename}")
-                
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+                item = results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                done = True
+                break
+            path, matches = item
+            file_item = self.search_tree.insert("", END, text=f"{os.path.relpath(path, root)} ({len(matches)})",
+                                                open=True)
+            for match in matches:
+                match_item = self.search_tree.insert(file_item, END, text=f"{match.line}: {match.text.strip()}")
+                self.search_matches[match_item] = match
+            self.search_found[0] += len(matches)
+            self.search_found[1] += 1
+        
+        count, files = self.search_found
+        self.project_search_status.config(text=f"Найдено: {count} в файлах: {files}" + ("" if done else "..."))
+        if not done:
+            self.root.after(50, self.poll_project_search, generation, root, results)
+    
+    def open_search_result(self, event=None):
+        """Открывает файл на месте выбранного совпадения"""
+        match = self.search_matches.get(self.search_tree.focus())
+        if match is not None:
+            self.goto_match(match)
+    
+    def goto_match(self, match):
+        """Выделяет совпадение в редакторе его файла"""
+        editor = self.open_path(match.path)
+        if editor is None:
+            return
+        if editor.loading:
+            # Строки совпадения может ещё не быть: ждём конца загрузки
+            self.root.after(100, self.goto_match, match)
+            return
+        start = f"{match.line}.{match.column}"
+        end = f"{start} + {match.length} chars"
+        editor.text.tag_remove("sel", "1.0", END)
+        editor.text.tag_add("sel", start, end)
+        editor.text.mark_set("insert", end)
+        editor.text.see(start)
+        editor.text.focus_set()
     
     def save_file(self):
         """Сохранить файл"""
+        if self.editor.loading:
+            self.status_label.config(text="Файл ещё загружается")
+            return
+        if self.tab_manager.current().read_only:
+            self.status_label.config(text="Файл загружен не полностью: сохранение запрещено")
+            return
         if self.current_file:
-            try:
-                content = self.editor.get_all_text()
-                with open(self.current_file, 'w', encoding='utf-8') as file:
-                    file.write(content)
-                self.status_label.config(text=f"Сохранено: {self.current_file}")
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {str(e)}")
+            self.save_tab(self.tab_manager.current())
         else:
             self.save_as_file()
     
+    def save_tab(self, tab, force=False):
+        """Сохраняет текст вкладки в фоне (временный файл и os.replace)"""
+        path = tab.path
+        version = tab.version
+        future = self.saver.save(path, tab.get_text(), tab.file_state, force)
+        self.status_label.config(text=f"Сохранение: {path}...")
+        self.when_done(future, lambda future: self.on_saved(tab, path, version, future))
+    
+    def on_saved(self, tab, path, version, future):
+        """Результат фонового сохранения"""
+        error = future.exception()
+        if error is not None:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {error}")
+            self.status_label.config(text=f"Ошибка сохранения: {path}")
+            return
+        status, state = future.result()
+        if status == SAVE_CONFLICT:
+            if messagebox.askyesno("Файл изменён",
+                                   f"Файл {path} изменён на диске другой программой.\nПерезаписать его?"):
+                self.save_tab(tab, force=True)
+            else:
+                self.status_label.config(text=f"Сохранение отменено: {path}")
+            return
+        tab.file_state = state
+        if tab.version == version:
+            # Правок после снимка текста не было: всё уже в файле
+            tab.journal.discard()
+            self.tab_manager.set_dirty(tab, False)
+        if status == SAVE_SAVED:
+            self.status_label.config(text=f"Сохранено: {path}")
+        else:
+            self.status_label.config(text=f"Без изменений: {path}")
+    
     def save_as_file(self):
         """Сохранить как"""
+        if self.tab_manager.current().read_only:
+            self.status_label.config(text="Файл загружен не полностью: сохранение запрещено")
+            return
         filename = filedialog.asksaveasfilename(
             title="Сохранить файл AMIGA",
             defaultextension=".amiga1",
@@ -417,12 +966,10 @@ class AMIGAIDE:
         )
         
         if filename:
-            self.current_file = filename
+            tab = self.tab_manager.current()
+            tab.file_state = None  # новый путь: сравнивать не с чем
+            self.set_tab_file(tab, os.path.abspath(filename))
             self.save_file()
-            
-            # Обновляем название вкладки
-            current_tab = self.tabs.select()
-            self.tabs.tab(current_tab, text=os.path.basename(filename))
     
     def load_custom_fonts(self):
         """Загружает пользовательские шрифты"""
@@ -449,25 +996,140 @@ class AMIGAIDE:
         # поэтому используем системные шрифты или стандартные
         print("✓ Используется системный шрифт: Consolas")
     
-    def run_code(self):
+    def run_code(self, input_provider=None, debug=False, coverage=False):
         """Запустить код"""
+        if self.running:
+            return
+        
         code = self.editor.get_all_text()
         if not code.strip():
             messagebox.showwarning("Предупреждение", "Нет кода для выполнения")
             return
         
         self.clear_output()
+        self.editor.clear_coverage()
+        self.input_provider = input_provider
+        self.running = True
+        
+        # Вкладка запуска не выгружается, даже если во время отладки переключиться на другую
+        run_tab = self.tab_manager.current()
+        run_tab.pinned = True
+        self.run_editor = self.editor
+        collector = CoverageCollector() if coverage else None
         
         try:
-            self.interpreter.run(code)
+            self.interpreter.reset()
+            if collector:
+                collector.attach(self.interpreter)
+            if debug:
+                debugger = Debugger(self.interpreter, self.on_debug_pause, self.editor.get_breakpoints())
+                debugger.run(code, self.current_file)
+            else:
+                self.interpreter.run(code, self.current_file)
             self.status_label.config(text="Программа выполнена")
         except Exception as e:
             self.output_text.insert(tk.END, f"Ошибка: {str(e)}\n")
             self.status_label.config(text="Ошибка выполнения")
+        finally:
+            self.input_provider = None
+            self.running = False
+            run_tab.pinned = False
+            if collector:
+                collector.detach()
+                self.show_coverage(collector.data)
+    
+    def show_coverage(self, data):
+        """Показать в редакторе покрытие текущего файла из данных покрытия"""
+        name = self.current_file or UNNAMED_FILE
+        coverage = data.files.get(name)
+        if coverage is None and self.current_file:
+            # Файлы в отчётах пакетного запуска могут быть записаны относительными путями
+            for filename, candidate in data.files.items():
+                if os.path.abspath(filename) == os.path.abspath(name):
+                    coverage = candidate
+                    break
+        if coverage is None:
+            self.status_label.config(text="Нет данных покрытия для этого файла")
+            return
+        self.editor.show_coverage(coverage.covered_lines(), coverage.uncovered_lines())
+        self.status_label.config(text="Покрытие строк: {:.1f}%".format(coverage.percent()))
+    
+    def load_coverage(self):
+        """Загрузить данные покрытия (cli.py --coverage) и показать их"""
+        filename = filedialog.askopenfilename(
+            title="Данные покрытия",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            data = CoverageData.load(filename)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить покрытие: {str(e)}")
+            return
+        self.show_coverage(data)
+    
+    def debug_code(self):
+        """Запустить код под отладчиком"""
+        self.run_code(debug=True)
+    
+    def on_debug_pause(self, program, index):
+        """Остановка отладчика: показать строку и переменные, ждать команду"""
+        line = index + 1
+        editor = self.run_editor
+        editor.set_debug_line(line)
+        self.show_variables()
+        self.sidebar_notebook.select(2)  # вкладка "Переменные"
+        self.set_debug_controls(True)
+        self.status_label.config(text=f"Отладка: остановка на строке {line}")
+        
+        self.root.wait_variable(self.debug_action)
+        
+        self.set_debug_controls(False)
+        editor.set_debug_line(None)
+        self.status_label.config(text="Выполнение...")
+        return self.debug_action.get()
+    
+    def debug_command(self, action):
+        """Шаг, продолжение или остановка приостановленной программы"""
+        if self.debug_paused:
+            self.debug_action.set(action)
+    
+    def set_debug_controls(self, paused):
+        """Включает кнопки отладчика на время паузы"""
+        self.debug_paused = paused
+        state = NORMAL if paused else DISABLED
+        for button in (self.step_button, self.continue_button, self.stop_button):
+            button.config(state=state)
+    
+    def show_variables(self):
+        """Показать переменные интерпретатора во вкладке «Переменные»"""
+        self.variables_tree.delete(*self.variables_tree.get_children())
+        for scope, variables in (("global", self.interpreter.global_vars), ("local", self.interpreter.variables)):
+            for name, value in variables.items():
+                text = str(value)
+                if len(text) > 200:
+                    text = text[:200] + "..."
+                self.variables_tree.insert("", tk.END, text=name, values=(text, scope))
+    
+    def run_with_input_file(self):
+        """Запустить код, читая Console.Input из файла"""
+        filename = filedialog.askopenfilename(
+            title="Файл с входными данными",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            try:
+                provider = FileInputProvider(filename)
+            except Exception as e:
+                messagebox.showerror("Ошибка", f"Не удалось открыть файл: {str(e)}")
+                return
+            self.run_code(input_provider=provider)
     
     def append_output(self, text):
         """Добавить в вывод"""
-        self.output_text.insert(tk.END, text + "\n")
+        self.output_text.insert(tk.END, text)
         self.output_text.see(tk.END)
         self.root.update()
     
@@ -477,7 +1139,33 @@ class AMIGAIDE:
     
     def get_input(self, prompt=""):
         """Получить ввод"""
-        return simpledialog.askstring("Ввод", prompt, parent=self.root)
+        if self.input_provider:
+            return self.input_provider(prompt)
+        
+        # Ждём строку из поля ввода, не блокируя остальной интерфейс
+        self.input_entry.config(state=NORMAL)
+        self.input_button.config(state=NORMAL)
+        self.input_entry.focus_set()
+        self.status_label.config(text="Ожидание ввода...")
+        
+        self.root.wait_variable(self.input_done)
+        
+        value = self.input_var.get()
+        self.input_var.set("")
+        self.input_done.set(False)
+        self.input_entry.config(state=DISABLED)
+        self.input_button.config(state=DISABLED)
+        self.status_label.config(text="Выполнение...")
+        
+        # Эхо введённого значения в панели вывода
+        self.append_output(value + "\n")
+        return value
+    
+    def submit_input(self, event=None):
+        """Отправить строку из поля ввода в программу"""
+        if str(self.input_entry.cget("state")) == DISABLED:
+            return
+        self.input_done.set(True)
     
     def show_examples(self):
         """Показать примеры"""
@@ -493,6 +1181,10 @@ class AMIGAIDE:
         self.root.bind('<Control-o>', lambda e: self.open_file())
         self.root.bind('<Control-s>', lambda e: self.save_file())
         self.root.bind('<F5>', lambda e: self.run_code())
+        self.root.bind('<F6>', lambda e: self.debug_code())
+        self.root.bind('<F8>', lambda e: self.debug_command(DEBUG_CONTINUE))
+        self.root.bind('<F10>', lambda e: self.debug_command(DEBUG_STEP))
+        self.root.bind('<Shift-F5>', lambda e: self.debug_command(DEBUG_STOP))
 
 def main():
     root = tb.Window(themename="cosmo")